@@ -0,0 +1,200 @@
+import argparse
+import contextlib
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+import numpy as np
+import redis
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.synthetic_site import SiteServer, SyntheticSite
+
+# Crawl a generated local site end to end and report throughput and costs:
+#     python benchmarks/crawl_benchmark.py --pages 500 --engine async --json
+# Redis is an in-process fakeredis unless --redis host:port is given.
+
+
+class RedisCommandCounter:
+    """Count the Redis commands sent by every client (pipelined commands count one each)."""
+
+    def __init__(self):
+        self.commands = 0
+
+    @contextlib.contextmanager
+    def counting(self):
+        execute_command = redis.client.Redis.execute_command
+        execute_pipeline = redis.client.Pipeline.execute
+        counter = self
+
+        def counted_command(client, *args, **kwargs):
+            counter.commands += 1
+            return execute_command(client, *args, **kwargs)
+
+        def counted_pipeline(pipe, *args, **kwargs):
+            counter.commands += len(pipe.command_stack)
+            return execute_pipeline(pipe, *args, **kwargs)
+
+        with patch.object(redis.client.Redis, "execute_command", counted_command), \
+             patch.object(redis.client.Pipeline, "execute", counted_pipeline):
+            yield self
+
+
+def timed(func, durations):
+    """Wrap `func` to append the duration of every call to `durations`."""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            durations.append(time.perf_counter() - start)
+    return wrapper
+
+
+def track_latency(scheduler, latencies):
+    """Record each URL's time from dispatch by the scheduler to `task_done`."""
+    started = {}
+    pop_ready, task_done = scheduler.pop_ready, scheduler.task_done
+
+    def timed_pop_ready():
+        url, wait = pop_ready()
+        if url is not None:
+            started[url] = time.perf_counter()
+        return url, wait
+
+    def timed_task_done(url):
+        latencies.append(time.perf_counter() - started.pop(url, time.perf_counter()))
+        task_done(url)
+
+    scheduler.pop_ready, scheduler.task_done = timed_pop_ready, timed_task_done
+
+
+def redis_factory(address):
+    """Return a `redis.Redis` replacement connecting to `address` or to a fresh fakeredis server."""
+    if address:
+        host, _, port = address.partition(":")
+        return lambda **kwargs: redis.client.Redis(host=host, port=int(port or 6379), decode_responses=True)
+    import fakeredis
+    server = fakeredis.FakeServer()
+    return lambda **kwargs: fakeredis.FakeRedis(server=server, decode_responses=True)
+
+
+def run_benchmark(pages=500, fanout=8, page_bytes=20_000, latency=0.02, error_rate=0.01, hosts=10,
+                  engine="threads", threads=8, concurrency=64, max_in_flight=2, min_delay=0.0,
+                  parse_processes=0, redis_address=None, seed=0, verbose=False):
+    """Crawl a SyntheticSite with main.Crawler (or AsyncCrawler) and return the measurements."""
+    import main
+    from src.HostScheduler import HostScheduler
+    from src.Metrics import metrics
+    from src.ParsePool import ParsePool
+    from src.RedisManager import RedisManager
+
+    site = SyntheticSite(pages, fanout, page_bytes, error_rate, hosts, seed)
+    server = SiteServer(site, latency).start()
+    counter = RedisCommandCounter()
+    latencies, writes, compactions = [], [], []
+    workdir = tempfile.mkdtemp(prefix="crawl-benchmark-")
+    cwd, level = os.getcwd(), logging.getLogger().level
+    environment = {"HTTP_PROXY": server.proxy_url, "http_proxy": server.proxy_url, "NO_PROXY": "", "no_proxy": ""}
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+
+    RedisManager._instance = None
+    metrics.reset()
+    metrics_enabled, metrics.enabled = metrics.enabled, True  # Per-stage breakdown for the report
+    try:
+        os.chdir(workdir)  # data/ is written relative to the working directory
+        if not verbose:
+            logging.getLogger().setLevel(logging.WARNING)
+        with patch.dict(os.environ, environment), output, \
+             patch("src.RedisManager.redis.Redis", redis_factory(redis_address)), \
+             patch("src.RedisManager.START_URL", server.start_url):
+            redis_manager = RedisManager()
+            redis_manager.clear_data()
+            redis_manager.add_queue_url(server.start_url)
+
+            if engine == "async":
+                crawler = main.AsyncCrawler(number_of_threads=threads, max_concurrency=concurrency)
+            else:
+                crawler = main.Crawler(number_of_threads=threads)
+            crawler.scheduler = HostScheduler(max_in_flight, min_delay)
+            if parse_processes:
+                crawler.spider.parse_pool = ParsePool(parse_processes)
+            if crawler.spider.robots_manager:
+                crawler.spider.robots_manager.on_crawl_delay = crawler.scheduler.set_delay
+            crawler.spider.defer_url = crawler.scheduler.defer
+            track_latency(crawler.scheduler, latencies)
+            parquet_manager = crawler.spider.parquet_manager
+            parquet_manager.write_data = timed(parquet_manager.write_data, writes)
+            parquet_manager.compact = timed(parquet_manager.compact, compactions)
+
+            with counter.counting():
+                start = time.perf_counter()
+                crawler.crawl()
+                elapsed = time.perf_counter() - start
+            crawled = redis_manager.r.scard("crawled")
+    finally:
+        os.chdir(cwd)
+        logging.getLogger().setLevel(level)
+        server.stop()
+        RedisManager._instance = None
+        metrics.enabled = metrics_enabled
+
+    return {
+        "engine": engine,
+        "parse_processes": parse_processes,
+        "pages": pages,
+        "crawled": crawled,
+        "requests": server.requests,
+        "seconds": round(elapsed, 3),
+        "pages_per_second": round(crawled / elapsed, 2) if elapsed else 0.0,
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2) if latencies else None,
+        "latency_p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 2) if latencies else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "redis_commands_per_page": round(counter.commands / crawled, 2) if crawled else None,
+        "parquet_writes": len(writes),
+        "parquet_write_seconds": round(sum(writes), 4),
+        "compaction_seconds": round(sum(compactions), 4),
+        "stage_mean_ms": {stage: round(h.sum / h.count * 1000, 2) for stage, h in sorted(metrics.histograms.items())},
+        "workdir": workdir,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the crawler against a local synthetic site.")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--page-kb", type=float, default=20, help="approximate HTML size of each page")
+    parser.add_argument("--latency-ms", type=float, default=20, help="server delay before each response")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="share of pages answering 500")
+    parser.add_argument("--hosts", type=int, default=10)
+    parser.add_argument("--engine", choices=["threads", "async"], default="threads")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=64, help="fetches in flight (async engine)")
+    parser.add_argument("--max-in-flight", type=int, default=2, help="concurrent requests per host")
+    parser.add_argument("--parse-processes", type=int, default=0, help="parse on a process pool (0 = in-thread)")
+    parser.add_argument("--min-delay", type=float, default=0.0, help="seconds between requests to one host")
+    parser.add_argument("--redis", help="host:port of a Redis server to use instead of fakeredis")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as one JSON line")
+    parser.add_argument("--verbose", action="store_true", help="keep the crawler's own output")
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        pages=args.pages, fanout=args.fanout, page_bytes=int(args.page_kb * 1024), latency=args.latency_ms / 1000,
+        error_rate=args.error_rate, hosts=args.hosts, engine=args.engine, threads=args.threads,
+        concurrency=args.concurrency, max_in_flight=args.max_in_flight, min_delay=args.min_delay,
+        parse_processes=args.parse_processes, redis_address=args.redis, seed=args.seed, verbose=args.verbose,
+    )
+    if args.json:
+        print(json.dumps(report))
+    else:
+        for key, value in report.items():
+            print(f"{key:>24}: {value}")
+
+
+if __name__ == "__main__":
+    main()
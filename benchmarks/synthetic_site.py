@@ -0,0 +1,130 @@
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+WORDS = (
+    "hall hostel exam department faculty research student campus library semester admission "
+    "course project laboratory seminar placement notice schedule result workshop alumni"
+).split()
+
+
+class SyntheticSite:
+    """A generated, reproducible site graph spread over several hosts.
+
+    Page `i` lives on host `site{i % hosts}.example.com` and links to its
+    `fanout` children in a tree (so every page is reachable from page 0) plus
+    random cross links. Pages are padded to about `page_bytes` of HTML, and a
+    seeded `error_rate` share of them answer 500.
+    """
+
+    def __init__(self, pages=500, fanout=8, page_bytes=20_000, error_rate=0.0, hosts=10, seed=0):
+        self.pages = pages
+        self.fanout = fanout
+        self.page_bytes = page_bytes
+        self.hosts = max(1, min(hosts, pages))
+        rng = random.Random(seed)
+        self.failing = {i for i in range(1, pages) if rng.random() < error_rate}
+        self.links = []
+        self.text = []
+        for i in range(pages):
+            children = [child for child in range(i * fanout + 1, i * fanout + fanout + 1) if child < pages]
+            cross = [rng.randrange(pages) for _ in range(fanout // 2)]
+            self.links.append(children + cross)
+            self.text.append(" ".join(rng.choice(WORDS) for _ in range(12)))
+
+    def host(self, i):
+        return f"site{i % self.hosts}.example.com"
+
+    def url(self, i, port):
+        return f"http://{self.host(i)}:{port}/page/{i}"
+
+    def render(self, i, port):
+        """Return page `i` as HTML."""
+        links = "".join(f'<a href="{self.url(j, port)}">Page {j}</a>' for j in self.links[i])
+        head = f"<html><head><title>Page {i}</title></head><body><h1>Section {i}</h1>{links}"
+        paragraph = f"<p>{self.text[i]} {i}.</p>"
+        count = max(1, (self.page_bytes - len(head)) // len(paragraph))
+        return f"{head}{paragraph * count}</body></html>"
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # Pooled clients drop keep-alive connections when they close
+
+
+class SiteServer:
+    """Serve a SyntheticSite on localhost, with a fixed per-request latency.
+
+    The server also works as an HTTP forward proxy, so crawling through it
+    (HTTP_PROXY) reaches every `site*.example.com` host without DNS changes.
+    """
+
+    def __init__(self, site: SyntheticSite, latency=0.0):
+        self.site = site
+        self.latency = latency
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                status, body = server.respond(self.path, self.headers.get("Host", ""))
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            do_HEAD = do_GET
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = QuietHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.httpd.server_address[1]
+        self.thread = None
+
+    def respond(self, path, host):
+        """Return (status, body) for a request path (absolute when proxied)."""
+        parts = urlsplit(path if "://" in path else f"http://{host}{path}")
+        if not parts.path.startswith("/page/"):
+            return 404, b"Not Found"  # robots.txt, favicon.ico, ...
+        try:
+            i = int(parts.path[len("/page/"):])
+        except ValueError:
+            return 404, b"Not Found"
+        if not 0 <= i < self.site.pages or parts.hostname != self.site.host(i):
+            return 404, b"Not Found"
+        if i in self.site.failing:
+            return 500, b"Server Error"
+        return 200, self.site.render(i, self.port).encode("utf-8")
+
+    @property
+    def proxy_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def start_url(self):
+        return self.site.url(0, self.port)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+# # Example Usage:
+# server = SiteServer(SyntheticSite(pages=100, fanout=5), latency=0.02).start()
+# print(server.start_url, "via proxy", server.proxy_url)
@@ -0,0 +1,13 @@
+import os
+from src.ParquetManager import ParquetManager
+from src.SearchIndex import SearchIndex, index_dir_for
+from config.config import DATA_DIR, SEARCH_INDEX
+
+# Fold the part files written during a crawl into data.parquet, dropping duplicate URLs,
+# and the search index's segments into one.
+if __name__ == "__main__":
+    data_file = os.path.join(DATA_DIR, "data.parquet")
+    parquet_manager = ParquetManager(data_file)
+    parquet_manager.compact()
+    if SEARCH_INDEX:
+        SearchIndex(index_dir_for(data_file)).compact()
@@ -1,3 +1,126 @@
+import os
+import socket
+
 START_URL = 'https://www.iitkgp.ac.in'
 NUMBER_OF_THREADS = 8
 DATA_DIR = 'data'
+
+# Redis holding the shared frontier; point every machine of a distributed crawl at the same one
+REDIS_HOST = os.environ.get("REDIS_HOST") or 'localhost'
+REDIS_PORT = int(os.environ.get("REDIS_PORT") or 6379)
+REDIS_PASSWORD = os.environ.get("REDIS_PASSWORD") or None
+
+# Frontier: each worker process claims URLs in batches into its own processing list.
+# Give every process sharing one Redis its own WORKER_ID (see workers.py). The default is unique
+# per process, so crawlers started by hand on one host never share a processing list; claims
+# left by a crashed one are requeued by the live workers once its heartbeat lapses.
+WORKER_ID = os.environ.get("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+CLAIM_BATCH_SIZE = 64
+# Workers heartbeat every HEARTBEAT_INTERVAL seconds; URLs claimed by a worker silent
+# for WORKER_LEASE seconds are requeued by the live ones
+HEARTBEAT_INTERVAL = 10
+WORKER_LEASE = 60
+# Split the queue into HOST_SHARDS shards by host, spread over the live workers by
+# consistent hashing so each host is only crawled by one worker (0 = one shared queue)
+HOST_SHARDS = 0
+# A claimed URL stays in its worker's processing list until its row is flushed to Parquet,
+# so a crash loses nothing. Failed fetches are requeued up to MAX_FETCH_RETRIES times,
+# then recorded in the `failed` hash
+MAX_FETCH_RETRIES = 2
+# Frontier order: each queue is a Redis sorted set scored by PRIORITY, a scorer from
+# src/Priority.py ("depth" = breadth-first, "shallow-path", "fifo") or a callable
+# (url, depth, discovered_at) -> score; the lowest score is crawled first
+PRIORITY = 'depth'
+# Links more than MAX_DEPTH clicks from the start URL are not enqueued (0 = no limit)
+MAX_DEPTH = 0
+# Caps on URLs enqueued per path pattern (regex -> max), e.g. {r"/calendar/": 500, r"[?&]page=": 200}
+PATH_CAPS = {}
+
+# Incremental recrawl: crawled pages are revisited when due with conditional requests.
+# A page's revisit interval halves when it changed and doubles when it didn't (seconds).
+RECRAWL = False
+RECRAWL_INTERVAL = 24 * 3600
+RECRAWL_MIN_INTERVAL = 3600
+RECRAWL_MAX_INTERVAL = 30 * 24 * 3600
+RECRAWL_LEASE = 3600  # A claimed revisit becomes due again if it isn't finished by then
+
+# Near-duplicate pages (SimHash of their content): "off", "flag" (stored with
+# `duplicate_of` set to the page they copy) or "skip" (not stored)
+NEAR_DUPLICATES = 'flag'
+NEAR_DUPLICATE_DISTANCE = 3  # Max differing fingerprint bits (of 64) between near-duplicates
+NEAR_DUPLICATE_EXPAND_LINKS = True  # Enqueue the outlinks of near-duplicate pages
+NEAR_DUPLICATE_REDIS = True  # Share the fingerprint index across workers through Redis
+
+# robots.txt: rules are fetched once per host and cached for ROBOTS_TTL seconds
+USER_AGENT = 'iitkgp-crawler'
+RESPECT_ROBOTS = True
+ROBOTS_TTL = 3600
+
+# Favicons are resolved once per host; failures are remembered for a shorter time
+FAVICON_TTL = 24 * 3600
+FAVICON_NEGATIVE_TTL = 3600
+FAVICON_CACHE_REDIS = True  # Share resolved favicons across workers through Redis
+
+# Politeness: per-host concurrency and spacing between requests to one host (seconds)
+HOST_MAX_IN_FLIGHT = 2
+HOST_MIN_DELAY = 0.25
+SCHEDULER_MAX_PENDING = 1024  # URLs held locally while looking for hosts that are ready
+
+# URL canonicalization rules applied before dedupe (see src/UrlCanonicalizer.py)
+URL_RULES = {
+    "lowercase_host": True,
+    "strip_default_port": True,
+    "strip_fragment": True,
+    "strip_tracking_params": True,
+    "sort_query": True,
+    "strip_trailing_slash": True,
+    "unify_scheme": True,
+}
+
+# Seen-URL tracking. "set" keeps exact sets of this run's URLs in memory, "bloom" a compact local
+# Bloom filter, "redis-bloom" one filter shared through RedisBloom (or a Redis bitmap).
+SEEN_FILTER = 'set'
+SEEN_FILTER_CAPACITY = 10_000_000
+SEEN_FILTER_ERROR_RATE = 0.001
+# Store 64-bit URL hashes instead of full URLs in the Redis `crawled` and `queue_set` sets
+HASH_URL_KEYS = False
+
+# Crawl engine: "threads" (blocking workers) or "async" (one event loop, pooled client)
+ENGINE = 'threads'
+MAX_CONCURRENT_FETCHES = 200
+MAX_CONNECTIONS = 100
+REQUEST_TIMEOUT = 10
+# Downloads are streamed; bodies larger or slower than these are abandoned
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+MAX_DOWNLOAD_SECONDS = 30
+
+# HTML parser used by BeautifulSoup: "html.parser", "lxml" (faster), or "auto" (lxml when installed).
+# The parsers repair malformed HTML differently, so switching changes the extracted text and links
+PARSER_BACKEND = 'html.parser'
+# Parse/extract stage: with PARSE_PROCESSES > 0, fetched pages are parsed on that many worker
+# processes while the fetchers move on; at most PARSE_QUEUE_SIZE pages wait in the pipeline
+# before fetchers block. 0 parses on the fetching thread.
+PARSE_PROCESSES = 0
+PARSE_QUEUE_SIZE = 64
+
+# Metrics: per-stage timing histograms and counters (near-free while disabled), served as
+# Prometheus text on METRICS_PORT (0 = no endpoint) and/or logged every METRICS_DUMP_SECONDS
+METRICS_ENABLED = False
+METRICS_PORT = 9100
+METRICS_DUMP_SECONDS = 0
+
+# Result sink: buffered records are written as one Parquet part per flush
+SINK_MAX_ROWS = 500
+SINK_MAX_BYTES = 8 * 1024 * 1024
+SINK_FLUSH_SECONDS = 30
+# Codec of the typed Parquet output (zstd, snappy, gzip, lz4 or none); run migrate_data.py
+# once to rewrite files written before the typed schema
+PARQUET_COMPRESSION = 'zstd'
+# Raw page archive: keep fetched HTML in zstd-compressed segments with an offset index
+# under ARCHIVE_DIR, so `python reextract.py` can rebuild the dataset without recrawling
+ARCHIVE_PAGES = False
+ARCHIVE_DIR = os.path.join(DATA_DIR, 'archive')
+ARCHIVE_SEGMENT_BYTES = 256 * 1024 * 1024
+# Search index: every Parquet write also appends its rows' term counts and filters to an
+# index segment next to the dataset (data/data_index), queried with `python search.py`
+SEARCH_INDEX = True
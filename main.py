@@ -1,21 +1,40 @@
+import asyncio
 import threading
 import logging
-from queue import Queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from src.HostScheduler import HostScheduler
+from src.Metrics import metrics
+from src.Page import Page
 from src.Spider import Spider
 from src.RedisManager import RedisManager
-from config.config import START_URL, NUMBER_OF_THREADS
+from config.config import (
+    START_URL, NUMBER_OF_THREADS, CLAIM_BATCH_SIZE, SCHEDULER_MAX_PENDING, ENGINE, MAX_CONCURRENT_FETCHES,
+    MAX_CONNECTIONS, REQUEST_TIMEOUT, USER_AGENT, HEARTBEAT_INTERVAL, METRICS_ENABLED, METRICS_PORT,
+    METRICS_DUMP_SECONDS
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(threadName)s - %(message)s")
 
 class Crawler:
-    def __init__(self, start_url=START_URL, number_of_threads=NUMBER_OF_THREADS):
-        self.queue = Queue()
+    def __init__(self, start_url=START_URL, number_of_threads=NUMBER_OF_THREADS, batch_size=CLAIM_BATCH_SIZE):
+        self.scheduler = HostScheduler()  # Per-host queues with politeness limits
         self.redis_manager = RedisManager()
         self.start_url = start_url
         self.number_of_threads = number_of_threads
+        self.batch_size = batch_size
         self.spider = Spider()
         self.threads = []
+        self.shards = None  # Host shards assigned to this worker, when the queue is sharded
+        self.last_heartbeat = None
+        self.metrics_stop = threading.Event()
+
+        # Feed robots.txt Crawl-delay values to the scheduler, and hold URLs whose robots.txt is down
+        if self.spider.robots_manager:
+            self.spider.robots_manager.on_crawl_delay = self.scheduler.set_delay
+        self.spider.defer_url = self.scheduler.defer
 
     def create_workers(self):
         """Create worker threads to process the queue."""
@@ -25,66 +44,271 @@ class Crawler:
             self.threads.append(t)
 
     def work(self):
-        """Worker thread that processes URLs from the queue."""
+        """Worker thread that processes URLs from the scheduler."""
         while True:
-            url = self.queue.get()
-            if url is None:  # Signal to stop
+            url = self.scheduler.get()
+            if url is None:  # Scheduler closed
                 break
 
             try:
                 logging.info(f"Crawling: {url}")
-                self.spider.crawl_page(threading.current_thread().name, url)
+                with metrics.timer("page"):
+                    self.spider.crawl_page(threading.current_thread().name, url)
             except Exception as e:
-                logging.error(f"❌ Error crawling {url}: {e}")
+                self.spider.fail_page(url, e)
             finally:
-                self.queue.task_done()
+                self.scheduler.task_done(url)
+
+    def start_metrics(self):
+        """Enable per-stage metrics and start their endpoint and periodic dump, as configured."""
+        if not METRICS_ENABLED:
+            return
+        metrics.enabled = True
+        if METRICS_PORT:
+            try:
+                metrics.serve(METRICS_PORT)
+            except OSError as e:
+                logging.error(f"❌ Failed to serve metrics on port {METRICS_PORT}: {e}")
+        if METRICS_DUMP_SECONDS:
+            metrics.dump_periodically(METRICS_DUMP_SECONDS, self.metrics_stop)
+
+    def stop_metrics(self):
+        """Stop the metrics endpoint and dump, logging the final numbers."""
+        if not metrics.enabled:
+            return
+        self.metrics_stop.set()
+        metrics.close()
+        logging.info(f"📈 {metrics.summary()}")
+
+    def maintain(self):
+        """Every HEARTBEAT_INTERVAL: heartbeat, requeue dead workers' URLs and refresh assigned shards."""
+        now = time.monotonic()
+        if self.last_heartbeat is not None and now - self.last_heartbeat < HEARTBEAT_INTERVAL:
+            return
+        self.last_heartbeat = now
+        try:
+            self.redis_manager.heartbeat()
+            self.redis_manager.reclaim_dead_workers()
+            if self.redis_manager.host_shards:
+                self.shards = self.redis_manager.assigned_shards()
+        except Exception as e:
+            logging.error(f"❌ Failed to maintain worker state in Redis: {e}")
+
+    def frontier_done(self):
+        """Check if no other live worker holds URLs that could still add links."""
+        try:
+            return not self.redis_manager.busy_workers()
+        except Exception as e:
+            logging.error(f"❌ Failed to check other workers in Redis: {e}")
+            return False
 
     def load_queue(self):
-        """Load URLs from Redis queue with error handling."""
+        """Claim the next batch of best-scored URLs from the Redis queue with error handling."""
         try:
-            return self.redis_manager.get_queue()
+            with metrics.timer("redis_claim"):
+                return self.redis_manager.claim_entries(self.batch_size, self.shards)
         except Exception as e:
             logging.error(f"❌ Failed to fetch queue from Redis: {e}")
             return []
 
+    def load_recrawls(self):
+        """Claim the next batch of crawled URLs that are due for a revisit."""
+        if not self.spider.recrawl:
+            return []
+        try:
+            urls = self.redis_manager.claim_recrawls(self.batch_size)
+            entries = self.redis_manager.describe_urls(urls)
+        except Exception as e:
+            logging.error(f"❌ Failed to fetch revisits from Redis: {e}")
+            return []
+        self.spider.recrawl_urls.update(urls)
+        return entries
+
     def create_jobs(self):
-        """Load jobs from Redis queue into the local queue."""
-        links = self.load_queue()
+        """Load jobs from Redis queue (and due revisits) into the scheduler, by priority."""
+        links = self.load_queue() + self.load_recrawls()
         if not links:
-            logging.info("✅ No links in queue, exiting...")
-            return False  
+            return False
 
-        for link in links:
-            self.queue.put(link)
+        for link, score, depth in links:
+            self.spider.depths[link] = depth
+            self.scheduler.put(link, score)
 
-        logging.info(f"📥 Loaded {len(links)} links into queue.")
+        # Frontier size is logged once per claimed batch, never per page
+        logging.info(f"📥 Loaded {len(links)} links into queue. 🔗 Queue: {self.redis_manager.queue_length()}")
         return True
 
+    def needs_jobs(self):
+        """Check if the scheduler should be topped up from Redis.
+
+        Keeps at least a batch pending, and claims more (up to SCHEDULER_MAX_PENDING)
+        while every pending host is throttled, so idle workers find other hosts.
+        """
+        pending = self.scheduler.pending
+        if pending < self.batch_size:
+            return True
+        return pending < SCHEDULER_MAX_PENDING and not self.scheduler.has_ready_host()
+
     def crawl(self):
         """Main crawl loop that loads jobs and processes them."""
-        self.create_workers()
+        self.start_metrics()
+        self.redis_manager.requeue_processing()  # Resume URLs claimed by a previous run
+        self.maintain()
+        limits = httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS)
 
-        while True:
-            if not self.create_jobs():
-                break  # No jobs to process
+        # One pooled client shared by every worker thread
+        with httpx.Client(limits=limits, timeout=REQUEST_TIMEOUT, headers={"User-Agent": USER_AGENT}) as client:
+            self.spider.client = client
+            if self.spider.robots_manager:
+                self.spider.robots_manager.client = client
+            self.create_workers()
+
+            while True:
+                self.maintain()
+                # Checked first: idle workers (and an empty parse pipeline) can't add links
+                idle = self.scheduler.unfinished == 0 and not self.spider.pending_pages
+                if self.needs_jobs():
+                    if self.create_jobs():
+                        continue
+                    if idle:
+                        self.spider.result_sink.flush()  # Checkpoint so other workers see this one done
+                        if self.frontier_done():
+                            logging.info("✅ No links in queue, exiting...")
+                            break
+                self.scheduler.wait_for_change(timeout=1.0)
 
-            self.queue.join()  # Block until all tasks are done
+            self.stop_workers()
 
-        self.stop_workers()
+            for thread in self.threads:
+                thread.join()
+            self.spider.client = None
+            if self.spider.robots_manager:
+                self.spider.robots_manager.client = None
 
-        for thread in self.threads:
-            thread.join()
+        self.spider.close()
+        self.redis_manager.leave()
+        self.spider.parquet_manager.compact()
+        self.stop_metrics()
 
     def stop_workers(self):
-        """Stop worker threads by sending `None` signals to the queue."""
+        """Stop worker threads by closing the scheduler."""
         logging.info("🛑 Stopping workers...")
-        for _ in range(self.number_of_threads):
-            self.queue.put(None)
+        self.scheduler.close()
+
+class AsyncCrawler(Crawler):
+    """Crawler that fetches pages concurrently on one event loop with a pooled AsyncClient.
+
+    Fetching runs on the event loop; parsing, extraction and Redis/Parquet writes
+    run on a pool of `number_of_threads` threads so they never block the loop
+    (parsing and extraction on the Spider's parse pool, with PARSE_PROCESSES).
+    """
+
+    def __init__(self, start_url=START_URL, number_of_threads=NUMBER_OF_THREADS,
+                 max_concurrency=MAX_CONCURRENT_FETCHES, max_connections=MAX_CONNECTIONS):
+        super().__init__(start_url, number_of_threads, batch_size=max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.ready = None  # asyncio.Condition signalled when the scheduler changes, created in `run`
+        self.client = None
+
+    def create_workers(self):
+        """Create worker tasks to process the scheduler."""
+        for i in range(self.max_concurrency):
+            self.threads.append(asyncio.create_task(self.work(), name=f"Fetcher-{i}"))
+
+    async def notify(self):
+        """Wake tasks waiting for the scheduler to change."""
+        async with self.ready:
+            self.ready.notify_all()
+
+    async def next_url(self):
+        """Wait until the scheduler dispatches a URL, or return None once it's closed."""
+        async with self.ready:
+            while not self.scheduler.closed:
+                url, wait = self.scheduler.pop_ready()
+                if url is not None:
+                    return url
+                try:
+                    await asyncio.wait_for(self.ready.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+            return None
+
+    async def work(self):
+        """Worker task that fetches URLs from the scheduler and hands them to the Spider."""
+        name = asyncio.current_task().get_name()
+        while True:
+            url = await self.next_url()
+            if url is None:  # Scheduler closed
+                break
+
+            try:
+                if await asyncio.to_thread(self.spider.start_page, name, url):
+                    logging.info(f"Crawling: {url}")
+                    validators = await asyncio.to_thread(self.spider.get_validators, url)
+                    with metrics.timer("fetch"):
+                        response, text = await Page.fetch_async(url, self.client, validators)
+                    page = await asyncio.to_thread(Page, url, response, False, text, validators)
+                    await asyncio.to_thread(self.spider.process_page, page)
+            except Exception as e:
+                await asyncio.to_thread(self.spider.fail_page, url, e)
+            finally:
+                self.scheduler.task_done(url)
+                await self.notify()
+
+    async def run(self):
+        """Main crawl loop running on the event loop."""
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=self.number_of_threads, thread_name_prefix="Parser")
+        )
+        self.ready = asyncio.Condition()
+        await asyncio.to_thread(self.redis_manager.requeue_processing)
+        await asyncio.to_thread(self.maintain)
+        limits = httpx.Limits(max_connections=self.max_connections,
+                              max_keepalive_connections=self.max_connections)
+
+        async with httpx.AsyncClient(limits=limits, timeout=REQUEST_TIMEOUT,
+                                     headers={"User-Agent": USER_AGENT}) as self.client:
+            self.create_workers()
+
+            while True:
+                await asyncio.to_thread(self.maintain)
+                # Checked first: idle workers (and an empty parse pipeline) can't add links
+                idle = self.scheduler.unfinished == 0 and not self.spider.pending_pages
+                if self.needs_jobs():
+                    if await asyncio.to_thread(self.create_jobs):
+                        await self.notify()
+                        continue
+                    if idle:
+                        await asyncio.to_thread(self.spider.result_sink.flush)
+                        if await asyncio.to_thread(self.frontier_done):
+                            logging.info("✅ No links in queue, exiting...")
+                            break
+                async with self.ready:
+                    try:
+                        await asyncio.wait_for(self.ready.wait(), 1.0)
+                    except asyncio.TimeoutError:
+                        pass
+
+            self.stop_workers()
+            await self.notify()
+            await asyncio.gather(*self.threads)
+
+    def crawl(self):
+        """Run the crawl on a new event loop."""
+        self.start_metrics()
+        asyncio.run(self.run())
+        self.spider.close()
+        self.redis_manager.leave()
+        self.spider.parquet_manager.compact()
+        self.stop_metrics()
+
 
 if __name__ == "__main__":
     try:
-        crawler = Crawler()
+        crawler = AsyncCrawler() if ENGINE == "async" else Crawler()
         crawler.crawl()
     except KeyboardInterrupt:
         logging.info("\n🛑 Process interrupted. Stopping workers...")
         crawler.stop_workers()
+        crawler.spider.close()  # Flush buffered results so nothing is lost
@@ -0,0 +1,9 @@
+import os
+from src.ParquetManager import ParquetManager
+from config.config import DATA_DIR
+
+# Rewrite Parquet files from before the typed schema (JSON text headings, content and
+# filters, text timestamps) with list and timestamp columns and PARQUET_COMPRESSION.
+if __name__ == "__main__":
+    parquet_manager = ParquetManager(os.path.join(DATA_DIR, "data.parquet"))
+    print(f"Migrated {parquet_manager.migrate()} files.")
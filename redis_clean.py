@@ -1,10 +1,11 @@
 import redis
+from config.config import REDIS_HOST, REDIS_PORT, REDIS_PASSWORD
 
 class RedisManager:
-    def __init__(self, host="localhost", port=6379, decode_responses=True):
+    def __init__(self, host=REDIS_HOST, port=REDIS_PORT, password=REDIS_PASSWORD, decode_responses=True):
         """Initialize Redis connection."""
         try:
-            self.r = redis.Redis(host=host, port=port, decode_responses=decode_responses)
+            self.r = redis.Redis(host=host, port=port, password=password, decode_responses=decode_responses)
             self.r.ping()  # Test connection
             print("✅ Connected to Redis")
         except redis.ConnectionError as e:
@@ -12,15 +13,20 @@ class RedisManager:
             exit("Redis is required for this application. Exiting...")
 
     def clear_data(self):
-        """Clear both queue and crawled data."""
-        self.r.delete("queue", "queue_set", "crawled")
+        """Clear queue, processing, crawled, retry, recrawl and near-duplicate data."""
+        self.r.delete("queue", "queue_set", "crawled", "crawled_bloom", "recrawl", "workers",
+                      "retries", "failed", "frontier_meta", "path_caps",
+                      *self.r.scan_iter("queue:*"), *self.r.scan_iter("processing:*"),
+                      *self.r.scan_iter("validators:*"), *self.r.scan_iter("simhash:*"))
 
     def get_all_data(self):
         """Retrieve all queued and crawled URLs in a single call."""
         with self.r.pipeline() as pipe:
-            pipe.lrange("queue", 0, -1)
+            for key in ["queue", *self.r.scan_iter("queue:*")]:
+                pipe.zrange(key, 0, -1)
             pipe.smembers("crawled")
-            queue_list, crawled_set = pipe.execute()
+            *queues, crawled_set = pipe.execute()
+        queue_list = [url for queue in queues for url in queue]
         
         print(f"📜 Queued URLs: {queue_list}")
         print(f"✅ Crawled URLs: {crawled_set}")
@@ -0,0 +1,114 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import pyarrow.parquet as pq
+from src.PageArchive import PageArchive
+from src.ParquetManager import ParquetManager
+from src.ParsePool import extract_html
+from src.SimHash import SimHashIndex
+from src.Spider import Spider
+from config.config import (
+    ARCHIVE_DIR, DATA_DIR, NEAR_DUPLICATES, NEAR_DUPLICATE_DISTANCE, SINK_MAX_ROWS
+)
+
+# Rebuild the dataset from the raw page archive (ARCHIVE_PAGES) with the current
+# extractors, on a process pool and without touching the network or Redis:
+#     python reextract.py --output data/reextracted.parquet --processes 8
+
+
+def reextract_html(url, html, content_type="text/html"):
+    """Run the extractors over archived HTML; return (record, simhash) or None for an empty page."""
+    fields = extract_html(url, html, content_type)
+    if fields is None or (not fields["title"] and not fields["headings"] and not fields["contents"]):
+        return None
+    record = Spider.make_json(url, fields["favicon_link"], fields["title"], fields["headings"],
+                              fields["contents"], fields["filters"])
+    return record, fields["fingerprint"]
+
+
+def extract_batch(task):
+    """Re-extract one batch of index entries from a segment (runs in a worker process)."""
+    segment_path, entries = task
+    results = []
+    for url, headers, html in PageArchive.read_records(segment_path, entries):
+        try:
+            result = reextract_html(url, html, headers.get("Content-Type") or "text/html")
+        except Exception as e:
+            print(f"❌ Error re-extracting {url}: {e}")
+            continue
+        if result is not None:
+            results.append(result)
+    return results
+
+
+def make_tasks(archive_dir, batch_size):
+    """Split every segment's index into batches, oldest records first."""
+    for segment_path in PageArchive.segments(archive_dir):
+        entries = PageArchive.read_index(segment_path)
+        for start in range(0, len(entries), batch_size):
+            yield segment_path, entries[start:start + batch_size]
+
+
+def load_favicons(path):
+    """Return url -> favicon from an existing dataset; favicons don't depend on the extractors."""
+    if not path or not os.path.exists(path):
+        return {}
+    table = pq.read_table(path, columns=["url", "favicon"])
+    return {url: favicon for url, favicon in zip(table["url"].to_pylist(), table["favicon"].to_pylist()) if favicon}
+
+
+def reextract(archive_dir=ARCHIVE_DIR, output=os.path.join(DATA_DIR, "reextracted.parquet"), processes=None,
+              batch_size=200, favicons_from=os.path.join(DATA_DIR, "data.parquet")):
+    """Re-extract every archived page into a fresh dataset at `output`; return the number of rows written."""
+    if os.path.exists(output):
+        raise FileExistsError(f"{output} already exists; re-extraction writes a fresh dataset")
+    parquet_manager = ParquetManager(output)
+    favicons = load_favicons(favicons_from)
+    near_duplicates = SimHashIndex(NEAR_DUPLICATE_DISTANCE) if NEAR_DUPLICATES != "off" else None
+    buffered, written = [], 0
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        # map keeps archive order, so the newest copy of a URL is written last and wins
+        for results in pool.map(extract_batch, make_tasks(archive_dir, batch_size)):
+            for record, fingerprint in results:
+                url = record["url"]
+                record["favicon"] = favicons.get(url, record["favicon"])
+                if near_duplicates is not None and fingerprint is not None:
+                    duplicate_of = near_duplicates.find(fingerprint, exclude=url)
+                    if duplicate_of is None:
+                        near_duplicates.add(fingerprint, url)
+                    elif NEAR_DUPLICATES == "skip":
+                        continue
+                    record["duplicate_of"] = duplicate_of or ""
+                buffered.append(record)
+            if len(buffered) >= SINK_MAX_ROWS:
+                parquet_manager.write_data(pd.DataFrame(buffered))
+                written += len(buffered)
+                buffered = []
+
+    if buffered:
+        parquet_manager.write_data(pd.DataFrame(buffered))
+        written += len(buffered)
+    parquet_manager.compact()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract archived pages into a fresh dataset.")
+    parser.add_argument("--archive", default=ARCHIVE_DIR, help="archive directory written by the crawler")
+    parser.add_argument("--output", default=os.path.join(DATA_DIR, "reextracted.parquet"))
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=200, help="archived pages per task")
+    parser.add_argument("--favicons", default=os.path.join(DATA_DIR, "data.parquet"),
+                        help="dataset to copy favicons from (they need the network to resolve)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = reextract(args.archive, args.output, args.processes, args.batch_size, args.favicons)
+    print(f"🔁 Re-extracted {rows} pages into {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
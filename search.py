@@ -0,0 +1,54 @@
+import argparse
+import os
+import time
+from src.ParquetManager import ParquetManager, to_table
+from src.SearchIndex import SearchIndex, index_dir_for
+from config.config import DATA_DIR
+
+# Query the crawl output through its search index (kept up to date by every Parquet write):
+#     python search.py "hall allotment" --filter halls --limit 5
+#     python search.py --facets
+#     python search.py --rebuild      # index a dataset written before SEARCH_INDEX
+
+
+def rebuild(data_file):
+    """Index every row of a dataset from scratch; return the number of documents."""
+    records = to_table(ParquetManager(data_file, search_index=False).read_data()).to_pylist()
+    return SearchIndex(index_dir_for(data_file)).rebuild(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the crawled pages.")
+    parser.add_argument("query", nargs="?", default="", help="words to search for (BM25 ranked)")
+    parser.add_argument("--data", default=os.path.join(DATA_DIR, "data.parquet"), help="dataset to search")
+    parser.add_argument("--filter", action="append", default=[], help="only pages tagged with this filter (halls-head) or category (halls)")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--facets", action="store_true", help="show the number of matching pages per filter")
+    parser.add_argument("--rebuild", action="store_true", help="index the whole dataset from scratch")
+    parser.add_argument("--compact", action="store_true", help="fold the index segments into one")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        print(f"🔎 Indexed {rebuild(args.data)} pages from {args.data}")
+    index = SearchIndex(index_dir_for(args.data))
+    if args.compact:
+        index.compact()
+
+    start = time.perf_counter()
+    index.refresh()
+    print(f"📚 Loaded {len(index)} pages in {time.perf_counter() - start:.2f}s")
+
+    if args.query:
+        start = time.perf_counter()
+        results = index.search(args.query, args.filter, args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        for rank, result in enumerate(results, 1):
+            print(f"{rank:>3}. {result['score']:>7.3f}  {result['title']}\n          {result['url']}")
+        print(f"🔎 {len(results)} results in {elapsed:.2f} ms")
+    if args.facets:
+        for name, count in index.facet_counts(args.filter).items():
+            print(f"  {name}: {count}")
+
+
+if __name__ == "__main__":
+    main()
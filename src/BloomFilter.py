@@ -0,0 +1,170 @@
+import hashlib
+import math
+import threading
+import redis
+
+
+def url_digest(url: str) -> int:
+    """Return a stable 64-bit hash of a URL."""
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def url_key(url: str) -> str:
+    """Return the fixed-width (16 hex chars) key used to store a URL hash in Redis."""
+    return f"{url_digest(url):016x}"
+
+
+def bloom_size(capacity: int, error_rate: float):
+    """Return the optimal (number of bits, number of hashes) for a Bloom filter."""
+    num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+    num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+    return num_bits, num_hashes
+
+
+def bloom_positions(digest: int, num_bits: int, num_hashes: int):
+    """Derive the bit positions for a 64-bit digest by double hashing."""
+    h1, h2 = digest >> 32, (digest & 0xFFFFFFFF) | 1
+    return [(h1 + i * h2) % num_bits for i in range(num_hashes)]
+
+
+class BloomFilter:
+    """Compact, thread-safe set of URLs with a configurable false-positive rate.
+
+    Memory is about -ln(error_rate) / ln(2)^2 bits per URL (~1.8 bytes at 0.1%)
+    regardless of URL length. Membership tests never give false negatives, and
+    items cannot be removed.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits, self.num_hashes = bloom_size(capacity, error_rate)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def _positions(self, digest: int):
+        return bloom_positions(digest, self.num_bits, self.num_hashes)
+
+    def add_digest(self, digest: int):
+        """Add an item by its `url_digest`."""
+        positions = self._positions(digest)
+        with self.lock:
+            for pos in positions:
+                self.bits[pos >> 3] |= 1 << (pos & 7)
+            self.count += 1
+
+    def add(self, url: str):
+        """Add a URL to the filter."""
+        self.add_digest(url_digest(url))
+
+    def update(self, urls):
+        """Add many URLs to the filter."""
+        for url in urls:
+            self.add(url)
+
+    def discard(self, url: str):
+        """Bloom filters cannot forget items; kept for set compatibility."""
+
+    def __contains__(self, url: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(url_digest(url)))
+
+    def contains_many(self, urls):
+        """Return a membership flag for each URL."""
+        return [url in self for url in urls]
+
+    def __len__(self):
+        """Number of items added (duplicates included)."""
+        return self.count
+
+
+class RedisBloomFilter:
+    """Bloom filter shared by all workers through Redis.
+
+    Uses the RedisBloom module (BF.*) when the server has it loaded, otherwise
+    falls back to a plain Redis bitmap with the same layout as `BloomFilter`.
+    """
+
+    def __init__(self, r: redis.Redis, key: str, capacity: int, error_rate: float = 0.001):
+        self.r = r
+        self.key = key
+        self.num_bits, self.num_hashes = bloom_size(capacity, error_rate)
+        self.exists = bool(self.r.exists(key))
+        self.native = self._reserve(capacity, error_rate)
+
+    def _reserve(self, capacity, error_rate):
+        """Create the RedisBloom filter, returning False if the module isn't available."""
+        try:
+            if not self.exists:
+                self.r.execute_command("BF.RESERVE", self.key, error_rate, capacity)
+            else:
+                self.r.execute_command("BF.EXISTS", self.key, "")
+            return True
+        except redis.ResponseError as e:
+            if "unknown command" in str(e).lower() or "wrongtype" in str(e).lower():
+                print(f"ℹ️ RedisBloom not available, using a Redis bitmap for {self.key}")
+                return False
+            raise
+
+    def add_digests(self, digests):
+        """Add many items by their `url_digest` in one round trip."""
+        with self.r.pipeline(transaction=False) as pipe:
+            for digest in digests:
+                if self.native:
+                    pipe.execute_command("BF.ADD", self.key, f"{digest:016x}")
+                else:
+                    for pos in bloom_positions(digest, self.num_bits, self.num_hashes):
+                        pipe.setbit(self.key, pos, 1)
+            pipe.execute()
+
+    def add(self, url: str):
+        """Add a URL to the filter."""
+        self.add_digests([url_digest(url)])
+
+    def update(self, urls):
+        """Add many URLs to the filter in one round trip."""
+        self.add_digests([url_digest(url) for url in urls])
+
+    def discard(self, url: str):
+        """Bloom filters cannot forget items; kept for set compatibility."""
+
+    def __contains__(self, url: str) -> bool:
+        digest = url_digest(url)
+        if self.native:
+            return bool(self.r.execute_command("BF.EXISTS", self.key, f"{digest:016x}"))
+        with self.r.pipeline(transaction=False) as pipe:
+            for pos in bloom_positions(digest, self.num_bits, self.num_hashes):
+                pipe.getbit(self.key, pos)
+            return all(pipe.execute())
+
+    def contains_many(self, urls):
+        """Return a membership flag for each URL, in one round trip (BF.MEXISTS or one GETBIT pipeline)."""
+        digests = [url_digest(url) for url in urls]
+        if not digests:
+            return []
+        if self.native:
+            return [bool(found) for found in
+                    self.r.execute_command("BF.MEXISTS", self.key, *(f"{digest:016x}" for digest in digests))]
+        with self.r.pipeline(transaction=False) as pipe:
+            for digest in digests:
+                for pos in bloom_positions(digest, self.num_bits, self.num_hashes):
+                    pipe.getbit(self.key, pos)
+            bits = pipe.execute()
+        k = self.num_hashes
+        return [all(bits[i * k:(i + 1) * k]) for i in range(len(digests))]
+
+    def __len__(self):
+        """Approximate number of items added."""
+        if self.native:
+            return int(self.r.execute_command("BF.CARD", self.key) or 0)
+        ones = self.r.bitcount(self.key)
+        m, k = self.num_bits, self.num_hashes
+        if ones >= m:
+            return 0
+        return round(-m / k * math.log(1 - ones / m))  # Swamidass & Baldi estimate
+
+# # Example Usage:
+# seen = BloomFilter(capacity=1_000_000, error_rate=0.001)
+# seen.add("https://www.iitkgp.ac.in/")
+# print("https://www.iitkgp.ac.in/" in seen)  # True
+# print(len(seen.bits))  # ~1.8 MB for a million URLs
@@ -1,13 +1,34 @@
 import tldextract
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+# Use the public suffix list snapshot bundled with tldextract: no network fetch
+# or cache-file lookup on first use.
+_extract = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+
+
+@lru_cache(maxsize=65536)
+def extract_host(host: str):
+    """Split a hostname into subdomain, domain and suffix (memoized per host)."""
+    return _extract(host)
+
 
 class DomainExtractor:
     def __init__(self, url: str):
         self.url = url
 
+    def _extract(self):
+        """Extract the URL's host parts, parsing the URL once and caching by host."""
+        try:
+            host = urlsplit(self.url).hostname
+        except ValueError:
+            host = None
+        return extract_host(host) if host else _extract(self.url)
+
     def get_domain_name(self):
         """Extracts the main domain (e.g., 'example.com')."""
         try:
-            extracted = tldextract.extract(self.url)
+            extracted = self._extract()
             return f"{extracted.domain}.{extracted.suffix}" if extracted.suffix else None
         except Exception as e:
             print(f"Error extracting domain name: {e}")
@@ -16,7 +37,7 @@ class DomainExtractor:
     def get_subdomain_name(self):
         """Extracts the subdomain (e.g., 'sub.example.com', or 'example.com' if no subdomain)."""
         try:
-            extracted = tldextract.extract(self.url)
+            extracted = self._extract()
             subdomain = extracted.subdomain.replace('www.', '') if extracted.subdomain else ""
             return f"{subdomain}.{extracted.domain}.{extracted.suffix}" if extracted.suffix else None
         except Exception as e:
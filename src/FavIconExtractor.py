@@ -1,36 +1,117 @@
 import httpx
-from bs4 import BeautifulSoup
+import threading
+import time
 from urllib.parse import urljoin, urlparse
+from config.config import FAVICON_TTL, FAVICON_NEGATIVE_TTL
+from src.Page import Page
+
+
+class FavIconCache:
+    """Host-keyed favicon cache with a TTL, kept in-process and optionally in Redis.
+
+    Failed lookups are cached as well (for `negative_ttl` seconds) so a host
+    without a favicon isn't probed again for every page.
+    """
+
+    def __init__(self, ttl=FAVICON_TTL, negative_ttl=FAVICON_NEGATIVE_TTL, redis_client=None):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.redis_client = redis_client  # Shares results across workers when set
+        self.entries = {}  # base URL -> (favicon URL or None, expiry time)
+        self.lock = threading.Lock()
+
+    def get(self, base_url):
+        """Return (found, favicon URL or None) for a host."""
+        entry = self.entries.get(base_url)
+        if entry and entry[1] > time.monotonic():
+            return True, entry[0]
+
+        if self.redis_client is not None:
+            value = self.redis_client.get(f"favicon:{base_url}")
+            if value is not None:
+                favicon = value or None  # "" marks a cached failure
+                ttl = self.redis_client.ttl(f"favicon:{base_url}")
+                self._set_local(base_url, favicon, ttl if ttl and ttl > 0 else self.negative_ttl)
+                return True, favicon
+        return False, None
+
+    def set(self, base_url, favicon):
+        """Cache a host's favicon URL, or None if it has none."""
+        ttl = self.ttl if favicon else self.negative_ttl
+        self._set_local(base_url, favicon, ttl)
+        if self.redis_client is not None:
+            self.redis_client.set(f"favicon:{base_url}", favicon or "", ex=ttl)
+
+    def _set_local(self, base_url, favicon, ttl):
+        with self.lock:
+            self.entries[base_url] = (favicon, time.monotonic() + ttl)
+
+
+# Shared by every extractor in the process unless one is given explicitly
+favicon_cache = FavIconCache()
+
+_NOT_GIVEN = object()
+
+
+def is_favicon_rel(rel) -> bool:
+    """Check if a <link> tag's rel attribute (string or list of values) declares an icon."""
+    if isinstance(rel, (list, tuple)):
+        rel = " ".join(rel)
+    return bool(rel) and "icon" in rel.lower()
+
 
 class FavIconExtractor:
-    def __init__(self, url: str):
+    def __init__(self, url: str, page: Page | None = None, cache: FavIconCache | None = None,
+                 favicon_link=_NOT_GIVEN):
         self.url = self._get_base_url(url)
-        self.soup = self._get_soup()
+        self.cache = cache or favicon_cache
+        self._page = page
+        # Favicon URL declared by the page (or None), when already found by a tree walk
+        self.favicon_link = favicon_link
 
     def _get_base_url(self, url: str) -> str:
         """Extracts and returns the base URL (scheme + domain)."""
         parsed_url = urlparse(url)
         return f"{parsed_url.scheme}://{parsed_url.netloc}"
 
-    def _get_soup(self):
-        """Fetch the webpage using httpx and return a BeautifulSoup object."""
-        try:
-            response = httpx.get(self.url, timeout=10, follow_redirects=True)
-            response.raise_for_status()
-            return BeautifulSoup(response.text, "html.parser")
-        except httpx.RequestError as e:
-            print(f"Error fetching page: {e}")
-            return BeautifulSoup("", "html.parser")
+    def _find_favicon_link(self, page: Page):
+        """Return the favicon URL declared in a page's <link> tags, if any."""
+        if not page.soup:
+            return None
+
+        favicon_link = page.soup.find("link", rel=is_favicon_rel)
+        if favicon_link and "href" in favicon_link.attrs:
+            return urljoin(page.url, favicon_link["href"])
+        return None
+
+    @property
+    def page(self) -> Page:
+        """The page to read <link> tags from, fetched only on a cache miss."""
+        if self._page is None:
+            self._page = Page(self.url)
+        return self._page
 
     def get_favicon(self) -> str | None:
+        """Return the host's favicon URL, resolving it at most once per cache TTL."""
+        found, favicon = self.cache.get(self.url)
+        if found:
+            return favicon
+
+        favicon = self._resolve_favicon()
+        self.cache.set(self.url, favicon)
+        return favicon
+
+    def _resolve_favicon(self) -> str | None:
         """Extracts the favicon URL, handling both absolute and relative URLs."""
-        if not self.soup:
-            return None
+        # Look for the favicon in the page's own <link> tags, then the site root's
+        if self.favicon_link is _NOT_GIVEN:
+            url = self._find_favicon_link(self.page)
+        else:
+            url = self.favicon_link
+        if url is None and self.page.url.rstrip("/") != self.url:
+            url = self._find_favicon_link(Page(self.url))
 
-        # Look for the favicon in <link> tags
-        favicon_link = self.soup.find("link", rel=lambda rel: rel and "icon" in rel.lower())
-        if favicon_link and "href" in favicon_link.attrs:
-            url = urljoin(self.url, favicon_link["href"])
+        if url:
             if(is_valid_url(url)):
                 return url
             else:
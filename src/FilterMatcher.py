@@ -0,0 +1,32 @@
+import re
+from flashtext import KeywordProcessor
+
+
+class FilterMatcher:
+    """Tag text with filter categories in a single scan.
+
+    All filter words are compiled once into one flashtext trie. Matching is
+    case-insensitive and whole-word, like `\\bword\\b`. flashtext reports only the
+    longest keyword at each position, so every keyword carries the categories
+    of the shorter keywords it contains as well.
+    """
+
+    def __init__(self, filters):
+        self.processor = KeywordProcessor(case_sensitive=False)
+        words = [(category, word.lower()) for category, filter_words in filters.items() for word in filter_words]
+        for _, word in words:
+            categories = frozenset(
+                category for category, other in words
+                if re.search(r"\b" + re.escape(other) + r"\b", word)
+            )
+            self.processor.add_keyword(word, categories)
+
+    def match(self, text):
+        """Return the set of categories whose filter words occur in the text."""
+        if not text:
+            return set()
+        return set().union(*self.processor.extract_keywords(text))
+
+# # Example Usage:
+# matcher = FilterMatcher({"halls": {"hall", "hostel"}, "exams": {"mid sem", "exam"}})
+# print(matcher.match("Hostel allotment after the Mid Sem exams"))  # {'halls', 'exams'}
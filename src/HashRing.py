@@ -0,0 +1,26 @@
+import bisect
+from src.BloomFilter import url_digest
+
+
+class HashRing:
+    """Consistent hash ring mapping keys to nodes.
+
+    Each node is placed at `vnodes` points on the ring. When a node joins or
+    leaves, only the keys next to its points change owner.
+    """
+
+    def __init__(self, nodes, vnodes=64):
+        points = sorted((url_digest(f"{node}#{i}"), node) for node in set(nodes) for i in range(vnodes))
+        self.hashes = [point for point, _ in points]
+        self.nodes = [node for _, node in points]
+
+    def node_for(self, key: str):
+        """Return the node owning a key, or None if the ring is empty."""
+        if not self.hashes:
+            return None
+        index = bisect.bisect(self.hashes, url_digest(key)) % len(self.hashes)
+        return self.nodes[index]
+
+# # Example Usage:
+# ring = HashRing(["worker-a", "worker-b", "worker-c"])
+# print(ring.node_for("12"))  # Same worker on every machine with the same membership
@@ -0,0 +1,157 @@
+import heapq
+import itertools
+import threading
+import time
+from urllib.parse import urlsplit
+from src.Metrics import metrics
+from config.config import HOST_MAX_IN_FLIGHT, HOST_MIN_DELAY
+
+
+def get_host(url: str) -> str:
+    """Return the lower-cased host of a URL ('' if it has none)."""
+    try:
+        return urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+
+
+class HostScheduler:
+    """Per-host URL queues that dispatch the best-priority URL among the ready hosts.
+
+    A host is ready when it has queued URLs, fewer than `max_in_flight` of its
+    URLs are being crawled and its eligible time has passed. Consecutive
+    dispatches to one host are spaced at least `min_delay` seconds apart (or the
+    host's own delay, see `set_delay`). Each host's URLs come out lowest
+    priority first, in the order they were queued for equal priorities.
+    Thread-safe: worker threads call `get` and `task_done`.
+    """
+
+    def __init__(self, max_in_flight=HOST_MAX_IN_FLIGHT, min_delay=HOST_MIN_DELAY):
+        self.max_in_flight = max_in_flight
+        self.min_delay = min_delay
+
+        self.queues = {}  # host -> heap of (priority, seq, URL)
+        self.in_flight = {}  # host -> URLs being crawled
+        self.next_time = {}  # host -> earliest time of the next dispatch
+        self.delays = {}  # host -> per-host delay overriding min_delay
+        self.waiting = []  # (eligible time, seq, host) for hosts with work and a free slot
+        self.ready = []  # (priority of its best URL, seq, host) for those now eligible
+        self.scheduled = set()  # Hosts in `waiting` or `ready`
+        self.seq = itertools.count()
+        self.pending = 0  # Queued, not yet dispatched
+        self.unfinished = 0  # Queued or in flight
+        self.queued_at = {}  # URL -> time it was queued, kept only while metrics are enabled
+        self.closed = False
+        self.changed = threading.Condition()
+
+    def _schedule(self, host):
+        """Put a host in the waiting heap if it has work and a free slot (lock held)."""
+        if host in self.scheduled or not self.queues.get(host):
+            return
+        if self.in_flight.get(host, 0) >= self.max_in_flight:
+            return
+        heapq.heappush(self.waiting, (self.next_time.get(host, 0.0), next(self.seq), host))
+        self.scheduled.add(host)
+
+    def _promote(self, now):
+        """Move hosts whose eligible time has passed from `waiting` to `ready` (lock held).
+
+        A host is ranked by its best URL at this point, until it is dispatched.
+        """
+        while self.waiting and self.waiting[0][0] <= now:
+            _, seq, host = heapq.heappop(self.waiting)
+            eligible = self.next_time.get(host, 0.0)
+            if eligible > now:  # Deferred since it was scheduled
+                heapq.heappush(self.waiting, (eligible, seq, host))
+                continue
+            heapq.heappush(self.ready, (self.queues[host][0][0], seq, host))
+
+    def put(self, url, priority=0.0):
+        """Queue a URL on its host; lower priorities are dispatched first."""
+        host = get_host(url)
+        with self.changed:
+            heapq.heappush(self.queues.setdefault(host, []), (priority, next(self.seq), url))
+            if metrics.enabled:
+                self.queued_at[url] = time.monotonic()
+            self.pending += 1
+            self.unfinished += 1
+            self._schedule(host)
+            self.changed.notify()
+
+    def pop_ready(self):
+        """Dispatch the next URL without blocking.
+
+        Returns (url, 0) if a host is ready now, otherwise (None, seconds until the
+        next host becomes eligible), with None seconds if nothing is schedulable.
+        """
+        with self.changed:
+            now = time.monotonic()
+            self._promote(now)
+            if not self.ready:
+                return None, (self.waiting[0][0] - now) if self.waiting else None
+
+            _, _, host = heapq.heappop(self.ready)
+            self.scheduled.discard(host)
+            if self.next_time.get(host, 0.0) > now:  # Deferred while ready: wait again
+                self._schedule(host)
+                return self.pop_ready()
+            _, _, url = heapq.heappop(self.queues[host])
+            if not self.queues[host]:
+                del self.queues[host]
+            self.pending -= 1
+            queued_at = self.queued_at.pop(url, None) if self.queued_at else None
+            if queued_at is not None:
+                metrics.observe("queue_wait", now - queued_at)
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            self.next_time[host] = now + self.delays.get(host, self.min_delay)
+            self._schedule(host)
+            return url, 0
+
+    def get(self):
+        """Block until a URL is ready and return it, or None once closed."""
+        with self.changed:
+            while not self.closed:
+                url, wait = self.pop_ready()
+                if url is not None:
+                    return url
+                self.changed.wait(wait)
+            return None
+
+    def task_done(self, url):
+        """Mark a dispatched URL as finished, freeing a slot on its host."""
+        host = get_host(url)
+        with self.changed:
+            self.in_flight[host] -= 1
+            if not self.in_flight[host]:
+                del self.in_flight[host]
+            self.unfinished -= 1
+            self._schedule(host)
+            self.changed.notify_all()
+
+    def defer(self, url, delay, priority=0.0):
+        """Queue a URL again and hold its whole host back for `delay` seconds (e.g. robots.txt unreachable)."""
+        host = get_host(url)
+        with self.changed:
+            self.next_time[host] = max(self.next_time.get(host, 0.0), time.monotonic() + delay)
+        self.put(url, priority)
+
+    def set_delay(self, host, delay):
+        """Space dispatches to `host` at least `delay` seconds apart (e.g. robots.txt Crawl-delay)."""
+        with self.changed:
+            self.delays[host] = max(delay, self.min_delay)
+
+    def has_ready_host(self):
+        """Check if some host can be dispatched right now."""
+        with self.changed:
+            return bool(self.ready) or (bool(self.waiting) and self.waiting[0][0] <= time.monotonic())
+
+    def wait_for_change(self, timeout=None):
+        """Block until a URL is queued or finished, or the timeout expires."""
+        with self.changed:
+            self.changed.wait(timeout)
+
+    def close(self):
+        """Wake all waiting workers and make `get` return None."""
+        with self.changed:
+            self.closed = True
+            self.changed.notify_all()
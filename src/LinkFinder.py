@@ -1,40 +1,44 @@
-import httpx
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 from src.DomainExtractor import DomainExtractor
+from src.Page import Page
+from src.UrlCanonicalizer import canonicalize
 
 class LinkFinder:
-    def __init__(self, url: str):
+    def __init__(self, url: str, page: Page | None = None, anchors=None):
         self.url = url
         self.domain_extractor = DomainExtractor(url)
-        self.domain = self.domain_extractor.get_domain_name()
-        self.soup = self._get_soup()
-        self.links = self._extract_links() if self.soup else set()
+        self.domain = self.domain_extractor.get_domain_name() or urlsplit(url).hostname
+        self.page = page or Page(url)
+        self.soup = self.page.soup
+        self.links = self._extract_links(anchors) if self.soup else set()
 
-    def _get_soup(self):
-        """Fetch the webpage using httpx and return a BeautifulSoup object."""
-        try:
-            response = httpx.get(self.url, timeout=10, follow_redirects=True)
-            response.raise_for_status()
-            return BeautifulSoup(response.text, "html.parser")
-        except httpx.RequestError as e:
-            print(f"⚠️ Error fetching page {self.url}: {e}")  # Print instead of logging
-            return None
-
-    def _extract_links(self):
-        """Extract and return all valid links from the webpage."""
+    def _extract_links(self, anchors=None):
+        """Extract and return all valid links from the webpage.
+
+        `anchors` are <a href> tags already collected by a tree walk; found with find_all if omitted.
+        """
         links = set()
 
-        for link in self.soup.find_all("a", href=True):
+        for link in self.soup.find_all("a", href=True) if anchors is None else anchors:
             href = link["href"].strip()
             full_url = urljoin(self.url, href)  # Convert relative URLs to absolute
 
             # Ensure the link belongs to the same domain
-            if full_url.startswith("http") and self.domain in full_url:
-                links.add(full_url)
+            if full_url.startswith("http") and self._is_same_domain(full_url):
+                links.add(canonicalize(full_url))
 
         return links
 
+    def _is_same_domain(self, url):
+        """Check if a URL's host is the crawl domain or one of its subdomains."""
+        try:
+            host = urlsplit(url).hostname
+        except ValueError:
+            return False
+        if not host or not self.domain:
+            return False
+        return host == self.domain or host.endswith("." + self.domain)
+
     def get_links(self):
         """Return the extracted links."""
         return self.links
@@ -0,0 +1,176 @@
+import bisect
+import contextlib
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config.config import METRICS_ENABLED
+
+# Upper bounds (seconds) of the histogram buckets, as in Prometheus client libraries
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_DISABLED_TIMER = contextlib.nullcontext()
+
+
+class Histogram:
+    """Counts of observed durations per bucket, with their sum and count."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Return the upper bound of the bucket holding the q-quantile (an estimate)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class _Timer:
+    """Context manager adding its duration to a histogram."""
+
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """Per-stage timing histograms and event counters for the crawl's hot path.
+
+    Stages are timed with `with metrics.timer("fetch"): ...`. While disabled,
+    `timer` returns a shared no-op context and `observe`/`inc` return at once,
+    so instrumentation costs next to nothing. Results are served as Prometheus
+    text (`serve`) or logged periodically (`dump_periodically`).
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED, prefix="crawler"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.histograms = {}  # stage -> Histogram
+        self.counters = {}  # name -> count
+        self.lock = threading.Lock()
+        self.server = None
+
+    def timer(self, stage):
+        """Return a context manager that times one run of a stage."""
+        return _Timer(self, stage) if self.enabled else _DISABLED_TIMER
+
+    def observe(self, stage, seconds):
+        """Record one duration for a stage."""
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name, amount=1):
+        """Add to a counter."""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        name = f"{self.prefix}_stage_seconds"
+        lines = [f"# HELP {name} Time spent in each crawl stage.", f"# TYPE {name} histogram"]
+        with self.lock:
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+            for counter, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {self.prefix}_{counter}_total counter")
+                lines.append(f"{self.prefix}_{counter}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Return a one-line summary: count, mean and ~p99 per stage, then the counters."""
+        with self.lock:
+            stages = [
+                f"{stage}: n={h.count} avg={h.sum / h.count * 1000:.1f}ms p99<={h.quantile(0.99) * 1000:g}ms"
+                for stage, h in sorted(self.histograms.items()) if h.count
+            ]
+            counters = [f"{counter}={value}" for counter, value in sorted(self.counters.items())]
+        return " | ".join(stages + counters)
+
+    def serve(self, port, host="0.0.0.0"):
+        """Serve `render()` over HTTP (any path, e.g. /metrics) from a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True, name="Metrics").start()
+        logging.info(f"📈 Serving metrics on http://{host}:{self.server.server_address[1]}/metrics")
+        return self.server
+
+    def dump_periodically(self, interval, stop_event):
+        """Log `summary()` every `interval` seconds until `stop_event` is set (runs in a daemon thread)."""
+        def dump():
+            while not stop_event.wait(interval):
+                logging.info(f"📈 {self.summary()}")
+
+        thread = threading.Thread(target=dump, daemon=True, name="MetricsDump")
+        thread.start()
+        return thread
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+# Shared by every module in the process
+metrics = Metrics()
+
+# # Example Usage:
+# metrics.enabled = True
+# with metrics.timer("fetch"):
+#     time.sleep(0.01)
+# metrics.inc("pages_crawled")
+# print(metrics.render())
@@ -0,0 +1,218 @@
+import codecs
+import hashlib
+import time
+import httpx
+from bs4 import BeautifulSoup
+from src.Metrics import metrics
+from config.config import (
+    REQUEST_TIMEOUT, USER_AGENT, PARSER_BACKEND, MAX_PAGE_BYTES, MAX_DOWNLOAD_SECONDS
+)
+
+
+def resolve_parser(backend: str = PARSER_BACKEND) -> str:
+    """Return the BeautifulSoup parser for a PARSER_BACKEND setting."""
+    if backend != "auto":
+        return backend
+    try:
+        import lxml  # noqa: F401  C parser, several times faster than html.parser
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+PARSER = resolve_parser()
+
+
+def is_html_response(response: httpx.Response) -> bool:
+    """Check from its headers alone if a response is an HTML document."""
+    return "text/html" in response.headers.get("Content-Type", "").lower()
+
+
+def conditional_headers(validators: dict | None) -> dict:
+    """Return If-None-Match / If-Modified-Since headers for a page's stored validators."""
+    headers = {}
+    if validators and validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators and validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def hash_text(text: str) -> str:
+    """Return a short digest of a decoded page body."""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+class DownloadAborted(Exception):
+    """Raised when a response body exceeds the size or time limit."""
+
+
+class BodyReader:
+    """Decode a streamed response body chunk by chunk, enforcing size and time limits."""
+
+    def __init__(self, response: httpx.Response, max_bytes=MAX_PAGE_BYTES, max_seconds=MAX_DOWNLOAD_SECONDS):
+        length = response.headers.get("Content-Length", "")
+        if length.isdigit() and int(length) > max_bytes:
+            raise DownloadAborted(f"Content-Length {length} exceeds {max_bytes} bytes")
+
+        try:
+            self.decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        except LookupError:  # Unknown charset in the headers
+            self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.deadline = time.monotonic() + max_seconds
+        self.size = 0
+        self.parts = []
+
+    def feed(self, chunk: bytes):
+        """Decode the next chunk of the (content-decoded) body."""
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise DownloadAborted(f"body exceeds {self.max_bytes} bytes")
+        if time.monotonic() > self.deadline:
+            raise DownloadAborted(f"download took longer than {self.max_seconds}s")
+        self.parts.append(self.decoder.decode(chunk))
+
+    def text(self) -> str:
+        """Return the decoded body."""
+        self.parts.append(self.decoder.decode(b"", final=True))
+        return "".join(self.parts)
+
+
+class Page:
+    """A webpage fetched and parsed once, shared by every extractor.
+
+    Bodies are streamed: non-HTML responses are rejected from their headers
+    without downloading the body, and HTML bodies are decoded as they arrive
+    until MAX_PAGE_BYTES or MAX_DOWNLOAD_SECONDS is exceeded.
+
+    With the `validators` stored by a previous crawl the request is conditional,
+    and a page that comes back 304 or with the same content hash is marked
+    `unchanged` and left unparsed.
+    """
+
+    def __init__(self, url: str, response: httpx.Response | None = None, fetch: bool = True,
+                 text: str | None = None, validators: dict | None = None, client: httpx.Client | None = None):
+        self.url = url
+        self.validators = validators or {}
+        self.client = client  # Pooled client to fetch with; a one-off request if None
+        if response is None and fetch:
+            with metrics.timer("fetch"):
+                response, text = self._fetch()
+        self.response = response
+        self.text = text  # Decoded body; read from `response` if not streamed
+        self.content_hash = hash_text(text) if text is not None else None
+        self.unchanged = self._is_unchanged()
+        self._soup = None
+        self._parsed = False
+
+    @property
+    def soup(self):
+        """The parsed tree, built on first use (so a page handed to ParsePool is never parsed here)."""
+        if not self._parsed:
+            self._parsed = True
+            if not self.unchanged:
+                with metrics.timer("parse"):
+                    self._soup = self._get_soup()
+        return self._soup
+
+    @property
+    def html(self) -> str:
+        """Return the decoded body."""
+        return self.text if self.text is not None else self.response.text
+
+    @staticmethod
+    async def fetch_async(url: str, client: httpx.AsyncClient, validators: dict | None = None):
+        """Stream a webpage with a shared AsyncClient.
+
+        Returns (response, decoded HTML body), with a None body for non-HTML or
+        304 responses and (None, None) if the request fails or is aborted.
+        """
+        try:
+            async with client.stream("GET", url, follow_redirects=True,
+                                     headers=conditional_headers(validators)) as response:
+                if response.status_code == 304:
+                    return response, None
+                response.raise_for_status()
+                if not is_html_response(response):
+                    return response, None  # Rejected from the headers; body never downloaded
+                body = BodyReader(response)
+                async for chunk in response.aiter_bytes():
+                    body.feed(chunk)
+                return response, body.text()
+        except httpx.HTTPStatusError as e:
+            print(f"⚠️ HTTP error {e.response.status_code} for {url}")
+        except httpx.RequestError as e:
+            print(f"⚠️ Error fetching page {url}: {e}")
+        except DownloadAborted as e:
+            print(f"⚠️ Aborted download of {url}: {e}")
+        return None, None
+
+    def _fetch(self):
+        """Stream the webpage using httpx, returning (response, decoded HTML body) like `fetch_async`."""
+        stream = self.client.stream if self.client is not None else httpx.stream
+        try:
+            headers = {"User-Agent": USER_AGENT, **conditional_headers(self.validators)}
+            with stream("GET", self.url, timeout=REQUEST_TIMEOUT, follow_redirects=True,
+                        headers=headers) as response:
+                if response.status_code == 304:
+                    return response, None
+                response.raise_for_status()
+                if not is_html_response(response):
+                    return response, None  # Rejected from the headers; body never downloaded
+                body = BodyReader(response)
+                for chunk in response.iter_bytes():
+                    body.feed(chunk)
+                return response, body.text()
+        except httpx.HTTPStatusError as e:
+            print(f"⚠️ HTTP error {e.response.status_code} for {self.url}")
+        except httpx.RequestError as e:
+            print(f"⚠️ Error fetching page {self.url}: {e}")
+        except DownloadAborted as e:
+            print(f"⚠️ Aborted download of {self.url}: {e}")
+        return None, None
+
+    def _is_unchanged(self) -> bool:
+        """Check if the page is the same as when its validators were stored."""
+        if self.response is None:
+            return False
+        if self.response.status_code == 304:
+            return True
+        stored = self.validators.get("hash")
+        return bool(stored) and self.content_hash == stored
+
+    def get_validators(self) -> dict:
+        """Return the ETag, Last-Modified and content hash to store for the next conditional fetch."""
+        if self.response is None:
+            return {}
+        return {
+            "etag": self.response.headers.get("ETag"),
+            "last_modified": self.response.headers.get("Last-Modified"),
+            "hash": self.content_hash,
+        }
+
+    @property
+    def content_type(self) -> str:
+        """Return the lower-cased Content-Type header of the response."""
+        if self.response is None:
+            return ""
+        return self.response.headers.get("Content-Type", "").lower()
+
+    def is_html(self) -> bool:
+        """Check if the page was fetched and is an HTML document."""
+        return self.response is not None and is_html_response(self.response)
+
+    def _get_soup(self):
+        """Parse the response body into a BeautifulSoup object if it's HTML."""
+        if self.response is None:
+            return None
+        if not self.is_html():
+            print(f"Skipping non-HTML content: {self.url} ({self.content_type})")
+            return None
+        return BeautifulSoup(self.html, PARSER)
+
+# # Example Usage:
+# page = Page("https://www.iitkgp.ac.in/")
+# print(LinkFinder(page.url, page).get_links())
+# print(TitleExtractor(page.url, page).get_title())
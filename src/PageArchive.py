@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+import pyarrow as pa
+from config.config import ARCHIVE_DIR, ARCHIVE_SEGMENT_BYTES, WORKER_ID
+
+# Records kept from a response, besides its body
+ARCHIVED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def encode_record(url, status, headers, html):
+    """Return one WARC-style response record: a header block, a blank line and the UTF-8 body."""
+    body = html.encode("utf-8")
+    lines = [
+        "WARC/1.1",
+        "WARC-Type: response",
+        f"WARC-Target-URI: {url}",
+        f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}",
+        f"HTTP-Status: {status}",
+        *(f"{name}: {value}" for name, value in headers.items() if value),
+        f"Content-Length: {len(body)}",
+    ]
+    return "\r\n".join(lines).encode("utf-8") + b"\r\n\r\n" + body + b"\r\n\r\n"
+
+
+def decode_record(data):
+    """Return (headers, html) from a record made by `encode_record`."""
+    head, _, rest = data.partition(b"\r\n\r\n")
+    headers = {}
+    for line in head.decode("utf-8").split("\r\n")[1:]:
+        name, _, value = line.partition(": ")
+        headers[name] = value
+    return headers, rest[:int(headers["Content-Length"])].decode("utf-8")
+
+
+class PageArchive:
+    """Append-only archive of raw HTML responses for offline re-extraction.
+
+    Records go to segment files (`segment-<time>-<worker>-<id>.warc.zst`), each
+    record compressed as its own zstd frame so any one can be read on its own.
+    Next to each segment, an `.idx` file lists every record as
+    `url<TAB>offset<TAB>length<TAB>raw length`. An index line is written only
+    after its record, so a crash never indexes a partial one. Segments roll
+    over at `segment_bytes`. Thread-safe; every process writes its own segments.
+    """
+
+    def __init__(self, archive_dir=ARCHIVE_DIR, segment_bytes=ARCHIVE_SEGMENT_BYTES, worker_id=WORKER_ID):
+        self.archive_dir = archive_dir
+        self.segment_bytes = segment_bytes
+        self.worker_id = worker_id
+        self.codec = pa.Codec("zstd")
+        self.lock = threading.Lock()
+        self.segment = None  # Open segment file
+        self.index = None  # Its open index file
+        os.makedirs(archive_dir, exist_ok=True)
+
+    def _open_segment(self):
+        """Close the current segment, if any, and start a new one (lock held)."""
+        self._close_segment()
+        name = f"segment-{time.time_ns():020d}-{self.worker_id}-{uuid.uuid4().hex[:8]}"
+        self.segment = open(os.path.join(self.archive_dir, f"{name}.warc.zst"), "ab")
+        self.index = open(os.path.join(self.archive_dir, f"{name}.idx"), "a", encoding="utf-8")
+
+    def _close_segment(self):
+        if self.segment is not None:
+            self.segment.close()
+            self.index.close()
+            self.segment = self.index = None
+
+    def add(self, url, html, status=200, headers=None):
+        """Append one page to the archive."""
+        headers = {name: (headers or {}).get(name) for name in ARCHIVED_HEADERS}
+        record = encode_record(url, status, headers, html)
+        compressed = self.codec.compress(record, asbytes=True)
+        with self.lock:
+            if self.segment is None or self.segment.tell() >= self.segment_bytes:
+                self._open_segment()
+            offset = self.segment.tell()
+            self.segment.write(compressed)
+            self.segment.flush()
+            self.index.write(f"{url}\t{offset}\t{len(compressed)}\t{len(record)}\n")
+            self.index.flush()
+
+    def add_page(self, page):
+        """Archive a fetched page's HTML with its status and headers."""
+        self.add(page.url, page.html, page.response.status_code, page.response.headers)
+
+    def close(self):
+        with self.lock:
+            self._close_segment()
+
+    @staticmethod
+    def segments(archive_dir=ARCHIVE_DIR):
+        """Return the segment files in an archive, oldest first (across every worker's segments)."""
+        if not os.path.isdir(archive_dir):
+            return []
+        names = [name for name in os.listdir(archive_dir) if name.startswith("segment-") and name.endswith(".warc.zst")]
+        return [os.path.join(archive_dir, name) for name in sorted(names)]  # Fixed-width time first
+
+    @staticmethod
+    def read_index(segment_path):
+        """Return the (url, offset, length, raw length) entries of a segment, in write order."""
+        index_path = segment_path[:-len(".warc.zst")] + ".idx"
+        entries = []
+        with open(index_path, encoding="utf-8") as index:
+            for line in index:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) == 4:  # Skip a line cut short by a crash
+                    url, offset, length, raw_length = parts
+                    entries.append((url, int(offset), int(length), int(raw_length)))
+        return entries
+
+    @staticmethod
+    def read_records(segment_path, entries):
+        """Yield (url, headers, html) for the given index entries of one segment."""
+        codec = pa.Codec("zstd")
+        with open(segment_path, "rb") as segment:
+            for url, offset, length, raw_length in entries:
+                segment.seek(offset)
+                data = codec.decompress(segment.read(length), decompressed_size=raw_length, asbytes=True)
+                headers, html = decode_record(data)
+                yield url, headers, html
+
+# # Example Usage:
+# archive = PageArchive("data/archive")
+# archive.add("https://www.iitkgp.ac.in/", "<html><title>IIT KGP</title></html>")
+# archive.close()
+# for segment in PageArchive.segments("data/archive"):
+#     for url, headers, html in PageArchive.read_records(segment, PageArchive.read_index(segment)):
+#         print(url, headers["WARC-Date"], len(html))
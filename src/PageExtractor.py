@@ -0,0 +1,104 @@
+from urllib.parse import urljoin
+from bs4 import Tag
+from src.FavIconExtractor import is_favicon_rel
+from src.LinkFinder import LinkFinder
+from src.Metrics import metrics
+from src.Page import Page
+from src.TextExtractor import TextExtractor, HEADING_TAGS, CLEAN_TAGS
+from src.TitleExtractor import TitleExtractor
+
+
+class PageExtractor:
+    """Extract everything Spider stores from a page in one walk over its tree.
+
+    The walk collects the <title>, <a href> and favicon <link> tags, plus the
+    headings and paragraphs outside the tags TextExtractor strips. The stripped
+    tags are then removed and the collected tags handed to the individual
+    extractors, so the results match running each extractor on its own.
+    """
+
+    def __init__(self, url: str, page: Page | None = None):
+        self.url = url
+        self.page = page or Page(url)
+        self.title = "Title Not Found"
+        self.links = set()
+        self.favicon_link = None  # Favicon URL declared in the page's <link> tags
+        self.headings = []
+        self.contents = []
+        self.filters = ["all"]
+        if self.page.soup is not None:
+            self._extract(self.page.soup)
+
+    @staticmethod
+    def _walk(soup):
+        """Collect the tags every extractor needs in document order, in one pass."""
+        found = {"title": None, "anchors": [], "favicon": None, "headings": [], "paragraphs": [], "clean": []}
+        heading_tags, clean_tags = set(HEADING_TAGS), set(CLEAN_TAGS)
+
+        stack = [(child, False) for child in reversed(soup.contents)]
+        while stack:
+            node, stripped = stack.pop()
+            if not isinstance(node, Tag):
+                continue
+
+            name = node.name
+            if name == "title":
+                if found["title"] is None:
+                    found["title"] = node
+            elif name == "a":
+                if node.get("href") is not None:
+                    found["anchors"].append(node)
+            elif name == "link":
+                if found["favicon"] is None and is_favicon_rel(node.get("rel")):
+                    found["favicon"] = node
+
+            # Text only comes from outside the stripped tags (<head>, <footer>, ...)
+            if not stripped:
+                if name in clean_tags:
+                    stripped = True
+                    found["clean"].append(node)
+                elif name in heading_tags:
+                    found["headings"].append(node)
+                elif name == "p":
+                    found["paragraphs"].append(node)
+
+            stack.extend((child, stripped) for child in reversed(node.contents))
+        return found
+
+    def _extract(self, soup):
+        """Fill in every field from a single walk over the page's tree."""
+        with metrics.timer("extract_walk"):
+            found = self._walk(soup)
+
+        with metrics.timer("extract_title"):
+            self.title = TitleExtractor(self.url, self.page).get_title(found["title"])
+        with metrics.timer("extract_links"):
+            self.links = LinkFinder(self.url, self.page, found["anchors"]).get_links()
+        favicon = found["favicon"]
+        if favicon is not None and "href" in favicon.attrs:
+            self.favicon_link = urljoin(self.page.url, favicon["href"])
+
+        # Prune the tree like TextExtractor does, then reuse the collected tags
+        with metrics.timer("extract_text"):
+            for tag in found["clean"]:
+                tag.decompose()
+            text_extractor = TextExtractor(self.url, self.page, clean=False)
+            self.headings = text_extractor.extract_headings(found["headings"])
+            self.contents = text_extractor.extract_contents(found["paragraphs"])
+            self.filters = text_extractor.extract_filters()
+
+    def fields(self) -> dict:
+        """Return the extracted fields as a plain (picklable) dict."""
+        return {
+            "title": self.title,
+            "links": set(self.links),
+            "favicon_link": self.favicon_link,
+            "headings": self.headings,
+            "contents": self.contents,
+            "filters": self.filters,
+        }
+
+# # Example Usage:
+# extracted = PageExtractor("https://www.iitkgp.ac.in/")
+# print(extracted.title, extracted.favicon_link)
+# print(extracted.links, extracted.headings, extracted.filters)
@@ -1,51 +1,197 @@
+import ast
+import json
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import os
-from config.config import DATA_DIR
+import time
+import uuid
+from config.config import DATA_DIR, PARQUET_COMPRESSION, SEARCH_INDEX
 from filelock import FileLock
+from src.SearchIndex import SearchIndex, index_dir_for
+
+# Typed output schema: readers get lists and timestamps without parsing, and can
+# project columns and push filters down. Filter names repeat, so they are dictionary-encoded.
+SCHEMA = pa.schema([
+    ("url", pa.string()),
+    ("favicon", pa.string()),
+    ("title", pa.string()),
+    ("headings", pa.list_(pa.string())),
+    ("content", pa.list_(pa.string())),
+    ("filters", pa.list_(pa.dictionary(pa.int32(), pa.string()))),
+    ("duplicate_of", pa.string()),
+    ("timestamp", pa.timestamp("us")),
+])
+COLUMNS = SCHEMA.names
+LIST_COLUMNS = ["headings", "content", "filters"]
+
+
+def as_list(value):
+    """Return a cell as a list of strings, parsing the JSON (or repr) text older files stored."""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return []
+    if isinstance(value, str):
+        if not value:
+            return []
+        try:
+            value = json.loads(value)
+        except ValueError:
+            try:
+                value = ast.literal_eval(value)  # A list stored with str()
+            except (ValueError, SyntaxError):
+                return [value]  # A bare value like "all"
+        if not isinstance(value, (list, tuple, set)):
+            return [str(value)]
+    return [str(item) for item in value]
+
+
+def is_typed(schema: pa.Schema) -> bool:
+    """Check if a file's schema already has list columns and a timestamp type."""
+    names = set(schema.names)
+    return (all(name in names and pa.types.is_list(schema.field(name).type) for name in LIST_COLUMNS)
+            and "timestamp" in names and pa.types.is_timestamp(schema.field("timestamp").type))
+
+
+def conform(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of a DataFrame with every column of SCHEMA, converting legacy text columns."""
+    df = df.copy()
+    for name in COLUMNS:
+        if name not in df.columns:
+            df[name] = [[] for _ in range(len(df))] if name in LIST_COLUMNS else None
+    for name in LIST_COLUMNS:
+        df[name] = df[name].map(as_list)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce").astype("datetime64[us]")
+    for name in ("url", "favicon", "title", "duplicate_of"):
+        df[name] = df[name].fillna("").astype(str)
+    return df[COLUMNS]
+
+
+def to_table(df: pd.DataFrame) -> pa.Table:
+    """Convert records to an Arrow table with the output SCHEMA."""
+    return pa.Table.from_pandas(conform(df), schema=SCHEMA, preserve_index=False)
+
 
 class ParquetManager:
-    def __init__(self, file_path):
+    """Append-only Parquet dataset: a compacted base file plus one part file per write.
+
+    Writes never read existing data, so they cost the same however large the
+    dataset grows. Duplicate URLs are dropped when reading and when `compact`
+    folds the part files back into the base file. Files use the typed SCHEMA;
+    files from older versions (JSON text columns) are converted when read and
+    rewritten by `migrate`. With `search_index`, every write also appends its
+    rows to the dataset's SearchIndex.
+    """
+
+    def __init__(self, file_path, compression=PARQUET_COMPRESSION, search_index=SEARCH_INDEX):
         self.file_path = file_path
+        self.compression = compression
+        self.parts_dir = f"{os.path.splitext(file_path)[0]}_parts"
+        self.index_dir = index_dir_for(file_path) if search_index else None
         self.lock_path = f"{file_path}.lock"
         self.check_dir_file()
 
     def check_dir_file(self):
-        """Ensure the data directory and Parquet file exist."""
+        """Ensure the data directory, parts directory and base Parquet file exist."""
         os.makedirs(DATA_DIR, exist_ok=True)
+        os.makedirs(self.parts_dir, exist_ok=True)
         if not os.path.exists(self.file_path):
-            empty_df = pd.DataFrame(columns=["url", "favicon", "title", "headings", "content", "filters", "timestamp"])
-            empty_df.to_parquet(self.file_path, engine="pyarrow", compression="snappy")
+            self._write(SCHEMA.empty_table(), self.file_path)
             print("✅ Created empty Parquet file.")
 
+    def _write(self, table, path):
+        """Write an Arrow table to `path` through a temporary file, so readers never see it half-written."""
+        tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+        pq.write_table(table, tmp_path, compression=self.compression)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read_file(path):
+        """Read one Parquet file into a DataFrame with the output columns, converting legacy files."""
+        table = pq.read_table(path)
+        df = table.to_pandas()
+        return df if is_typed(table.schema) else conform(df)
+
     def _read_data(self):
-        """Read data from Parquet file if it exists, otherwise return an empty DataFrame."""
+        """Read the compacted base file if it exists, otherwise return an empty DataFrame."""
         if os.path.exists(self.file_path):
             try:
-                return pd.read_parquet(self.file_path, engine="pyarrow")
+                return self._read_file(self.file_path)
             except Exception as e:
                 print(f"⚠️ Error reading Parquet file: {e}. Resetting file.")
                 self.check_dir_file()
-        return pd.DataFrame(columns=["url", "favicon", "title", "headings", "content", "filters", "timestamp"])
+        return SCHEMA.empty_table().to_pandas()
+
+    def _list_parts(self):
+        """Return the finished part files, oldest first."""
+        if not os.path.isdir(self.parts_dir):
+            return []
+        return sorted(
+            os.path.join(self.parts_dir, name)
+            for name in os.listdir(self.parts_dir)
+            if name.startswith("part-") and name.endswith(".parquet")
+        )
+
+    def _combine(self, parts):
+        """Concatenate the base file with the given part files, keeping the newest row per URL."""
+        frames = [self._read_data()] + [self._read_file(part) for part in parts]
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            return SCHEMA.empty_table().to_pandas()
+        df_combined = pd.concat(frames, ignore_index=True)
+        df_combined.drop_duplicates(subset=["url"], keep="last", inplace=True)  # Parts sort oldest first
+        return df_combined.reset_index(drop=True)
+
+    def read_data(self):
+        """Read the whole dataset (base file and part files), deduplicated by URL."""
+        return self._combine(self._list_parts())
 
     def write_data(self, new_data):
-        """Append new data only if it doesn't already exist in the Parquet file."""
+        """Append new data as a new part file without touching existing data."""
         if new_data.empty:
             print("⚠️ No data to write. Skipping operation.")
             return
 
-        with FileLock(self.lock_path):  # Prevent concurrent writes
-            df_existing = self._read_data()
-            df_combined = pd.concat([df_existing, new_data], ignore_index=True)
-            
-            # Drop duplicates based on URL
-            df_combined.drop_duplicates(subset=["url"], keep="first", inplace=True)
-            
-            if len(df_combined) == len(df_existing):
-                print("✅ Data already exists. Skipping write operation.")
-                return
-            
-            df_combined.to_parquet(self.file_path, engine="pyarrow", compression="snappy")
-            print("✅ Data written successfully.")
+        # Unique, time-ordered name; compaction only lists finished parts
+        name = f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+        table = to_table(new_data)
+        self._write(table, os.path.join(self.parts_dir, name))
+        print("✅ Data written successfully.")
+
+        if self.index_dir is not None:
+            try:
+                SearchIndex.append(self.index_dir, table.to_pylist())
+            except OSError as e:
+                print(f"⚠️ Failed to index written rows: {e}")  # `python search.py --rebuild` catches up
+
+    def compact(self):
+        """Fold all finished part files into the base file, dropping duplicate URLs."""
+        with FileLock(self.lock_path):  # Only one compaction at a time; writers never wait
+            parts = self._list_parts()
+            if not parts:
+                return 0
+
+            df_combined = self._combine(parts)
+            self._write(pa.Table.from_pandas(df_combined, schema=SCHEMA, preserve_index=False), self.file_path)
+
+            for part in parts:
+                os.remove(part)
+            print(f"🗜️ Compacted {len(parts)} part files into {self.file_path} ({len(df_combined)} rows).")
+            return len(parts)
+
+    def migrate(self):
+        """Rewrite base and part files written by older versions with the typed schema and codec.
+
+        Returns the number of files rewritten.
+        """
+        with FileLock(self.lock_path):
+            migrated = 0
+            for path in [self.file_path, *self._list_parts()]:
+                if not os.path.exists(path) or is_typed(pq.read_schema(path)):
+                    continue
+                self._write(to_table(pd.read_parquet(path, engine="pyarrow")), path)
+                migrated += 1
+                print(f"🔧 Migrated {path} to the typed schema.")
+            return migrated
 
 # # Example Usage
 # if __name__ == "__main__":
@@ -55,11 +201,12 @@ class ParquetManager:
 #         "url": "https://www.example.com",
 #         "favicon": "https://www.example.com/favicon.ico",
 #         "title": "Example Domain",
-#         "headings": json.dumps(["Heading 1", "Heading 2"]),
-#         "content": json.dumps(["Content paragraph 1", "Content paragraph 2"]),
-#         "filters": "all",
+#         "headings": ["Heading 1", "Heading 2"],
+#         "content": ["Content paragraph 1", "Content paragraph 2"],
+#         "filters": ["all"],
 #         "timestamp": pd.Timestamp.now()
 #     }])
-#     pm.write_data(new_data)  # Writes only if new_data isn't already in the file
-#     df = pm._read_data()
-#     print(df)
\ No newline at end of file
+#     pm.write_data(new_data)  # Appends a new part file
+#     pm.compact()  # Folds part files into data.parquet, dropping duplicate URLs
+#     df = pm.read_data()
+#     print(df)
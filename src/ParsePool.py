@@ -0,0 +1,93 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import httpx
+from src.Metrics import metrics
+from src.Page import Page
+from src.PageExtractor import PageExtractor
+from src.SimHash import simhash
+from config.config import PARSE_PROCESSES, PARSE_QUEUE_SIZE, NEAR_DUPLICATES
+
+
+def extract_html(url, html, content_type="text/html"):
+    """Parse a page's HTML and run the extractors without the network (safe to run in a worker process).
+
+    Returns PageExtractor's fields plus the content's SimHash `fingerprint`, or
+    None if the body isn't HTML.
+    """
+    response = httpx.Response(200, headers={"Content-Type": content_type}, request=httpx.Request("GET", url))
+    page = Page(url, response, fetch=False, text=html)
+    if page.soup is None:
+        return None
+    fields = PageExtractor(url, page).fields()
+    fields["fingerprint"] = simhash("\n".join(fields["contents"])) if NEAR_DUPLICATES != "off" else None
+    return fields
+
+
+class ParsePool:
+    """Parse and extract fetched pages on worker processes, so fetching never waits on the GIL.
+
+    `submit` hands a page's HTML to a process and returns at once. Each result
+    is passed to its callback on one of `result_threads` store threads (Redis,
+    favicons, the result sink). At most `max_pending` pages are in the pipeline,
+    parsing or waiting to be stored; past that `submit` blocks, so fetchers slow
+    down to what the parsers keep up with.
+    """
+
+    def __init__(self, processes=PARSE_PROCESSES, max_pending=PARSE_QUEUE_SIZE, result_threads=None):
+        # Spawned, not forked: the crawler's threads may hold locks at fork time
+        self.executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+        self.results = ThreadPoolExecutor(max_workers=result_threads or processes, thread_name_prefix="Store")
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.changed = threading.Condition()
+        self.pending = 0  # Pages submitted and not yet stored
+
+    def submit(self, url, html, content_type, callback):
+        """Queue a page for extraction; `callback(fields, error)` gets `extract_html`'s result or its exception."""
+        if not self.slots.acquire(blocking=False):
+            with metrics.timer("parse_backpressure"):
+                self.slots.acquire()
+        with self.changed:
+            self.pending += 1
+        submitted = time.perf_counter()
+        try:
+            future = self.executor.submit(extract_html, url, html, content_type)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda done: self.results.submit(self._deliver, done, callback, submitted))
+
+    def _deliver(self, future, callback, submitted):
+        """Pass one finished extraction to its callback (on a store thread)."""
+        metrics.observe("parse_pool", time.perf_counter() - submitted)
+        try:
+            error = future.exception()
+            callback(None if error else future.result(), error)
+        except Exception as e:
+            print(f"❌ Error storing a parsed page: {e}")
+        finally:
+            self._release()
+
+    def _release(self):
+        with self.changed:
+            self.pending -= 1
+            self.changed.notify_all()
+        self.slots.release()
+
+    def drain(self, timeout=None):
+        """Wait until every submitted page is stored; return False on timeout."""
+        with self.changed:
+            return self.changed.wait_for(lambda: self.pending == 0, timeout)
+
+    def close(self):
+        """Store every page still in the pipeline, then stop the processes and store threads."""
+        self.drain()
+        self.executor.shutdown()
+        self.results.shutdown()
+
+# # Example Usage:
+# pool = ParsePool(processes=4)
+# pool.submit("https://www.iitkgp.ac.in/", "<html><title>IIT KGP</title></html>", "text/html",
+#             lambda fields, error: print(error or fields["title"]))
+# pool.close()
@@ -0,0 +1,49 @@
+from urllib.parse import urlsplit
+
+# Frontier scores: lower is crawled sooner. A score is `level * LEVEL + discovered_at`,
+# so URLs are ordered by level first and by discovery time within a level.
+LEVEL = 1e10  # Seconds; larger than any Unix timestamp
+
+SCORERS = {}
+
+
+def scorer(name):
+    """Register a scoring function `(url, depth, discovered_at) -> score` under a PRIORITY name."""
+    def register(func):
+        SCORERS[name] = func
+        return func
+    return register
+
+
+def get_scorer(priority):
+    """Return the scoring function for a PRIORITY setting (a registered name or a callable)."""
+    if callable(priority):
+        return priority
+    try:
+        return SCORERS[priority]
+    except KeyError:
+        raise ValueError(f"Unknown PRIORITY {priority!r}; choose one of {sorted(SCORERS)}") from None
+
+
+@scorer("fifo")
+def fifo(url, depth, discovered_at):
+    """Discovery order, like a plain queue."""
+    return discovered_at
+
+
+@scorer("depth")
+def breadth_first(url, depth, discovered_at):
+    """Shallower pages first (breadth-first), in discovery order."""
+    return depth * LEVEL + discovered_at
+
+
+@scorer("shallow-path")
+def shallow_path(url, depth, discovered_at):
+    """Like "depth", also demoting long paths and query strings (calendars, pagination, filters)."""
+    parts = urlsplit(url)
+    segments = len([segment for segment in parts.path.split("/") if segment])
+    return (depth + segments + (2 if parts.query else 0)) * LEVEL + discovered_at
+
+# # Example Usage:
+# score = get_scorer("shallow-path")
+# print(score("https://www.iitkgp.ac.in/events/2024/01?page=3", 2, 1_700_000_000))
@@ -1,5 +1,115 @@
+import re
+import time
 import redis
-from config.config import START_URL
+from config.config import (
+    START_URL, REDIS_HOST, REDIS_PORT, REDIS_PASSWORD, WORKER_ID, HASH_URL_KEYS, RECRAWL_INTERVAL,
+    RECRAWL_MIN_INTERVAL, RECRAWL_MAX_INTERVAL, RECRAWL_LEASE, WORKER_LEASE, HOST_SHARDS, MAX_FETCH_RETRIES, PRIORITY, MAX_DEPTH, PATH_CAPS
+)
+from src.BloomFilter import url_digest, url_key
+from src.HashRing import HashRing
+from src.HostScheduler import get_host
+from src.Priority import get_scorer
+from src.UrlCanonicalizer import canonicalize, dedupe_key
+
+
+# Enqueue every URL that is neither crawled nor already queued, unless its path pattern has
+# reached its cap, in one round trip. Queues are sorted sets, lowest score first.
+# KEYS: queue_set, crawled, frontier_meta, path_caps, then the queues. ARGV: depth, discovery
+# time, then (set member, normalized URL, queue index in KEYS, score, path pattern, cap)
+# sextets, with an empty pattern for uncapped URLs. Returns the URLs added.
+ADD_QUEUE_URLS_SCRIPT = """
+local added, meta = {}, ARGV[1] .. ':' .. ARGV[2]
+for i = 3, #ARGV, 6 do
+    local member, url, pattern = ARGV[i], ARGV[i + 1], ARGV[i + 4]
+    local capped = pattern ~= '' and tonumber(redis.call('HGET', KEYS[4], pattern) or '0') >= tonumber(ARGV[i + 5])
+    if not capped and redis.call('SISMEMBER', KEYS[2], member) == 0 and redis.call('SADD', KEYS[1], member) == 1 then
+        redis.call('ZADD', KEYS[tonumber(ARGV[i + 2])], ARGV[i + 3], url)
+        redis.call('HSET', KEYS[3], member, meta)
+        if pattern ~= '' then
+            redis.call('HINCRBY', KEYS[4], pattern, 1)
+        end
+        added[#added + 1] = url
+    end
+end
+return added
+"""
+
+# Move up to ARGV[1] URLs into a processing list, lowest score first across all the queues.
+# KEYS: processing list, then the queues to claim from. Returns (URL, score) pairs, flattened.
+CLAIM_URLS_SCRIPT = """
+local count, claimed, heads = tonumber(ARGV[1]), {}, {}
+for i = 2, #KEYS do
+    local head = redis.call('ZRANGE', KEYS[i], 0, 0, 'WITHSCORES')
+    if head[1] then
+        heads[#heads + 1] = {KEYS[i], tonumber(head[2])}
+    end
+end
+while #claimed < 2 * count and #heads > 0 do
+    local best = 1
+    for j = 2, #heads do
+        if heads[j][2] < heads[best][2] then best = j end
+    end
+    local key = heads[best][1]
+    local popped = redis.call('ZPOPMIN', key)
+    redis.call('RPUSH', KEYS[1], popped[1])
+    claimed[#claimed + 1] = popped[1]
+    claimed[#claimed + 1] = popped[2]
+    local head = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    if head[1] then
+        heads[best][2] = tonumber(head[2])
+    else
+        table.remove(heads, best)
+    end
+end
+return claimed
+"""
+
+# Move URLs out of a processing list back to their queues with their scores. Each URL is
+# only moved if it's still in the list, so concurrent reclaimers never duplicate one.
+# KEYS: processing list, then the queues. ARGV: (URL, queue index in KEYS, score) triples.
+# Returns the number moved.
+REQUEUE_URLS_SCRIPT = """
+local moved = 0
+for i = 1, #ARGV, 3 do
+    if redis.call('LREM', KEYS[1], 1, ARGV[i]) == 1 then
+        redis.call('ZADD', KEYS[tonumber(ARGV[i + 1])], ARGV[i + 2], ARGV[i])
+        moved = moved + 1
+    end
+end
+return moved
+"""
+
+# Release a claimed URL whose crawl failed: requeue it with score ARGV[4], or after ARGV[3]
+# retries give up, marking it crawled so it isn't rediscovered and recording it in `failed`.
+# KEYS: processing list, retries, queue, queue_set, crawled, failed. ARGV: URL, set member,
+# max retries, score. Returns the attempts so far, or -1 if the URL was no longer claimed
+# (e.g. reclaimed by another worker).
+RETRY_URL_SCRIPT = """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 0 then
+    return -1
+end
+local attempts = redis.call('HINCRBY', KEYS[2], ARGV[2], 1)
+if attempts <= tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[3], ARGV[4], ARGV[1])
+else
+    redis.call('HDEL', KEYS[2], ARGV[2])
+    redis.call('SREM', KEYS[4], ARGV[2])
+    redis.call('SADD', KEYS[5], ARGV[2])
+    redis.call('HSET', KEYS[6], ARGV[1], attempts)
+end
+return attempts
+"""
+
+# Claim up to ARGV[3] revisits due by ARGV[1], pushing each one's due time to the
+# lease expiry ARGV[2] so a crashed worker's revisits come due again.
+# KEYS: recrawl. Returns the URLs claimed.
+CLAIM_RECRAWLS_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[3]))
+for _, url in ipairs(due) do
+    redis.call('ZADD', KEYS[1], ARGV[2], url)
+end
+return due
+"""
 
 
 class RedisManager:
@@ -8,18 +118,38 @@ class RedisManager:
     def __new__(cls, *args, **kwargs):
         """Ensure only one instance of RedisManager is created."""
         if not cls._instance:
-            cls._instance = super(RedisManager, cls).__new__(cls, *args, **kwargs)
+            cls._instance = super(RedisManager, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self, host="localhost", port=6379, decode_responses=True):
+    def __init__(self, host=REDIS_HOST, port=REDIS_PORT, password=REDIS_PASSWORD, decode_responses=True,
+                 worker_id=WORKER_ID,
+                 hash_url_keys=HASH_URL_KEYS, host_shards=HOST_SHARDS, priority=PRIORITY, max_depth=MAX_DEPTH,
+                 path_caps=PATH_CAPS):
         """Initialize Redis connection."""
         if not hasattr(self, 'r'):  # Avoid reinitializing the connection
+            # Store fixed-width URL hashes instead of full URLs in `crawled` and `queue_set`
+            self.hash_url_keys = hash_url_keys
+            # URLs claimed by this worker are parked here until they are done
+            self.worker_id = worker_id
+            self.processing_key = f"processing:{worker_id}"
+            # Per-host queue shards (`queue:<n>`) instead of one `queue` when set
+            self.host_shards = host_shards
+            # Queues are sorted sets ordered by this score; `frontier_meta` keeps each URL's inputs
+            self.scorer = get_scorer(priority)
+            self.max_depth = max_depth
+            self.path_caps = [(pattern, re.compile(pattern), cap) for pattern, cap in path_caps.items()]
             try:
-                self.r = redis.Redis(host=host, port=port, decode_responses=decode_responses)
+                self.r = redis.Redis(host=host, port=port, password=password, decode_responses=decode_responses)
                 self.r.ping()  # Test connection
                 print("✅ Connected to Redis")
+                self._add_queue_urls = self.r.register_script(ADD_QUEUE_URLS_SCRIPT)
+                self._claim_urls = self.r.register_script(CLAIM_URLS_SCRIPT)
+                self._requeue_urls = self.r.register_script(REQUEUE_URLS_SCRIPT)
+                self._claim_recrawls = self.r.register_script(CLAIM_RECRAWLS_SCRIPT)
+                self._retry_url = self.r.register_script(RETRY_URL_SCRIPT)
 
-                # Ensure START_URL is added if necessary
+                # Convert FIFO queue lists left by older versions, then ensure START_URL
+                self.migrate_list_queues()
                 self.ensure_start_url()
 
             except redis.ConnectionError as e:
@@ -28,71 +158,315 @@ class RedisManager:
 
     def ensure_start_url(self):
         """Ensure START_URL is added if queue and crawled lists are empty."""
-        if not self.get_queue() and not self.get_crawled():
+        if not self.queue_length() and not self.r.scard("crawled"):
             print(f"🏁 No URLs found, adding START_URL: {START_URL}")
             self.add_queue_url(START_URL)
 
+    def migrate_list_queues(self):
+        """Turn queues stored as lists (strict FIFO) into sorted sets, keeping their order at depth 0."""
+        now = time.time()
+        for key in ["queue", *self.r.scan_iter("queue:*")]:
+            if self.r.type(key) != "list":
+                continue
+            urls = self.r.lrange(key, 0, -1)
+            scores = {url: self.scorer(url, 0, now + i * 1e-3) for i, url in enumerate(urls)}
+            with self.r.pipeline() as pipe:
+                pipe.delete(key)
+                if scores:
+                    pipe.zadd(key, scores)
+                pipe.execute()
+            print(f"🔀 Migrated {len(urls)} queued URLs in {key} to a priority queue")
+
+    def queue_key(self, url):
+        """Return the queue a URL is enqueued on: its host's shard, or the one `queue`."""
+        if not self.host_shards:
+            return "queue"
+        return f"queue:{url_digest(get_host(url)) % self.host_shards}"
+
+    def _key_index(self, keys, url):
+        """Return the 1-based KEYS index of a URL's queue for a script call, appending it to `keys` if new."""
+        key = self.queue_key(url)
+        if key not in keys:
+            keys.append(key)
+        return keys.index(key) + 1
+
+    def queue_keys(self, shards=None):
+        """Return the queues of the given shards (default: all of them)."""
+        if not self.host_shards:
+            return ["queue"]
+        return [f"queue:{shard}" for shard in (range(self.host_shards) if shards is None else shards)]
+
+    def queue_length(self):
+        """Return the number of queued URLs across every queue."""
+        with self.r.pipeline(transaction=False) as pipe:
+            for key in self.queue_keys():
+                pipe.zcard(key)
+            return sum(pipe.execute())
+
     def normalize_url(self, url):
-        """Normalize URLs by removing trailing slashes."""
-        if url.endswith('/'):
-            return url.rstrip('/')
-        return url
+        """Normalize URLs with the configured canonicalization rules (see URL_RULES)."""
+        return canonicalize(url)
+
+    def set_member(self, normalized_url):
+        """Return the value stored for a URL in the `crawled` and `queue_set` sets."""
+        key = dedupe_key(normalized_url)
+        return url_key(key) if self.hash_url_keys else key
 
     def is_crawled(self, url):
         """Check if the URL has already been crawled."""
-        return self.r.sismember("crawled", url)
+        return self.r.sismember("crawled", self.set_member(self.normalize_url(url)))
 
     def add_queue_url(self, url):
         """Add a URL to the queue if it's not already queued or crawled."""
-        normalized_url = self.normalize_url(url)
-
-        # Check if the normalized URL is already in the crawled or queue sets
-        if self.is_crawled(normalized_url) or self.r.sismember("queue_set", normalized_url):
+        if not self.add_queue_urls([url]):
             print(f"🔁 Skipping duplicate URL: {url}")
             return False
-
-        with self.r.pipeline() as pipe:
-            pipe.sadd("queue_set", normalized_url)  # Track normalized URL in a set to prevent duplicates
-            pipe.rpush("queue", normalized_url)  # Add to FIFO queue
-            pipe.execute()
         print(f"📌 Added to queue: {url}")
         return True
 
+    def path_cap(self, url):
+        """Return the first PATH_CAPS pattern matching a URL and its cap, or ("", 0)."""
+        for pattern, regex, cap in self.path_caps:
+            if regex.search(url):
+                return pattern, cap
+        return "", 0
+
+    def add_queue_urls(self, urls, depth=0):
+        """Add every URL that's not already queued or crawled in one atomic round trip.
+
+        `depth` is the URLs' distance in links from the start URL; nothing deeper than
+        `max_depth` is enqueued, nor URLs whose path pattern has reached its cap.
+        Returns the list of normalized URLs that were actually added.
+        """
+        if self.max_depth and depth > self.max_depth:
+            return []
+        normalized_urls = list(dict.fromkeys(self.normalize_url(url) for url in urls))
+        if not normalized_urls:
+            return []
+        now = time.time()
+        keys, args = ["queue_set", "crawled", "frontier_meta", "path_caps"], [depth, now]
+        for url in normalized_urls:
+            args.extend((self.set_member(url), url, self._key_index(keys, url), self.scorer(url, depth, now),
+                         *self.path_cap(url)))
+        return self._add_queue_urls(keys=keys, args=args)
+
+    def frontier_meta(self, urls):
+        """Return the (depth, discovery time) recorded for each URL when it was enqueued."""
+        if not urls:
+            return []
+        now = time.time()
+        values = self.r.hmget("frontier_meta", [self.set_member(self.normalize_url(url)) for url in urls])
+        meta = []
+        for value in values:
+            depth, _, discovered_at = (value or "").partition(":")
+            meta.append((int(depth or 0), float(discovered_at or now)))
+        return meta
+
     def add_crawled_url(self, url):
-        """Move a URL from the queue to the crawled set."""
+        """Move a claimed URL to the crawled set."""
+        self.add_crawled_urls([url])
+        print(f"✅ Marked as crawled: {url}")
+
+    def add_crawled_urls(self, urls):
+        """Move claimed URLs to the crawled set in one atomic round trip."""
+        if not urls:
+            return
+        with self.r.pipeline() as pipe:
+            for url in urls:
+                normalized_url = self.normalize_url(url)
+                member = self.set_member(normalized_url)
+                pipe.srem("queue_set", member)  # Remove from queue tracking
+                pipe.sadd("crawled", member)  # Mark as crawled
+                pipe.hdel("retries", member)
+                pipe.lrem(self.processing_key, 1, normalized_url)  # Release the claim, if still held
+            pipe.execute()
+
+    def retry_url(self, url, max_retries=MAX_FETCH_RETRIES):
+        """Release a claimed URL after a failed crawl, requeueing it until it has failed `max_retries` times.
+
+        Returns True if the URL was requeued.
+        """
+        normalized_url = self.normalize_url(url)
+        (depth, _), = self.frontier_meta([normalized_url])
+        attempts = self._retry_url(
+            keys=[self.processing_key, "retries", self.queue_key(normalized_url), "queue_set", "crawled", "failed"],
+            args=[normalized_url, self.set_member(normalized_url), max_retries,
+                  self.scorer(normalized_url, depth, time.time())],  # Behind the URLs found so far
+        )
+        if attempts > max_retries:
+            print(f"💀 Giving up on {url} after {attempts} failed attempts")
+        return 0 < attempts <= max_retries
+
+    def claim_entries(self, count, shards=None):
+        """Atomically move the `count` best-scored queued URLs to this worker's processing list.
+
+        With host shards, `shards` limits the claim to the shards assigned to this worker.
+        Returns (URL, score, depth) tuples, best first.
+        """
+        keys = self.queue_keys(shards)
+        if not keys:
+            return []
+        claimed = self._claim_urls(keys=[self.processing_key, *keys], args=[count])
+        urls, scores = claimed[0::2], claimed[1::2]
+        return [(url, float(score), depth) for url, score, (depth, _) in zip(urls, scores, self.frontier_meta(urls))]
+
+    def describe_urls(self, urls):
+        """Return (URL, score, depth) tuples for URLs claimed outside the queue, e.g. revisits."""
+        return [(url, self.scorer(url, depth, discovered_at), depth)
+                for url, (depth, discovered_at) in zip(urls, self.frontier_meta(urls))]
+
+    def _requeue(self, processing_key, urls=None):
+        """Move URLs in a processing list (all of them by default) back to their queues with their original scores."""
+        if urls is None:
+            urls = self.r.lrange(processing_key, 0, -1)
+        keys, args = [processing_key], []
+        for url, score, _ in self.describe_urls(urls):
+            args.extend((url, self._key_index(keys, url), score))
+        return self._requeue_urls(keys=keys, args=args) if args else 0
+
+    def release_url(self, url):
+        """Return a claimed URL to its queue with its original score, without counting a failed attempt."""
+        return self._requeue(self.processing_key, [self.normalize_url(url)])
+
+    def requeue_processing(self):
+        """Return URLs left in this worker's processing list (e.g. after a crash) to the queue."""
+        requeued = self._requeue(self.processing_key)
+        if requeued:
+            print(f"♻️ Requeued {requeued} unfinished URLs")
+        return requeued
+
+    def heartbeat(self):
+        """Record that this worker is alive."""
+        self.r.zadd("workers", {self.worker_id: time.time()})
+
+    def leave(self):
+        """Remove this worker from the live workers."""
+        self.r.zrem("workers", self.worker_id)
+
+    def live_workers(self, lease=WORKER_LEASE):
+        """Return the IDs of workers that sent a heartbeat within the last `lease` seconds."""
+        return self.r.zrangebyscore("workers", time.time() - lease, "+inf")
+
+    def reclaim_dead_workers(self, lease=WORKER_LEASE):
+        """Requeue the URLs claimed by workers whose heartbeat is older than `lease` seconds."""
+        live = set(self.live_workers(lease))
+        reclaimed = 0
+        for key in list(self.r.scan_iter("processing:*")):
+            worker = key[len("processing:"):]
+            if worker == self.worker_id or worker in live:
+                continue
+            moved = self._requeue(key)
+            self.r.zrem("workers", worker)
+            if moved:
+                print(f"♻️ Reclaimed {moved} URLs from dead worker {worker}")
+            reclaimed += moved
+        return reclaimed
+
+    def busy_workers(self):
+        """Return the other workers that still hold claimed URLs (and may enqueue more)."""
+        return [
+            key[len("processing:"):] for key in self.r.scan_iter("processing:*")
+            if key != self.processing_key and self.r.llen(key)
+        ]
+
+    def assigned_shards(self, lease=WORKER_LEASE):
+        """Return the host shards this worker owns on the consistent-hash ring of live workers."""
+        ring = HashRing({*self.live_workers(lease), self.worker_id})
+        return [shard for shard in range(self.host_shards) if ring.node_for(str(shard)) == self.worker_id]
+
+    def validators_key(self, url):
+        """Return the key of the hash holding a URL's validators and revisit interval."""
+        return f"validators:{self.set_member(self.normalize_url(url))}"
+
+    def get_validators(self, url):
+        """Return the stored ETag, Last-Modified and content hash of a crawled URL."""
+        return self.r.hgetall(self.validators_key(url))
+
+    def record_visit(self, url, changed, validators, min_interval=RECRAWL_MIN_INTERVAL,
+                     max_interval=RECRAWL_MAX_INTERVAL):
+        """Store a crawled URL's validators and schedule its next revisit.
+
+        The revisit interval starts at RECRAWL_INTERVAL, then halves after a
+        visit that found the page changed and doubles after one that didn't.
+        """
+        key = self.validators_key(url)
+        interval = self._next_interval(key, changed, min_interval, max_interval)
+        fields = {name: value for name, value in validators.items() if value}
+        with self.r.pipeline() as pipe:
+            pipe.hset(key, mapping={**fields, "interval": interval})
+            pipe.hdel(key, "failures")
+            pipe.zadd("recrawl", {self.normalize_url(url): time.time() + interval})
+            pipe.execute()
+        return interval
+
+    def _next_interval(self, key, changed, min_interval, max_interval):
+        """Return a page's next revisit interval from the one stored in its validators hash."""
+        interval = float(self.r.hget(key, "interval") or 0)
+        if not interval:
+            return RECRAWL_INTERVAL
+        if changed:
+            return max(min_interval, interval / 2)
+        return min(max_interval, interval * 2)
+
+    def fail_revisit(self, url, max_failures=MAX_FETCH_RETRIES, max_interval=RECRAWL_MAX_INTERVAL):
+        """Back off a revisit that failed or found no HTML page, doubling its interval.
+
+        After `max_failures` such revisits in a row the URL is dropped from
+        `recrawl` and recorded in `failed`. Returns True if it is still scheduled.
+        """
+        key = self.validators_key(url)
         normalized_url = self.normalize_url(url)
+        failures = self.r.hincrby(key, "failures", 1)
         with self.r.pipeline() as pipe:
-            pipe.srem("queue_set", normalized_url)  # Remove from queue tracking
-            pipe.sadd("crawled", normalized_url)  # Mark as crawled
-            pipe.lrem("queue", 0, normalized_url)  # Ensure removal from queue
+            if failures > max_failures:
+                pipe.zrem("recrawl", normalized_url)
+                pipe.hset("failed", normalized_url, failures)
+            else:
+                interval = self._next_interval(key, False, RECRAWL_MIN_INTERVAL, max_interval)
+                pipe.hset(key, "interval", interval)
+                pipe.zadd("recrawl", {normalized_url: time.time() + interval})
             pipe.execute()
-        print(f"✅ Marked as crawled: {url}")
+        if failures > max_failures:
+            print(f"💀 No more revisits of {url} after {failures} failed ones")
+        return failures <= max_failures
+
+    def claim_recrawls(self, count, lease=RECRAWL_LEASE):
+        """Atomically claim up to `count` URLs whose revisit is due."""
+        now = time.time()
+        return self._claim_recrawls(keys=["recrawl"], args=[now, now + lease, count])
 
     def get_queue(self):
-        """Retrieve all queued URLs."""
-        return self.r.lrange("queue", 0, -1)
+        """Retrieve all queued URLs, best-scored first within each queue."""
+        return [url for key in self.queue_keys() for url in self.r.zrange(key, 0, -1)]
 
     def get_crawled(self):
-        """Retrieve all crawled URLs."""
+        """Retrieve all crawled URLs (or their hashes when URL keys are hashed)."""
         return self.r.smembers("crawled")
 
+    def scan_crawled_digests(self, batch_size=10000):
+        """Yield the 64-bit `url_digest` of every crawled URL without loading the whole set."""
+        for member in self.r.sscan_iter("crawled", count=batch_size):
+            yield int(member, 16) if self.hash_url_keys else url_digest(member)
+
     def delete_queue_url(self, url):
-        """Remove a URL from the queue."""
-        normalized_url = self.normalize_url(url)
-        with self.r.pipeline() as pipe:
-            pipe.lrem("queue", 0, normalized_url)
-            pipe.srem("queue_set", normalized_url)
-            pipe.execute()
+        """Drop a claimed URL from this worker's processing list without crawling it.
+
+        It stays in `queue_set`, so links to a skipped URL are never enqueued again.
+        """
+        self.r.lrem(self.processing_key, 1, self.normalize_url(url))  # Short list, not the whole queue
         print(f"🗑️ Removed from queue: {url}")
 
     def clear_data(self):
-        """Clear both queue and crawled data."""
-        self.r.delete("queue", "queue_set", "crawled")
+        """Clear queue, processing, crawled, retry, recrawl and near-duplicate data."""
+        self.r.delete("queue", "queue_set", "crawled", "crawled_bloom", "recrawl", "workers",
+                      "retries", "failed", "frontier_meta", "path_caps",
+                      *self.r.scan_iter("queue:*"), *self.r.scan_iter("processing:*"),
+                      *self.r.scan_iter("validators:*"), *self.r.scan_iter("simhash:*"))
         print("🧹 Cleared all Redis data.")
 
     def get_all_data(self):
         """Retrieve all queued and crawled URLs in a single call."""
-        queue_list, crawled_set = self.r.lrange("queue", 0, -1), self.r.smembers("crawled")
+        queue_list, crawled_set = self.get_queue(), self.r.smembers("crawled")
         
         print(f"📜 Queued URLs: {queue_list}")
         print(f"✅ Crawled URLs: {crawled_set}")
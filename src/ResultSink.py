@@ -0,0 +1,84 @@
+import threading
+import time
+import pandas as pd
+from src.Metrics import metrics
+from config.config import SINK_MAX_ROWS, SINK_MAX_BYTES, SINK_FLUSH_SECONDS
+
+
+class ResultSink:
+    """Buffer extracted records in memory and write them to Parquet in batches.
+
+    The buffer is flushed when it holds `max_rows` records or roughly `max_bytes`
+    of text, when it is older than `max_seconds`, and on `close`. After each
+    successful write, `on_flush` (if given) is called with the written records,
+    e.g. to checkpoint them as crawled only once they are safely on disk.
+    """
+
+    def __init__(self, parquet_manager, max_rows=SINK_MAX_ROWS, max_bytes=SINK_MAX_BYTES,
+                 max_seconds=SINK_FLUSH_SECONDS, on_flush=None):
+        self.parquet_manager = parquet_manager
+        self.on_flush = on_flush
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+
+        self.records = []
+        self.buffered_bytes = 0
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()  # Guards the buffer
+        self.flush_lock = threading.Lock()  # Keeps flushed batches in order
+
+        self._closed = threading.Event()
+        self._timer = threading.Thread(target=self._flush_periodically, name="ResultSink", daemon=True)
+        self._timer.start()
+
+    def add(self, record):
+        """Buffer one record, flushing if the buffer is full."""
+        with self.lock:
+            self.records.append(record)
+            self.buffered_bytes += sum(len(str(value)) for value in record.values())
+            full = len(self.records) >= self.max_rows or self.buffered_bytes >= self.max_bytes
+
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered records to Parquet as a single batch."""
+        with self.flush_lock:
+            with self.lock:
+                records, self.records = self.records, []
+                self.buffered_bytes = 0
+                self.last_flush = time.monotonic()
+
+            if not records:
+                return 0
+
+            try:
+                with metrics.timer("parquet_write"):
+                    self.parquet_manager.write_data(pd.DataFrame(records))
+            except Exception as e:
+                print(f"❌ Error writing {len(records)} records, keeping them buffered: {e}")
+                with self.lock:
+                    self.records[:0] = records
+                    self.buffered_bytes += sum(len(str(v)) for r in records for v in r.values())
+                return 0
+
+            metrics.inc("rows_written", len(records))
+            print(f"💾 Flushed {len(records)} records.")
+            if self.on_flush is not None:
+                try:
+                    self.on_flush(records)
+                except Exception as e:
+                    print(f"❌ Error checkpointing {len(records)} flushed records: {e}")
+            return len(records)
+
+    def _flush_periodically(self):
+        """Flush the buffer once it has been waiting longer than `max_seconds`."""
+        while not self._closed.wait(min(self.max_seconds, 1.0)):
+            if self.records and time.monotonic() - self.last_flush >= self.max_seconds:
+                self.flush()
+
+    def close(self):
+        """Stop the periodic flush and write out everything still buffered."""
+        self._closed.set()
+        self.flush()
@@ -0,0 +1,126 @@
+import threading
+import time
+import httpx
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+from config.config import USER_AGENT, ROBOTS_TTL, REQUEST_TIMEOUT
+
+# Unreachable robots.txt files are retried sooner than parsed ones expire
+ROBOTS_ERROR_TTL = 300
+
+
+class RobotsManager:
+    """Fetch, parse and cache robots.txt once per host, with a TTL.
+
+    `on_crawl_delay(host, seconds)` is called whenever a host's rules declare a
+    Crawl-delay, so a scheduler can space requests to that host accordingly.
+
+    A robots.txt that can't be fetched (5xx, timeout) disallows everything, but
+    only for ROBOTS_ERROR_TTL, after which it is fetched again. Meanwhile
+    `filter_urls` keeps such a host's links, and `check` reports them as
+    unknown so the crawler can hold them until `retry_after` has passed.
+    """
+
+    def __init__(self, user_agent=USER_AGENT, ttl=ROBOTS_TTL, on_crawl_delay=None, client=None):
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self.on_crawl_delay = on_crawl_delay
+        self.client = client  # Pooled httpx.Client to fetch with, set by the crawler; a one-off request if None
+        self.cache = {}  # "scheme://netloc" -> (RobotFileParser, expiry time)
+        self.lock = threading.Lock()
+        self.host_locks = {}  # One fetch per host even when many threads ask at once
+
+    def _fetch_rules(self, base_url):
+        """Download and parse a host's robots.txt, returning (parser, ttl)."""
+        parser = RobotFileParser(f"{base_url}/robots.txt")
+        parser.unreachable = False  # Rules unknown because the fetch failed
+        ttl = self.ttl
+        get = self.client.get if self.client is not None else httpx.get
+        try:
+            response = get(parser.url, timeout=REQUEST_TIMEOUT, follow_redirects=True,
+                           headers={"User-Agent": self.user_agent})
+            if response.status_code in (401, 403):
+                parser.disallow_all = True
+            elif 400 <= response.status_code < 500:
+                parser.allow_all = True  # No robots.txt: everything is allowed
+            elif response.status_code >= 500:
+                parser.disallow_all = parser.unreachable = True  # Server trouble: back off until retried
+                ttl = min(ttl, ROBOTS_ERROR_TTL)
+            else:
+                parser.parse(response.text.splitlines())
+        except httpx.HTTPError as e:
+            print(f"⚠️ Error fetching {parser.url}: {e}")
+            parser.disallow_all = parser.unreachable = True
+            ttl = min(ttl, ROBOTS_ERROR_TTL)
+
+        parser.modified()  # Marks the rules as read so can_fetch() uses them
+        return parser, ttl
+
+    @staticmethod
+    def _base_url(url):
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def get_rules(self, url):
+        """Return the cached robots.txt rules for a URL's host, fetching them if needed."""
+        parts = urlsplit(url)
+        base_url = self._base_url(url)
+
+        cached = self.cache.get(base_url)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        with self.lock:
+            host_lock = self.host_locks.setdefault(base_url, threading.Lock())
+        with host_lock:
+            cached = self.cache.get(base_url)  # Another thread may have fetched it meanwhile
+            if cached and cached[1] > time.monotonic():
+                return cached[0]
+
+            parser, ttl = self._fetch_rules(base_url)
+            self.cache[base_url] = (parser, time.monotonic() + ttl)
+
+        delay = parser.crawl_delay(self.user_agent)
+        if delay and self.on_crawl_delay and parts.hostname:
+            self.on_crawl_delay(parts.hostname, float(delay))
+        return parser
+
+    def is_allowed(self, url):
+        """Check if robots.txt allows crawling a URL."""
+        return self.get_rules(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url):
+        """Return the Crawl-delay (seconds) declared for a URL's host, if any."""
+        delay = self.get_rules(url).crawl_delay(self.user_agent)
+        return float(delay) if delay else None
+
+    def check(self, url):
+        """Check a URL right before fetching it: True if allowed, False if disallowed,
+        None if its host's robots.txt couldn't be fetched (hold the URL for `retry_after`)."""
+        rules = self.get_rules(url)
+        if rules.unreachable:
+            return None
+        return rules.can_fetch(self.user_agent, url)
+
+    def retry_after(self, url):
+        """Return the seconds until a URL's host's cached rules expire and are fetched again."""
+        cached = self.cache.get(self._base_url(url))
+        return max(0.0, cached[1] - time.monotonic()) if cached else 0.0
+
+    def filter_urls(self, urls):
+        """Return the URLs robots.txt allows crawling, keeping those whose rules couldn't be fetched.
+
+        Links are filtered once, when discovered; a host whose robots.txt is
+        down at that moment has its links kept and checked again by `check`.
+        """
+        allowed = []
+        for url in urls:
+            rules = self.get_rules(url)
+            if rules.unreachable or rules.can_fetch(self.user_agent, url):
+                allowed.append(url)
+        return allowed
+
+# # Example Usage:
+# robots = RobotsManager()
+# print(robots.is_allowed("https://www.iitkgp.ac.in/admin"))
+# print(robots.crawl_delay("https://www.iitkgp.ac.in/"))
@@ -0,0 +1,290 @@
+import heapq
+import json
+import math
+import os
+import re
+import time
+import uuid
+from collections import Counter
+from filelock import FileLock
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or the to was were will with".split()
+)
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    """Return the lower-cased word tokens of a text, without stopwords and single letters."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+
+def index_dir_for(file_path):
+    """Return the index directory kept next to a Parquet dataset (like its `_parts` directory)."""
+    return f"{os.path.splitext(file_path)[0]}_index"
+
+
+def facet_names(filters):
+    """Return a row's filters plus their bare categories ("halls-head" is also under "halls")."""
+    names = set(filters)
+    names.update(name.rsplit("-", 1)[0] for name in filters if name.endswith(("-head", "-cont")))
+    return names
+
+
+def doc_entry(record):
+    """Return the index entry of one output record: its term counts, length and filters."""
+    text = " ".join([record.get("title") or "", *(record.get("headings") or []), *(record.get("content") or [])])
+    terms = Counter(tokenize(text))
+    return {
+        "url": record["url"],
+        "title": record.get("title") or "",
+        "filters": sorted(set(record.get("filters") or [])),
+        "length": sum(terms.values()),
+        "terms": dict(terms),
+    }
+
+
+class Bitmap:
+    """Growable bitmap over document ids, for filter facets."""
+
+    def __init__(self):
+        self.bits = bytearray()
+
+    def add(self, doc_id):
+        byte = doc_id >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(max(byte + 1 - len(self.bits), len(self.bits))))  # Grow by doubling
+        self.bits[byte] |= 1 << (doc_id & 7)
+
+    def discard(self, doc_id):
+        byte = doc_id >> 3
+        if byte < len(self.bits):
+            self.bits[byte] &= ~(1 << (doc_id & 7)) & 0xFF
+
+    def __contains__(self, doc_id):
+        byte = doc_id >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] >> (doc_id & 7) & 1)
+
+    def to_int(self):
+        """Return the bitmap as one integer, so facets AND together in a single C-level step."""
+        return int.from_bytes(self.bits, "little")
+
+    @classmethod
+    def from_int(cls, value):
+        bitmap = cls()
+        bitmap.bits = bytearray(value.to_bytes((value.bit_length() + 7) // 8, "little"))
+        return bitmap
+
+
+class SearchIndex:
+    """Inverted index over the crawl output with BM25 ranking and filter facets.
+
+    Writers append each batch of rows as a segment (`index-<time>-<id>.jsonl`,
+    one document's term counts per line), so an update costs O(batch) however
+    large the index is. Readers load segments into term -> {doc id: term
+    frequency} postings and one bitmap per filter and per category (the
+    filter without its -head/-cont suffix); `refresh` loads only the
+    segments written since. A URL indexed again replaces its earlier document,
+    like the newest row wins in ParquetManager. `compact` folds the segments
+    into one, dropping replaced documents.
+    """
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        self.lock_path = os.path.join(index_dir, ".lock")
+        self._reset()
+
+    def _reset(self):
+        self.postings = {}  # Term -> {doc id: term frequency}
+        self.doc_ids = {}  # URL -> current doc id
+        self.docs = []  # Doc id -> (url, title, terms) or None once replaced
+        self.lengths = []  # Doc id -> document length in tokens
+        self.facets = {}  # Filter -> Bitmap of doc ids
+        self.total_length = 0
+        self.loaded = set()  # Segment names already loaded
+
+    @staticmethod
+    def append(index_dir, records):
+        """Write records as a new segment; return its path (or None for no records)."""
+        entries = [doc_entry(record) for record in records]
+        if not entries:
+            return None
+        os.makedirs(index_dir, exist_ok=True)
+        name = f"index-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.jsonl"
+        return SearchIndex._write_segment(index_dir, name, entries)
+
+    @staticmethod
+    def _write_segment(index_dir, name, entries):
+        """Write a segment through a temporary file, so readers never see it half-written."""
+        path = os.path.join(index_dir, name)
+        tmp_path = os.path.join(index_dir, f".{name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as segment:
+            for entry in entries:
+                segment.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, path)
+        return path
+
+    def segments(self):
+        """Return the segment names in the index, oldest first."""
+        if not os.path.isdir(self.index_dir):
+            return []
+        return sorted(name for name in os.listdir(self.index_dir)
+                      if name.startswith("index-") and name.endswith(".jsonl"))
+
+    def refresh(self):
+        """Load segments written since the last refresh; return the number of documents added."""
+        segments = self.segments()
+        new = [name for name in segments if name not in self.loaded]
+        if self.loaded and new and new[0] < max(self.loaded):
+            # Compacted since: the merged segment replaces ones already loaded, so start over
+            self._reset()
+            new = segments
+
+        added = 0
+        for name in new:
+            try:
+                with open(os.path.join(self.index_dir, name), encoding="utf-8") as segment:
+                    entries = [json.loads(line) for line in segment if line.strip()]
+            except FileNotFoundError:  # Removed by a concurrent compaction
+                self._reset()
+                return self.refresh()
+            for entry in entries:
+                self.add(entry)
+            added += len(entries)
+            self.loaded.add(name)
+        return added
+
+    def add(self, entry):
+        """Index one document entry (see `doc_entry`), replacing any earlier one for its URL."""
+        self.remove(entry["url"])
+        doc_id = len(self.docs)
+        terms = entry["terms"]
+        self.docs.append((entry["url"], entry["title"], tuple(terms)))
+        self.lengths.append(entry["length"])
+        self.total_length += entry["length"]
+        self.doc_ids[entry["url"]] = doc_id
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+        for name in facet_names(entry["filters"]):
+            self.facets.setdefault(name, Bitmap()).add(doc_id)
+
+    def remove(self, url):
+        """Drop a URL's document from the postings and facets."""
+        doc_id = self.doc_ids.pop(url, None)
+        if doc_id is None:
+            return
+        for term in self.docs[doc_id][2]:
+            postings = self.postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self.postings[term]
+        for bitmap in self.facets.values():
+            bitmap.discard(doc_id)
+        self.total_length -= self.lengths[doc_id]
+        self.docs[doc_id] = None
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def _filter_mask(self, filters):
+        """Return a Bitmap of the docs tagged with every filter, or None for no filters."""
+        if not filters:
+            return None
+        mask = None
+        for name in filters:
+            bitmap = self.facets.get(name)
+            if bitmap is None:
+                return Bitmap()
+            mask = bitmap.to_int() if mask is None else mask & bitmap.to_int()
+        return Bitmap.from_int(mask)
+
+    def search(self, query, filters=(), limit=10):
+        """Return the `limit` best BM25 matches for a query as dicts of url, title and score.
+
+        With `filters`, only documents tagged with all of them are returned.
+        """
+        terms = set(tokenize(query))
+        count = len(self.doc_ids)
+        if not terms or not count:
+            return []
+        mask = self._filter_mask(filters)
+        bits = mask.bits if mask is not None else None
+        average_length = self.total_length / count or 1.0
+        # Hot loop: BM25's length norm K1 * (1 - B + B * length / average) split into constants
+        lengths, base, slope = self.lengths, K1 * (1 - B), K1 * B / average_length
+
+        scores = {}
+        get = scores.get
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            weight = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)) * (K1 + 1)
+            for doc_id, frequency in postings.items():
+                if bits is not None and ((doc_id >> 3) >= len(bits) or not bits[doc_id >> 3] >> (doc_id & 7) & 1):
+                    continue
+                scores[doc_id] = get(doc_id, 0.0) + weight * frequency / (frequency + base + slope * lengths[doc_id])
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [{"url": self.docs[doc_id][0], "title": self.docs[doc_id][1], "score": round(score, 4)}
+                for doc_id, score in best]
+
+    def facet_counts(self, filters=()):
+        """Return the number of documents per filter, within the docs tagged with every one of `filters`."""
+        mask = self._filter_mask(filters)
+        mask = mask.to_int() if mask is not None else None
+        counts = {}
+        for name, bitmap in self.facets.items():
+            bits = bitmap.to_int()
+            counts[name] = (bits if mask is None else bits & mask).bit_count()
+        return {name: count for name, count in sorted(counts.items()) if count}
+
+    def compact(self):
+        """Fold every segment into one holding only current documents; return the number merged."""
+        with FileLock(self.lock_path):  # Writers never wait; only one compaction at a time
+            self.refresh()
+            merged = sorted(self.loaded)
+            if len(merged) < 2:
+                return 0
+            entries = []
+            for doc_id in sorted(self.doc_ids.values()):
+                url, title, terms = self.docs[doc_id]
+                entries.append({
+                    "url": url,
+                    "title": title,
+                    "filters": sorted(name for name, bitmap in self.facets.items() if doc_id in bitmap),
+                    "length": self.lengths[doc_id],
+                    "terms": {term: self.postings[term][doc_id] for term in terms},
+                })
+            # Named after the newest merged segment: ".c.jsonl" sorts just BEFORE it ("c" < "j") and
+            # before any written since, which is how refresh() spots a compaction (new[0] < loaded)
+            name = merged[-1][:-len(".jsonl")] + ".c.jsonl"
+            self._write_segment(self.index_dir, name, entries)
+            for old in merged:
+                os.remove(os.path.join(self.index_dir, old))
+            self._reset()
+            self.refresh()
+            print(f"🗜️ Compacted {len(merged)} index segments into {name} ({len(entries)} documents).")
+            return len(merged)
+
+    def rebuild(self, records):
+        """Replace the whole index with the given records; return the number indexed."""
+        with FileLock(self.lock_path):
+            for name in self.segments():
+                os.remove(os.path.join(self.index_dir, name))
+            self._reset()
+            path = self.append(self.index_dir, records)
+            self.refresh()
+            return len(self) if path else 0
+
+# # Example Usage:
+# SearchIndex.append("data/data_index", [{"url": "https://www.iitkgp.ac.in/hall", "title": "Hall Allotment",
+#                                         "headings": [], "content": ["Hall allotment for first years"],
+#                                         "filters": ["halls"]}])
+# index = SearchIndex("data/data_index")
+# index.refresh()
+# print(index.search("hall allotment", filters=["halls"]))
+# print(index.facet_counts())
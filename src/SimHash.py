@@ -0,0 +1,102 @@
+import hashlib
+import re
+import threading
+import numpy as np
+
+WORD_RE = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = 3):
+    """Return the overlapping `size`-word shingles of a text, lower-cased."""
+    words = WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def simhash(text: str, size: int = 3):
+    """Return the 64-bit SimHash of a text's word shingles, or None if it has no words.
+
+    Texts that share most of their shingles get fingerprints a few bits apart.
+    """
+    features = set(shingles(text, size))
+    if not features:
+        return None
+
+    digests = np.frombuffer(
+        b"".join(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest() for feature in features),
+        dtype=np.uint8,
+    ).reshape(len(features), 8)
+    # Per bit position: +1 for every shingle with the bit set, -1 for every shingle without
+    votes = np.unpackbits(digests, axis=1).sum(axis=0, dtype=np.int64) * 2 - len(features)
+    return int.from_bytes(np.packbits(votes > 0).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    """Return the number of differing bits between two fingerprints."""
+    return (a ^ b).bit_count()
+
+
+class SimHashIndex:
+    """Banded LSH index of SimHash fingerprints for finding near-duplicate pages.
+
+    Fingerprints are split into `max_distance + 1` bands, so any two within
+    `max_distance` bits agree on at least one band and share a bucket. Only
+    the fingerprints in a query's buckets are compared. Buckets are kept
+    in-process, or in Redis hashes (`simhash:<band>:<value>`) when a client is
+    given so every worker shares one index.
+    """
+
+    def __init__(self, max_distance=3, redis_client=None):
+        self.max_distance = max_distance
+        self.redis_client = redis_client
+        self.bands = max_distance + 1
+        self.band_bits = -(-64 // self.bands)  # Ceiling division; the last band may be narrower
+        self.buckets = {}  # (band, value) -> {fingerprint: url}
+        self.lock = threading.Lock()
+
+    def _band_keys(self, fingerprint: int):
+        """Return the bucket key of each band of a fingerprint."""
+        mask = (1 << self.band_bits) - 1
+        return [f"simhash:{band}:{(fingerprint >> (band * self.band_bits)) & mask:x}" for band in range(self.bands)]
+
+    def _candidates(self, keys):
+        """Return {fingerprint: url} for every fingerprint sharing a bucket."""
+        if self.redis_client is not None:
+            with self.redis_client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.hgetall(key)
+                buckets = pipe.execute()
+            return {int(fp, 16): url for bucket in buckets for fp, url in bucket.items()}
+
+        with self.lock:
+            return {fp: url for key in keys for fp, url in self.buckets.get(key, {}).items()}
+
+    def find(self, fingerprint: int, exclude=None):
+        """Return the URL of an indexed page within `max_distance` bits, if any (other than `exclude`)."""
+        candidates = self._candidates(self._band_keys(fingerprint))
+        best = None
+        for fp, url in candidates.items():
+            distance = hamming(fingerprint, fp)
+            if distance <= self.max_distance and url != exclude and (best is None or distance < best[0]):
+                best = (distance, url)
+        return best[1] if best else None
+
+    def add(self, fingerprint: int, url: str):
+        """Index a page's fingerprint."""
+        keys = self._band_keys(fingerprint)
+        if self.redis_client is not None:
+            with self.redis_client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.hset(key, f"{fingerprint:016x}", url)
+                pipe.execute()
+            return
+
+        with self.lock:
+            for key in keys:
+                self.buckets.setdefault(key, {})[fingerprint] = url
+
+# # Example Usage:
+# index = SimHashIndex(max_distance=3)
+# index.add(simhash("Admissions open for the autumn semester at all departments"), "https://a/1")
+# print(index.find(simhash("Admissions open for the autumn semester at all departments!")))  # https://a/1
@@ -1,13 +1,24 @@
 import re
-import json
-import pandas as pd
 from datetime import datetime
-from src.FavIconExtractor import FavIconExtractor
-from src.LinkFinder import LinkFinder
+from types import SimpleNamespace
+from src.FavIconExtractor import FavIconExtractor, FavIconCache
+from src.Metrics import metrics
+from src.Page import Page
+from src.PageArchive import PageArchive
+from src.PageExtractor import PageExtractor
+from src.ParsePool import ParsePool
 from src.RedisManager import RedisManager
-from src.TextExtractor import TextExtractor
-from src.TitleExtractor import TitleExtractor
-from src.ParquetManager import ParquetManager
+from src.ParquetManager import ParquetManager, as_list
+from src.ResultSink import ResultSink
+from src.RobotsManager import RobotsManager
+from src.BloomFilter import BloomFilter, RedisBloomFilter
+from src.SimHash import SimHashIndex, simhash
+from src.UrlCanonicalizer import dedupe_key
+from config.config import (
+    SEEN_FILTER, SEEN_FILTER_CAPACITY, SEEN_FILTER_ERROR_RATE, RESPECT_ROBOTS, FAVICON_CACHE_REDIS, RECRAWL,
+    NEAR_DUPLICATES, NEAR_DUPLICATE_DISTANCE, NEAR_DUPLICATE_EXPAND_LINKS, NEAR_DUPLICATE_REDIS, ARCHIVE_PAGES,
+    PARSE_PROCESSES
+)
 
 def is_valid_url(url):
     """Validate URL format."""
@@ -15,78 +26,305 @@ def is_valid_url(url):
 
 class Spider:
     
-    def __init__(self, data_file: str = "data/data.parquet"):
+    def __init__(self, data_file: str = "data/data.parquet", recrawl: bool = RECRAWL,
+                 parse_processes: int = PARSE_PROCESSES):
         self.redis_manager = RedisManager()
+        self.recrawl = recrawl  # Store validators and schedule revisits of crawled pages
+        self.recrawl_urls = set()  # Claimed revisits, crawled again despite being in `crawled`
+        self.depths = {}  # Claimed URL -> its depth, set by the crawler; links are one deeper
         self.parquet_manager = ParquetManager(data_file)
+        self.result_sink = ResultSink(self.parquet_manager, on_flush=self.checkpoint)
+        self.robots_manager = RobotsManager() if RESPECT_ROBOTS else None
+        self.client = None  # Pooled httpx.Client for page fetches, set by the crawler
+        self.defer_url = None  # Callback (url, seconds) holding a claimed URL locally, set by the crawler
+        self.archive = PageArchive() if ARCHIVE_PAGES else None  # Raw HTML for reextract.py
+        self.parse_pool = ParsePool(parse_processes) if parse_processes else None  # Else parsed in-thread
+        self.favicon_cache = FavIconCache(redis_client=self.redis_manager.r if FAVICON_CACHE_REDIS else None)
+        self.simhash_index = None
+        if NEAR_DUPLICATES != "off":
+            self.simhash_index = SimHashIndex(NEAR_DUPLICATE_DISTANCE,
+                                              self.redis_manager.r if NEAR_DUPLICATE_REDIS else None)
 
-        # Cache URLs in memory to reduce Redis calls
-        self.crawled_urls = set(self.redis_manager.get_crawled())
-        self.queue_urls = set(self.redis_manager.get_queue())
+        # Cache URLs in memory to reduce Redis calls. The Redis enqueue script is the
+        # authoritative check, so the exact sets start empty instead of loading every URL.
+        self.crawled_urls = self._load_crawled_urls()
+        # Checking a claimed URL against a shared filter costs a round trip per page; the Redis
+        # scripts never hand out a crawled URL, so only the local caches are checked then
+        self.check_claims = SEEN_FILTER != "redis-bloom"
 
-    def make_json(self, url, favico, title, headings, content, page_filter):
-        """Create a JSON object from extracted data."""
+    def _load_crawled_urls(self):
+        """Build the crawled-URL cache selected by SEEN_FILTER (Bloom filters are warmed from Redis)."""
+        if SEEN_FILTER == "redis-bloom":
+            seen = RedisBloomFilter(self.redis_manager.r, "crawled_bloom",
+                                    SEEN_FILTER_CAPACITY, SEEN_FILTER_ERROR_RATE)
+            if not seen.exists:  # Shared filter persists in Redis; only seed it once
+                batch = []
+                for digest in self.redis_manager.scan_crawled_digests():
+                    batch.append(digest)
+                    if len(batch) >= 10000:
+                        seen.add_digests(batch)
+                        batch = []
+                seen.add_digests(batch)
+            return seen
+
+        if SEEN_FILTER == "bloom":
+            seen = BloomFilter(SEEN_FILTER_CAPACITY, SEEN_FILTER_ERROR_RATE)
+            for digest in self.redis_manager.scan_crawled_digests():
+                seen.add_digest(digest)
+            return seen
+
+        return set()  # Filled as this run crawls; earlier runs' URLs are filtered by Redis
+
+    @staticmethod
+    def make_json(url, favico, title, headings, content, page_filter, duplicate_of=None):
+        """Create an output record (see ParquetManager.SCHEMA) from extracted data."""
         return {
             "url": url,
             "favicon": favico or "",
             "title": title or "",
-            "headings": json.dumps(headings, ensure_ascii=False) if isinstance(headings, list) else str(headings) or "",
-            "content": json.dumps(content, ensure_ascii=False) if isinstance(content, list) else str(content) or "",
-            "filters": page_filter or "all",
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "headings": as_list(headings),
+            "content": as_list(content),
+            "filters": sorted(as_list(page_filter)) or ["all"],
+            "duplicate_of": duplicate_of or "",
+            "timestamp": datetime.now(),
         }
     
-    def crawl_page(self, thread_name, url):
-        """Crawl a webpage, extract data, and store results."""
-        if url in self.crawled_urls:
+    def start_page(self, thread_name, url):
+        """Claim a URL for crawling, returning False if it should be skipped."""
+        if self.check_claims and dedupe_key(url) in self.crawled_urls and url not in self.recrawl_urls:
             print(f"🔁 {url} already crawled.")
-            return  # Skip already crawled URLs
+            self.redis_manager.delete_queue_url(url)  # Release the claim so it isn't requeued
+            self.depths.pop(url, None)
+            return False  # Skip already crawled URLs
         if url.endswith('/home'):
-            return
+            self.redis_manager.delete_queue_url(url)
+            self.depths.pop(url, None)
+            return False
+        if self.robots_manager:
+            with metrics.timer("robots"):
+                allowed = self.robots_manager.check(url)
+            if allowed is None:  # Not a failed fetch: hold it until robots.txt is fetched again
+                self.defer_page(url, self.robots_manager.retry_after(url))
+                return False
+            if not allowed:
+                print(f"🚫 {url} disallowed by robots.txt")
+                self.redis_manager.delete_queue_url(url)
+                self.depths.pop(url, None)
+                return False
 
+        # The claim stays in this worker's processing list until the page is checkpointed
         print(f"🕷️ {thread_name} crawling: {url}")
-        print(f"🔗 Queue: {len(self.queue_urls)} | Crawled: {len(self.crawled_urls)}")
+        return True
 
-        # Remove URL from queue before fetching
-        self.redis_manager.delete_queue_url(url)
-        self.queue_urls.discard(url)
+    def crawl_page(self, thread_name, url):
+        """Crawl a webpage, extract data, and store results."""
+        if not self.start_page(thread_name, url):
+            return
 
         try:
-            # Create extractor instances
-            link_finder = LinkFinder(url)
-            favicon_extractor = FavIconExtractor(url)
-            text_extractor = TextExtractor(url)
-            title_extractor = TitleExtractor(url)
-
-            # Extract Data
-            links = link_finder.get_links()  
-            favico = favicon_extractor.get_favicon()
-            title = title_extractor.get_title()
-            headings = text_extractor.extract_headings()
-            content = text_extractor.extract_contents()
-            page_filter = text_extractor.extract_filters()
+            # Fetch and parse the page once, shared by every extractor
+            page = Page(url, validators=self.get_validators(url), client=self.client)
+        except Exception as e:
+            self.fail_page(url, e)
+            return
 
-            # Store new links in queue
-            for link in links:
-                if link not in self.crawled_urls and is_valid_url(link):
-                    self.redis_manager.add_queue_url(link)
-                    self.queue_urls.add(link)
+        self.process_page(page)
 
-            # Skip empty pages
-            if not title and not headings and not content:
-                print(f"⚠️ Skipping empty page: {url}")
-                return
+    def defer_page(self, url, seconds):
+        """Keep a claimed URL for later without spending its retries (its host's robots.txt is unknown)."""
+        print(f"⏳ robots.txt of {url} is unreachable; retrying in {seconds:.0f}s")
+        if self.defer_url is not None:
+            self.defer_url(url, seconds)  # Still claimed; back in the local scheduler
+            return
+        self.depths.pop(url, None)
+        self.recrawl_urls.discard(url)  # A revisit comes due again when its lease expires
+        self.redis_manager.release_url(url)
+
+    def get_validators(self, url):
+        """Return the validators for a conditional fetch if the URL is being revisited."""
+        if url not in self.recrawl_urls:
+            return None
+        return self.redis_manager.get_validators(url)
+
+    def uncrawled(self, urls):
+        """Return the URLs not known to be crawled, checked in one batch (one round trip for a shared filter)."""
+        keys = [dedupe_key(url) for url in urls]
+        if isinstance(self.crawled_urls, set):
+            return [url for url, key in zip(urls, keys) if key not in self.crawled_urls]
+        return [url for url, seen in zip(urls, self.crawled_urls.contains_many(keys)) if not seen]
 
-            # Save extracted data
-            json_data = self.make_json(url, favico, title, headings, content, page_filter)
-            df = pd.DataFrame([json_data])  # Convert to DataFrame
-            self.parquet_manager.write_data(df)
+    @property
+    def pending_pages(self):
+        """Fetched pages still being parsed or stored by the parse pool."""
+        return self.parse_pool.pending if self.parse_pool is not None else 0
 
-            # Mark the page as crawled
+    def find_near_duplicate(self, url, content, fingerprint=None):
+        """Return the URL of an earlier page with near-identical content, indexing this one if there's none."""
+        if self.simhash_index is None:
+            return None
+        if fingerprint is None:
+            fingerprint = simhash("\n".join(content))
+        if fingerprint is None:
+            return None
+        duplicate_of = self.simhash_index.find(fingerprint, exclude=url)
+        if duplicate_of is None:
+            self.simhash_index.add(fingerprint, url)
+        return duplicate_of
+
+    def mark_crawled(self, url):
+        """Mark a page that produced no row as crawled right away."""
+        with metrics.timer("redis_mark_crawled"):
             self.redis_manager.add_crawled_url(url)
-            self.crawled_urls.add(url)
+        self.crawled_urls.add(dedupe_key(url))
+
+    def checkpoint(self, records):
+        """Mark the pages of records just flushed to Parquet as crawled, releasing their claims."""
+        with metrics.timer("redis_mark_crawled"):
+            self.redis_manager.add_crawled_urls([record["url"] for record in records])
 
+    def fail_page(self, url, error):
+        """Release a page whose crawl failed, to be retried later or given up on."""
+        print(f"❌ Error crawling {url}: {error}")
+        metrics.inc("pages_failed")
+        self.depths.pop(url, None)
+        if url in self.recrawl_urls:
+            self.fail_revisit(url)  # Revisits aren't in the processing list; back them off instead
+            return
+        try:
+            if self.redis_manager.retry_url(url):
+                print(f"🔄 Requeued {url} for another attempt")
+        except Exception as e:
+            print(f"❌ Failed to release {url}: {e}")  # Still claimed; requeued on restart
+
+    def fail_revisit(self, url):
+        """Push back a revisit that produced no page, dropping it after repeated failures."""
+        self.recrawl_urls.discard(url)
+        try:
+            self.redis_manager.fail_revisit(url)
         except Exception as e:
-            print(f"❌ Error crawling {url}: {e}")
+            print(f"❌ Failed to reschedule the revisit of {url}: {e}")  # Due again when its lease expires
+
+    def skip_non_html(self, url):
+        """Mark a page that isn't HTML as crawled, backing off its revisits."""
+        print(f"⚠️ Skipping non-HTML page: {url}")
+        self.mark_crawled(url)
+        if url in self.recrawl_urls:
+            self.fail_revisit(url)
+
+    def process_page(self, page: Page):
+        """Extract data from a fetched page, enqueue its links and store results.
+
+        With a parse pool the page is handed off for parsing and this returns at
+        once; `finish_page` runs when its fields come back.
+        """
+        url = page.url
+        depth = self.depths.pop(url, 0)
+        try:
+            if page.unchanged:
+                # Nothing to parse or write; just push the next revisit further out
+                print(f"♻️ Unchanged since last crawl: {url}")
+                metrics.inc("pages_unchanged")
+                self.mark_crawled(url)
+                self.redis_manager.record_visit(url, False, page.get_validators())
+                self.recrawl_urls.discard(url)
+                return
+
+            if page.response is None:
+                self.fail_page(url, "no response")
+                return
+            is_html = page.is_html() if self.parse_pool is not None else page.soup is not None
+            if not is_html:
+                self.skip_non_html(url)
+                return
+
+            if self.archive is not None:
+                try:
+                    with metrics.timer("archive"):
+                        self.archive.add_page(page)
+                except OSError as e:
+                    print(f"⚠️ Failed to archive {url}: {e}")  # The crawl goes on without it
+
+            if self.parse_pool is not None:
+                self.parse_pool.submit(url, page.html, page.content_type,
+                                       lambda fields, error: self._parsed(page, depth, fields, error))
+                return
+
+            # Extract Data in one walk over the parsed tree
+            with metrics.timer("extract"):
+                extracted = PageExtractor(url, page)
+        except Exception as e:
+            self.fail_page(url, e)
+            return
+
+        self.finish_page(page, depth, extracted)
+
+    def _parsed(self, page, depth, fields, error):
+        """Take a page's fields back from the parse pool (on a store thread)."""
+        if error is not None:
+            self.fail_page(page.url, error)
+        elif fields is None:
+            self.skip_non_html(page.url)
+        else:
+            fingerprint = fields.pop("fingerprint", None)
+            self.finish_page(page, depth, SimpleNamespace(**fields), fingerprint)
+
+    def finish_page(self, page: Page, depth, extracted, fingerprint=None):
+        """Store an extracted page: resolve its favicon, enqueue its links and buffer its row."""
+        url = page.url
+        try:
+            links = extracted.links
+            with metrics.timer("favicon"):
+                favico = FavIconExtractor(url, page, self.favicon_cache, extracted.favicon_link).get_favicon()
+            title = extracted.title
+            headings = extracted.headings
+            content = extracted.contents
+            page_filter = extracted.filters
+
+            with metrics.timer("near_duplicate"):
+                duplicate_of = self.find_near_duplicate(url, content, fingerprint)
+            if duplicate_of:
+                metrics.inc("pages_near_duplicate")
+                print(f"👯 {url} is a near-duplicate of {duplicate_of}")
+                if not NEAR_DUPLICATE_EXPAND_LINKS:
+                    links = set()
+
+            # Store new links in queue
+            new_links = self.uncrawled([link for link in links if is_valid_url(link)])
+            if self.robots_manager:
+                with metrics.timer("robots"):
+                    new_links = self.robots_manager.filter_urls(new_links)
+            if new_links:
+                with metrics.timer("redis_enqueue"):
+                    added = self.redis_manager.add_queue_urls(new_links, depth + 1)
+                metrics.inc("links_enqueued", len(added))
+                print(f"📌 Added {len(added)} of {len(new_links)} links from {url} to queue")
+
+            if self.recrawl:
+                self.redis_manager.record_visit(url, True, page.get_validators())
+                self.recrawl_urls.discard(url)
+
+            if not title and not headings and not content:
+                print(f"⚠️ Skipping empty page: {url}")
+                self.mark_crawled(url)
+            elif duplicate_of and NEAR_DUPLICATES == "skip":
+                self.mark_crawled(url)
+            else:
+                # Buffered and written in batches; `checkpoint` marks it crawled once on disk
+                json_data = self.make_json(url, favico, title, headings, content, page_filter, duplicate_of)
+                self.crawled_urls.add(dedupe_key(url))
+                self.result_sink.add(json_data)
+            metrics.inc("pages_crawled")
+
+        except Exception as e:
+            self.fail_page(url, e)
+
+    def close(self):
+        """Finish pages still being parsed, then flush buffered results (and archived pages) to disk."""
+        if self.parse_pool is not None:
+            self.parse_pool.close()
+        self.result_sink.close()
+        if self.archive is not None:
+            self.archive.close()
 
     def clear_data(self):
         """Clear Redis data."""
@@ -1,57 +1,61 @@
-import httpx
 import re
-from bs4 import BeautifulSoup
+from src.FilterMatcher import FilterMatcher
+from src.Page import Page
+
+
+ANCHOR_WORDS = {word.lower() for word in {"more", "show", "hide", "read", "click", "here", "link", "view", "details", "visit", "website", "download", "apply", "submit", "check", "explore", "register", "help", "feedback", "report", "next", "previous", "proceed", "expand", "collapse", "edit", "checkout"}}
+
+# Filters (corrected hall list and other categories)
+FILTERS = {
+    "halls": {
+        "hall", "hostel", "residence", "atal bihari vajpayee", "azad", "b r ambedkar", "gokhale",
+        "homi j bhabha", "jagdish chandra bose", "nehru", "lalbahadur sastry", "lala lajpat rai",
+        "madan mohan malviya", "megnad saha", "mother teresa", "nivedita", "patel", "radha krishnan",
+        "rani laxmibai", "rajendra prasad", "sam", "savitribai phule", "sarojini naidu", "vsrc",
+        "vidyasagar", "zakir hussain"
+    },
+    "departments": {"department", "dept", "school"},
+    "faculties": {"professor", "faculty", "instructor", "teacher", "ta", "teaching assistant"},
+    "courses": {"course", "subject", "module", "class", "lecture", "lab", "tutorial"},
+    "exams": {"test", "exam", "mid sem", "end sem", "mid-sem", "end-sem", "mid-semester", "end-semester"},
+    "gymkhana": {"gymkhana", "sports", "athletics", "games", "tournament", "competition"},
+    "societies": {"society", "club", "cell"},
+}
+
+# Compiled once per process and shared by every extractor
+FILTER_MATCHER = FilterMatcher(FILTERS)
+
+
+HEADING_TAGS = ["h1", "h2", "h3", "h4", "h5", "h6"]
+CLEAN_TAGS = ["head", "header", "footer", "script", "style", "i"]
 
 
 class TextExtractor:
-    def __init__(self, url: str):
+    def __init__(self, url: str, page: Page | None = None, clean: bool = True):
         self.url = url
-        self.anchor_list = {word.lower() for word in {"more", "show", "hide", "read", "click", "here", "link", "view", "details", "visit", "website", "download", "apply", "submit", "check", "explore", "register", "help", "feedback", "report", "next", "previous", "proceed", "expand", "collapse", "edit", "checkout"}}
-
-        # Filters (corrected hall list and other categories)
-        self.filters = {
-            "halls": {
-                "hall", "hostel", "residence", "atal bihari vajpayee", "azad", "b r ambedkar", "gokhale",
-                "homi j bhabha", "jagdish chandra bose", "nehru", "lalbahadur sastry", "lala lajpat rai",
-                "madan mohan malviya", "megnad saha", "mother teresa", "nivedita", "patel", "radha krishnan",
-                "rani laxmibai", "rajendra prasad", "sam", "savitribai phule", "sarojini naidu", "vsrc",
-                "vidyasagar", "zakir hussain"
-            },
-            "departments": {"department", "dept", "school"},
-            "faculties": {"professor", "faculty", "instructor", "teacher", "ta", "teaching assistant"},
-            "courses": {"course", "subject", "module", "class", "lecture", "lab", "tutorial"},
-            "exams": {"test", "exam", "mid sem", "end sem", "mid-sem", "end-sem", "mid-semester", "end-semester"},
-            "gymkhana": {"gymkhana", "sports", "athletics", "games", "tournament", "competition"},
-            "societies": {"society", "club", "cell"},
-        }
-
-        self.soup = self._get_soup()
-
-    def _get_soup(self):
-        """Fetch the webpage using httpx and return a BeautifulSoup object if it's HTML."""
-        try:
-            response = httpx.get(self.url, timeout=10, follow_redirects=True)
-            response.raise_for_status()
-
-            content_type = response.headers.get("Content-Type", "").lower()
-            if "text/html" not in content_type:
-                print(f"Skipping non-HTML content: {self.url} ({content_type})")
-                return None
-
-            soup = BeautifulSoup(response.text, "html.parser")
-            self._clean_html(soup)
-            return soup
+        self.anchor_list = ANCHOR_WORDS
+        self.filters = FILTERS
+        self._headings = None
+        self._contents = None
+
+        self.page = page or Page(url)
+        self.soup = self._get_soup(clean)
+
+    def _get_soup(self, clean=True):
+        """Return the page's BeautifulSoup object with unnecessary tags removed.
 
-        except httpx.RequestError as e:
-            print(f"Error fetching page: {e}")
-            return None
-        except httpx.HTTPStatusError as e:
-            print(f"HTTP error {e.response.status_code} for {self.url}")
-            return None
+        The cleanup prunes the shared tree in place (including <head>), so other
+        extractors reading the same page must be done with it first. Pass
+        `clean=False` if the tree has already been cleaned (see PageExtractor).
+        """
+        soup = self.page.soup
+        if soup is not None and clean:
+            self._clean_html(soup)
+        return soup
 
     def _clean_html(self, soup):
         """Remove unnecessary HTML tags."""
-        for tag in soup(["head", "header", "footer", "script", "style", "i"]):
+        for tag in soup(CLEAN_TAGS):
             tag.decompose()
 
     def _clean_text(self, text):
@@ -69,13 +73,16 @@ class TextExtractor:
         """Check if a heading is purely numeric or mostly consists of numbers."""
         return text.isdigit() or bool(re.fullmatch(r"[0-9\s|.,-]+", text))
 
-    def extract_headings(self):
+    def extract_headings(self, tags=None):
         """
         Extract and return all clean headings (H1 to H6), skipping:
         - Headings that contain a <button> inside.
         - Headings that are fully numeric or mostly numbers.
         - Duplicate headings.
+        `tags` are heading tags already collected by a tree walk; found with find_all if omitted.
         """
+        if self._headings is not None:
+            return self._headings
         if self.soup is None:
             print("Warning: BeautifulSoup object is not initialized.")
             return []
@@ -83,7 +90,7 @@ class TextExtractor:
         headings_set = set()  # Track unique headings
         extracted_headings = []  # Maintain order
 
-        for tag in self.soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6"]):
+        for tag in self.soup.find_all(HEADING_TAGS) if tags is None else tags:
             if tag.find("button"):  # Skip headings containing a button
                 continue
             
@@ -99,15 +106,19 @@ class TextExtractor:
                 headings_set.add(cleaned_text)
                 extracted_headings.append(cleaned_text)
 
+        self._headings = extracted_headings
         return extracted_headings
 
-    def extract_contents(self):
+    def extract_contents(self, tags=None):
         """
         Extract and return clean paragraphs, skipping:
         - Those with anchor words.
         - Those that are fully numeric or mostly numbers.
         - Duplicate content.
+        `tags` are <p> tags already collected by a tree walk; found with find_all if omitted.
         """
+        if self._contents is not None:
+            return self._contents
         if not self.soup:
             print("Warning: BeautifulSoup object is not initialized.")
             return []
@@ -115,7 +126,7 @@ class TextExtractor:
         contents = set()  # Use a set to store unique content
         extracted_list = []  # Final list to maintain order
 
-        for tag in self.soup.find_all("p"):
+        for tag in self.soup.find_all("p") if tags is None else tags:
             # Skip if any anchor inside contains a skip word
             if any(self._contains_skip_word(a.get_text(strip=True)) for a in tag.find_all("a")):
                 continue
@@ -131,6 +142,7 @@ class TextExtractor:
                 contents.add(cleaned_text)
                 extracted_list.append(cleaned_text)
 
+        self._contents = extracted_list
         return extracted_list
 
 
@@ -143,28 +155,12 @@ class TextExtractor:
         if not headings and not contents:
             return ["all"]
 
-        matched_filters = set()  # Use set to avoid duplicates
-        all_matched = False 
-
-        # First pass: Exact word match in headings (case-insensitive)
-        for category, filter_words in self.filters.items():
-            for heading in headings:
-                for filter_word in filter_words:
-                    if re.search(r'\b' + re.escape(filter_word) + r'\b', heading, re.IGNORECASE):
-                        matched_filters.add(f"{category}-head")
-                        all_matched = True
-
-
-        # Second pass: Check if any filter word exists in full combined text (case-insensitive)
-        full_text = " ".join(contents)
-        for category, filter_words in self.filters.items():
-            for filter_word in filter_words:
-                if re.search(r'\b' + re.escape(filter_word) + r'\b', full_text, re.IGNORECASE):
-                    # add all filters if any filter word is found
-                    matched_filters.add(f"{category}-cont")
-                    all_matched = True
-                
-        if all_matched:
+        # One scan over the headings and one over the combined content; "\n" keeps
+        # separate headings from matching as one phrase
+        matched_filters = {f"{category}-head" for category in FILTER_MATCHER.match("\n".join(headings))}
+        matched_filters |= {f"{category}-cont" for category in FILTER_MATCHER.match(" ".join(contents))}
+
+        if matched_filters:
             matched_filters.add("all")
 
         return list(matched_filters) if matched_filters else ["all"]
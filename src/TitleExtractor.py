@@ -1,34 +1,29 @@
-import httpx
 import re
-from bs4 import BeautifulSoup
+from src.Page import Page
 
 class TitleExtractor:
-    def __init__(self, url: str):
+    def __init__(self, url: str, page: Page | None = None):
         self.url = url
-        self.soup = self._get_soup()
+        self.page = page or Page(url)
+        self.soup = self.page.soup
 
     def clean_title(self, title: str) -> str:
         """Clean the title by removing unwanted characters and special symbols."""
         title = re.sub(r"[:=]", "", title)
         return title.strip()
 
-    def _get_soup(self):
-        """Fetch the webpage using httpx and return a BeautifulSoup object."""
-        try:
-            response = httpx.get(self.url, timeout=10, follow_redirects=True)
-            response.raise_for_status()
-            return BeautifulSoup(response.text, "html.parser")
-        except httpx.RequestError as e:
-            print(f"Error fetching page: {e}")
-            return None
+    def get_title(self, title_tag=None):
+        """Extract and return the cleaned title of the page.
 
-    def get_title(self):
-        """Extract and return the cleaned title of the page."""
+        `title_tag` is the <title> tag already found by a tree walk; looked up if omitted.
+        """
         if not self.soup:
             return "Title Not Found"
         
-        title = self.soup.title.string if self.soup.title else ""
-        return self.clean_title(title)
+        if title_tag is None:
+            title_tag = self.soup.title
+        title = title_tag.string if title_tag else ""
+        return self.clean_title(title or "")
 
 # # Example Usage:
 # if __name__ == "__main__":
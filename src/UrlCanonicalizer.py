@@ -0,0 +1,90 @@
+from functools import lru_cache
+from urllib.parse import urlsplit, urlunsplit
+from config.config import URL_RULES
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "mc_cid", "mc_eid"}
+
+
+class UrlCanonicalizer:
+    """Rewrite URLs into one canonical form so variants of a page dedupe together.
+
+    Each rule in `rules` can be switched off individually:
+    - lowercase_host: `WWW.Example.COM` -> `www.example.com`
+    - strip_default_port: drop `:80` on http and `:443` on https
+    - strip_fragment: drop `#section`
+    - strip_tracking_params: drop `utm_*`, `fbclid`, `gclid`, ... query parameters
+    - sort_query: order query parameters so `?b=2&a=1` == `?a=1&b=2`
+    - strip_trailing_slash: `/about/` -> `/about`
+    - unify_scheme: `dedupe_key` treats http:// and https:// as the same page
+    """
+
+    def __init__(self, rules=None):
+        self.rules = {**URL_RULES, **(rules or {})}
+
+    def canonicalize(self, url: str) -> str:
+        """Return the canonical, still fetchable form of a URL."""
+        try:
+            parts = urlsplit(url.strip())
+            port = parts.port
+        except ValueError:
+            return url  # Malformed netloc or port; leave it alone
+
+        scheme = parts.scheme.lower()
+        userinfo, _, host = parts.netloc.rpartition("@")
+        if port is not None or host.endswith(":"):
+            host = host[:host.rfind(":")]  # Split off the port (also after an IPv6 literal)
+        if self.rules["lowercase_host"]:
+            host = host.lower()
+        if port is not None and not (self.rules["strip_default_port"] and DEFAULT_PORTS.get(scheme) == port):
+            host = f"{host}:{port}"
+        netloc = f"{userinfo}@{host}" if userinfo else host
+
+        query = parts.query
+        if query and (self.rules["strip_tracking_params"] or self.rules["sort_query"]):
+            params = [param for param in query.split("&") if param]
+            if self.rules["strip_tracking_params"]:
+                params = [param for param in params if not self._is_tracking_param(param)]
+            if self.rules["sort_query"]:
+                params.sort()
+            query = "&".join(params)
+
+        path = parts.path
+        if self.rules["strip_trailing_slash"]:
+            path = path.rstrip("/")
+
+        fragment = "" if self.rules["strip_fragment"] else parts.fragment
+        return urlunsplit((scheme, netloc, path, query, fragment))
+
+    def dedupe_key(self, url: str) -> str:
+        """Return the key used to decide whether two URLs are the same page."""
+        url = self.canonicalize(url)
+        if self.rules["unify_scheme"] and url.startswith("http://"):
+            return "https://" + url[len("http://"):]
+        return url
+
+    @staticmethod
+    def _is_tracking_param(param: str) -> bool:
+        """Check if a raw `key=value` query parameter is a tracking parameter."""
+        key = param.split("=", 1)[0].lower()
+        return key.startswith("utm_") or key in TRACKING_PARAMS
+
+
+_default = UrlCanonicalizer()
+
+
+@lru_cache(maxsize=100_000)
+def canonicalize(url: str) -> str:
+    """Canonicalize a URL with the configured URL_RULES (memoized)."""
+    return _default.canonicalize(url)
+
+
+@lru_cache(maxsize=100_000)
+def dedupe_key(url: str) -> str:
+    """Return the dedupe key of a URL under the configured URL_RULES (memoized)."""
+    return _default.dedupe_key(url)
+
+# # Example Usage:
+# print(canonicalize("HTTPS://WWW.IITKGP.ac.in:443/about/?b=2&utm_source=x&a=1#top"))
+# # https://www.iitkgp.ac.in/about?a=1&b=2
+# print(dedupe_key("http://www.iitkgp.ac.in/about/"))  # https://www.iitkgp.ac.in/about
@@ -0,0 +1,63 @@
+import sys
+import os
+import httpx
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.synthetic_site import SiteServer, SyntheticSite
+
+pytest.importorskip("fakeredis")
+
+
+def test_synthetic_site_is_reproducible_and_reachable():
+    site = SyntheticSite(pages=50, fanout=3, error_rate=0.2, hosts=4, seed=7)
+
+    assert site.links == SyntheticSite(pages=50, fanout=3, error_rate=0.2, hosts=4, seed=7).links
+    assert site.failing and 0 not in site.failing
+    reachable, stack = set(), [0]
+    while stack:
+        page = stack.pop()
+        if page not in reachable:
+            reachable.add(page)
+            stack.extend(site.links[page])
+    assert reachable == set(range(50))
+
+
+def test_site_server_answers_as_a_proxy():
+    site = SyntheticSite(pages=10, page_bytes=2000, hosts=2)
+    server = SiteServer(site).start()
+    try:
+        with httpx.Client(proxy=server.proxy_url) as client:
+            page = client.get(site.url(3, server.port))
+            wrong_host = client.get(f"http://{site.host(4)}:{server.port}/page/3")
+    finally:
+        server.stop()
+
+    assert page.status_code == 200 and "<title>Page 3</title>" in page.text
+    assert 1500 < len(page.content) < 2500
+    assert wrong_host.status_code == 404
+
+
+def test_benchmark_crawls_the_whole_site():
+    from benchmarks.crawl_benchmark import run_benchmark
+
+    report = run_benchmark(pages=15, fanout=3, page_bytes=2000, latency=0, error_rate=0, hosts=3, threads=4)
+
+    assert report["crawled"] == 15
+    assert report["pages_per_second"] > 0
+    assert report["latency_p50_ms"] <= report["latency_p99_ms"]
+    assert report["redis_commands_per_page"] > 0
+    assert report["parquet_writes"] >= 1
+
+
+def test_async_engine_crawls_the_same_pages_as_threads():
+    from benchmarks.crawl_benchmark import run_benchmark
+
+    site = dict(pages=40, fanout=3, page_bytes=2000, latency=0.005, error_rate=0.1, hosts=3, seed=3)
+    threads = run_benchmark(engine="threads", threads=4, **site)
+    async_report = run_benchmark(engine="async", threads=4, concurrency=8, **site)
+
+    assert async_report["crawled"] == threads["crawled"] >= 40 - len(SyntheticSite(**{
+        name: site[name] for name in ("pages", "fanout", "error_rate", "hosts", "seed")
+    }).failing)
+    assert async_report["requests"] >= async_report["crawled"]
+    assert async_report["parquet_writes"] >= 1
@@ -0,0 +1,56 @@
+import sys
+import os
+import pytest
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.BloomFilter import BloomFilter, RedisBloomFilter, url_key
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    seen = BloomFilter(capacity=5000, error_rate=0.01)
+    added = [f"https://example.com/page/{i}" for i in range(5000)]
+    seen.update(added)
+
+    assert all(url in seen for url in added)
+    false_positives = sum(f"https://example.com/other/{i}" in seen for i in range(5000))
+    assert false_positives < 5000 * 0.02
+    assert len(seen.bits) < 5000 * 2  # ~1.2 bytes per URL at 1%
+
+
+def test_url_key_is_fixed_width():
+    assert len(url_key("https://example.com")) == 16
+    assert len(url_key("https://example.com/" + "a" * 500)) == 16
+    assert url_key("https://example.com") == url_key("https://example.com")
+
+
+def test_redis_bloom_filter_falls_back_to_bitmap():
+    fakeredis = pytest.importorskip("fakeredis")
+    r = fakeredis.FakeRedis(decode_responses=True)
+
+    seen = RedisBloomFilter(r, "crawled_bloom", capacity=1000, error_rate=0.01)
+    seen.add("https://example.com/a")
+
+    assert not seen.native
+    assert "https://example.com/a" in seen
+    assert "https://example.com/b" not in seen
+    assert len(seen) == 1
+
+    # A second worker sees the same shared filter
+    assert "https://example.com/a" in RedisBloomFilter(r, "crawled_bloom", capacity=1000, error_rate=0.01)
+
+
+def test_contains_many_checks_a_batch_in_one_round_trip():
+    fakeredis = pytest.importorskip("fakeredis")
+    r = fakeredis.FakeRedis(decode_responses=True)
+    seen = RedisBloomFilter(r, "crawled_bloom", capacity=1000, error_rate=0.01)
+    seen.update(["https://example.com/a", "https://example.com/c"])
+    urls = ["https://example.com/a", "https://example.com/b", "https://example.com/c"]
+
+    with patch.object(r, "pipeline", wraps=r.pipeline) as pipeline:
+        assert seen.contains_many(urls) == [True, False, True]
+    assert pipeline.call_count == 1
+    assert seen.contains_many([]) == []
+
+    local = BloomFilter(1000, 0.01)
+    local.update(urls[:1])
+    assert local.contains_many(urls) == [True, False, False]
@@ -0,0 +1,48 @@
+import sys
+import os
+import httpx
+import pytest
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.FavIconExtractor import FavIconCache, FavIconExtractor
+from src.Page import Page
+
+
+def make_page(url, html):
+    return Page(url, httpx.Response(200, headers={"Content-Type": "text/html"}, text=html))
+
+
+@patch("src.FavIconExtractor.is_valid_url", return_value=True)
+def test_favicon_is_resolved_once_per_host(mock_is_valid_url):
+    cache = FavIconCache()
+    first = make_page("https://example.com/a", '<link rel="icon" href="/favicon.ico">')
+    second = make_page("https://example.com/b", '<link rel="icon" href="/other.ico">')
+
+    assert FavIconExtractor(first.url, first, cache).get_favicon() == "https://example.com/favicon.ico"
+    assert FavIconExtractor(second.url, second, cache).get_favicon() == "https://example.com/favicon.ico"
+    mock_is_valid_url.assert_called_once()
+
+
+@patch("src.FavIconExtractor.Page")
+@patch("src.FavIconExtractor.is_valid_url", return_value=False)
+def test_failed_lookups_are_cached(mock_is_valid_url, mock_page):
+    cache = FavIconCache(negative_ttl=60)
+    page = make_page("https://example.com/", '<link rel="icon" href="/missing.ico">')
+
+    assert FavIconExtractor(page.url, page, cache).get_favicon() is None
+    assert FavIconExtractor("https://example.com/other", cache=cache).get_favicon() is None
+    mock_is_valid_url.assert_called_once()
+    mock_page.assert_not_called()  # Cache hit: the page isn't even fetched
+
+
+@patch("src.FavIconExtractor.is_valid_url", return_value=True)
+def test_redis_shares_favicons_across_workers(mock_is_valid_url):
+    fakeredis = pytest.importorskip("fakeredis")
+    r = fakeredis.FakeRedis(decode_responses=True)
+    page = make_page("https://example.com/", '<link rel="shortcut icon" href="/favicon.ico">')
+
+    FavIconExtractor(page.url, page, FavIconCache(redis_client=r)).get_favicon()
+    other_worker = FavIconCache(redis_client=r)
+
+    assert other_worker.get("https://example.com") == (True, "https://example.com/favicon.ico")
+    assert 0 < r.ttl("favicon:https://example.com") <= other_worker.ttl
@@ -0,0 +1,83 @@
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.HostScheduler import HostScheduler
+
+
+def test_limits_in_flight_requests_per_host():
+    scheduler = HostScheduler(max_in_flight=1, min_delay=0)
+    for url in ["https://a.com/1", "https://a.com/2", "https://b.com/1"]:
+        scheduler.put(url)
+
+    first, _ = scheduler.pop_ready()
+    second, _ = scheduler.pop_ready()
+    assert {first, second} == {"https://a.com/1", "https://b.com/1"}
+    assert scheduler.pop_ready() == (None, None)  # a.com is busy, nothing else queued
+
+    scheduler.task_done("https://a.com/1")
+    assert scheduler.pop_ready() == ("https://a.com/2", 0)
+    assert scheduler.pending == 0 and scheduler.unfinished == 2
+
+
+def test_spaces_requests_to_one_host_and_prefers_ready_hosts():
+    scheduler = HostScheduler(max_in_flight=5, min_delay=60)
+    scheduler.put("https://slow.com/1")
+    scheduler.put("https://slow.com/2")
+    scheduler.put("https://fast.com/1")
+
+    dispatched = [scheduler.pop_ready()[0], scheduler.pop_ready()[0]]
+    assert sorted(dispatched) == ["https://fast.com/1", "https://slow.com/1"]
+
+    url, wait = scheduler.pop_ready()
+    assert url is None and 59 < wait <= 60
+    assert not scheduler.has_ready_host()
+
+
+def test_set_delay_overrides_min_delay():
+    scheduler = HostScheduler(max_in_flight=5, min_delay=0)
+    scheduler.set_delay("a.com", 30)
+    scheduler.put("https://a.com/1")
+    scheduler.put("https://a.com/2")
+
+    assert scheduler.pop_ready()[0] == "https://a.com/1"
+    url, wait = scheduler.pop_ready()
+    assert url is None and wait > 29
+
+
+def test_get_blocks_until_url_or_close():
+    scheduler = HostScheduler(max_in_flight=1, min_delay=0)
+    results = []
+    worker = threading.Thread(target=lambda: results.extend([scheduler.get(), scheduler.get()]))
+    worker.start()
+
+    scheduler.put("https://a.com/1")
+    while scheduler.pending:  # Wait for the worker to take it
+        scheduler.wait_for_change(timeout=0.01)
+    scheduler.close()
+    worker.join(timeout=2)
+
+    assert results == ["https://a.com/1", None]
+
+
+def test_dispatches_best_priority_first():
+    scheduler = HostScheduler(max_in_flight=5, min_delay=0)
+    scheduler.put("https://a.com/deep", priority=3)
+    scheduler.put("https://a.com/top", priority=1)
+    scheduler.put("https://b.com/middle", priority=2)
+
+    assert [scheduler.pop_ready()[0] for _ in range(3)] == [
+        "https://a.com/top", "https://b.com/middle", "https://a.com/deep"
+    ]
+
+
+def test_defer_holds_the_host_back():
+    scheduler = HostScheduler(max_in_flight=5, min_delay=0)
+    scheduler.put("https://down.com/1")
+    scheduler.put("https://up.com/1")
+    scheduler.defer("https://down.com/2", 30)
+
+    assert scheduler.pop_ready()[0] == "https://up.com/1"
+    url, wait = scheduler.pop_ready()
+    assert url is None and 29 < wait <= 30
+    assert scheduler.pending == 2
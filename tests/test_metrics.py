@@ -0,0 +1,89 @@
+import sys
+import os
+import threading
+import urllib.request
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.HostScheduler import HostScheduler
+from src.Metrics import Histogram, Metrics
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics(enabled=False)
+    with metrics.timer("fetch"):
+        pass
+    metrics.observe("parse", 0.5)
+    metrics.inc("pages_crawled")
+
+    assert metrics.histograms == {} and metrics.counters == {}
+    assert metrics.timer("fetch") is metrics.timer("parse")  # Shared no-op context
+
+
+def test_timer_and_counters_are_recorded():
+    metrics = Metrics(enabled=True)
+    with metrics.timer("fetch"):
+        pass
+    metrics.observe("fetch", 0.2)
+    metrics.inc("pages_crawled")
+    metrics.inc("pages_crawled", 2)
+
+    assert metrics.histograms["fetch"].count == 2
+    assert metrics.counters == {"pages_crawled": 3}
+    assert "fetch: n=2" in metrics.summary() and "pages_crawled=3" in metrics.summary()
+
+
+def test_histogram_buckets_and_quantile():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]  # Bounds are inclusive, the last slot is +Inf
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(1.0) == float("inf")
+
+
+def test_render_is_prometheus_text():
+    metrics = Metrics(enabled=True)
+    metrics.histograms["fetch"] = Histogram(buckets=(0.1, 1.0))
+    metrics.observe("fetch", 0.5)
+    metrics.inc("pages_crawled")
+    lines = metrics.render().splitlines()
+
+    assert "# TYPE crawler_stage_seconds histogram" in lines
+    assert 'crawler_stage_seconds_bucket{stage="fetch",le="0.1"} 0' in lines
+    assert 'crawler_stage_seconds_bucket{stage="fetch",le="1.0"} 1' in lines
+    assert 'crawler_stage_seconds_bucket{stage="fetch",le="+Inf"} 1' in lines
+    assert 'crawler_stage_seconds_count{stage="fetch"} 1' in lines
+    assert "crawler_pages_crawled_total 1" in lines
+
+
+def test_endpoint_serves_metrics():
+    metrics = Metrics(enabled=True)
+    metrics.inc("pages_crawled")
+    server = metrics.serve(0, host="127.0.0.1")
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert b"crawler_pages_crawled_total 1" in response.read()
+    finally:
+        metrics.close()
+
+
+def test_periodic_dump_stops_with_event():
+    metrics = Metrics(enabled=True)
+    stop = threading.Event()
+    thread = metrics.dump_periodically(0.01, stop)
+    stop.set()
+    thread.join(timeout=1)
+    assert not thread.is_alive()
+
+
+def test_scheduler_records_queue_wait(monkeypatch):
+    metrics = Metrics(enabled=True)
+    monkeypatch.setattr("src.HostScheduler.metrics", metrics)
+    scheduler = HostScheduler(max_in_flight=1, min_delay=0)
+    scheduler.put("https://example.com/a")
+    assert scheduler.pop_ready()[0] == "https://example.com/a"
+
+    assert metrics.histograms["queue_wait"].count == 1
+    assert scheduler.queued_at == {}
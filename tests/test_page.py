@@ -0,0 +1,119 @@
+import sys
+import os
+import asyncio
+import functools
+import httpx
+import pytest
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.Page import Page, BodyReader, DownloadAborted
+
+URL = "https://example.com/page"
+
+
+class ChunkStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Response body served in chunks, recording how many were read."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.read = 0
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+    async def __aiter__(self):
+        for chunk in self:
+            yield chunk
+
+
+def serve(stream, content_type="text/html; charset=utf-8", headers=None):
+    def handler(request):
+        return httpx.Response(200, headers={"Content-Type": content_type, **(headers or {})}, stream=stream)
+    return httpx.MockTransport(handler)
+
+
+def fetch_conditional(transport, validators):
+    client = httpx.Client(transport=transport)
+    stream = lambda method, url, headers=None, **kwargs: client.stream(method, url, headers=headers)
+    with patch("src.Page.httpx.stream", stream):
+        return Page(URL, validators=validators)
+
+
+def fetch(transport):
+    return fetch_conditional(transport, None)
+
+
+def test_streams_and_decodes_split_multibyte_characters():
+    body = "<title>Café — IIT</title>".encode()
+    split = body.index("é".encode()) + 1  # Chunk boundary inside a multi-byte character
+    page = fetch(serve(ChunkStream([body[:split], body[split:]])))
+
+    assert page.text == "<title>Café — IIT</title>"
+    assert page.soup.title.string == "Café — IIT"
+
+
+def test_rejects_non_html_without_reading_the_body():
+    stream = ChunkStream([b"%PDF-1.7", b"..."])
+    page = fetch(serve(stream, content_type="application/pdf"))
+
+    assert stream.read == 0
+    assert page.soup is None and page.text is None
+    assert page.content_type == "application/pdf"
+
+
+def test_aborts_bodies_over_the_size_limit():
+    stream = ChunkStream([b"<p>" + b"x" * 1024] * 10)
+    with patch("src.Page.BodyReader", functools.partial(BodyReader, max_bytes=2048)):
+        page = fetch(serve(stream))
+
+    assert page.response is None and page.soup is None
+    assert stream.read == 2  # Stopped as soon as the limit was crossed
+
+
+def test_aborts_from_content_length_before_reading():
+    response = httpx.Response(200, headers={"Content-Length": "999999"})
+    with pytest.raises(DownloadAborted):
+        BodyReader(response, max_bytes=1000)
+
+
+def test_aborts_slow_downloads():
+    reader = BodyReader(httpx.Response(200), max_seconds=0)
+    with pytest.raises(DownloadAborted):
+        reader.feed(b"late")
+
+
+def test_fetch_async_streams_html():
+    async def run():
+        async with httpx.AsyncClient(transport=serve(ChunkStream([b"<h1>Hi", b"</h1>"]))) as client:
+            return await Page.fetch_async(URL, client)
+
+    response, text = asyncio.run(run())
+    assert text == "<h1>Hi</h1>"
+    assert Page(URL, response, False, text).soup.h1.string == "Hi"
+
+
+def test_conditional_fetch_marks_304_unchanged():
+    seen = {}
+
+    def handler(request):
+        seen.update(request.headers)
+        return httpx.Response(304, headers={"ETag": '"v2"'})
+
+    page = fetch_conditional(httpx.MockTransport(handler), {"etag": '"v1"', "last_modified": "Mon, 01 Jan 2024"})
+
+    assert seen["if-none-match"] == '"v1"' and seen["if-modified-since"] == "Mon, 01 Jan 2024"
+    assert page.unchanged and page.soup is None
+    assert page.get_validators()["etag"] == '"v2"'
+
+
+def test_same_content_hash_is_unchanged_and_not_parsed():
+    html = b"<h1>Same</h1>"
+    first = fetch(serve(ChunkStream([html])))
+    again = fetch_conditional(serve(ChunkStream([html])), first.get_validators())
+    changed = fetch_conditional(serve(ChunkStream([b"<h1>New</h1>"])), first.get_validators())
+
+    assert not first.unchanged and first.soup is not None
+    assert again.unchanged and again.soup is None
+    assert not changed.unchanged and changed.soup.h1.string == "New"
@@ -0,0 +1,67 @@
+import sys
+import os
+import pyarrow.parquet as pq
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.PageArchive import PageArchive
+import reextract
+
+PAGE = "<html><head><title>{title}</title></head><body><h1>Exams</h1><p>Mid-semester exam {title} schedule.</p></body></html>"
+
+
+def test_records_round_trip_through_segments(tmp_path):
+    archive = PageArchive(str(tmp_path), segment_bytes=1)  # Every record starts a new segment
+    archive.add("https://example.com/a", PAGE.format(title="A"), headers={"ETag": '"v1"'})
+    archive.add("https://example.com/ü", "<p>ünïcode</p>")
+    archive.close()
+
+    segments = PageArchive.segments(str(tmp_path))
+    assert len(segments) == 2
+    records = [record for segment in segments
+               for record in PageArchive.read_records(segment, PageArchive.read_index(segment))]
+    assert [(url, html) for url, _, html in records] == [
+        ("https://example.com/a", PAGE.format(title="A")), ("https://example.com/ü", "<p>ünïcode</p>")
+    ]
+    assert records[0][1]["ETag"] == '"v1"' and records[0][1]["HTTP-Status"] == "200"
+
+
+def test_segments_are_ordered_by_time_across_workers(tmp_path):
+    later_worker = PageArchive(str(tmp_path), worker_id="zz-worker")
+    later_worker.add("https://example.com/a", PAGE.format(title="Old"))
+    later_worker.close()
+    earlier_worker = PageArchive(str(tmp_path), worker_id="aa-worker")  # Sorts first by name
+    earlier_worker.add("https://example.com/a", PAGE.format(title="New"))
+    earlier_worker.close()
+
+    segments = [os.path.basename(path) for path in PageArchive.segments(str(tmp_path))]
+    assert "zz-worker" in segments[0] and "aa-worker" in segments[1]
+
+    output = str(tmp_path / "out" / "data.parquet")
+    reextract.reextract(str(tmp_path), output, processes=1, favicons_from=None)
+    assert pq.read_table(output).to_pydict()["title"] == ["New"]  # The newest copy wins
+
+
+def test_truncated_index_line_is_skipped(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    archive.add("https://example.com/a", PAGE.format(title="A"))
+    archive.close()
+    segment = PageArchive.segments(str(tmp_path))[0]
+    with open(segment[:-len(".warc.zst")] + ".idx", "a") as index:
+        index.write("https://example.com/b\t123")  # Crashed mid-line
+
+    assert [entry[0] for entry in PageArchive.read_index(segment)] == ["https://example.com/a"]
+
+
+def test_reextract_rebuilds_dataset_from_archive(tmp_path):
+    archive = PageArchive(str(tmp_path / "archive"))
+    archive.add("https://example.com/a", PAGE.format(title="Old"))
+    archive.add("https://example.com/b", PAGE.format(title="B"))
+    archive.add("https://example.com/a", PAGE.format(title="New"))  # Recrawled later
+    archive.close()
+    output = str(tmp_path / "out" / "data.parquet")
+
+    rows = reextract.reextract(str(tmp_path / "archive"), output, processes=2, batch_size=1, favicons_from=None)
+
+    assert rows == 3
+    table = pq.read_table(output).to_pydict()
+    assert dict(zip(table["url"], table["title"])) == {"https://example.com/a": "New", "https://example.com/b": "B"}
+    assert table["headings"][0] == ["Exams"]
@@ -0,0 +1,76 @@
+import sys
+import os
+import httpx
+import pytest
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.FavIconExtractor import FavIconExtractor
+from src.LinkFinder import LinkFinder
+from src.Page import Page
+from src.PageExtractor import PageExtractor
+from src.TextExtractor import TextExtractor
+from src.TitleExtractor import TitleExtractor
+
+URL = "https://www.example.com/dept/cse"
+
+PAGES = [
+    """<html><head><title>CSE: Home = Start</title><link rel="shortcut icon" href="/fav.ico">
+    <script>var x = "<p>not text</p>";</script></head>
+    <body><header><h1>Site banner</h1><a href="/header-link">Top</a></header>
+    <h1>Computer Science</h1><h2>2024</h2><h2>Hostel <button>x</button></h2>
+    <p>The mid-sem schedule for every department is out.</p>
+    <p>Read the <a href="/notice">click here</a> notice.</p><p>12345</p>
+    <div><i><h3>Italic heading</h3></i><h3>Faculty list</h3><p>Faculty list</p></div>
+    <a href="https://www.example.com/about/">About</a><a href="https://other.org/x">Out</a>
+    <a href="#top">Top</a><a>No href</a>
+    <footer><p>Footer text</p><a href="/footer-link">F</a></footer></body></html>""",
+    """<title>Untitled</title><p>Paragraph <b>with <h4>nested</h4> tags</b></p>
+    <link rel="stylesheet" href="/s.css"><link rel="icon" href="icon.png"><link rel="icon" href="second.png">""",
+    """<html><body><p>No head at all</p><h5>Sports Complex</h5></body></html>""",
+    """<html><head><title></title><link rel="icon"></head><body><h6>   </h6></body></html>""",
+]
+
+
+def make_page(html):
+    response = httpx.Response(200, headers={"Content-Type": "text/html"}, text=html)
+    return Page(URL, response)
+
+
+def run_extractors(html):
+    """Run each extractor separately on its own parse, as Spider used to."""
+    with patch.object(FavIconExtractor, "_get_base_url", return_value=URL):
+        favicon = FavIconExtractor(URL, make_page(html))._find_favicon_link(make_page(html))
+    text_extractor = TextExtractor(URL, make_page(html))
+    return {
+        "title": TitleExtractor(URL, make_page(html)).get_title(),
+        "links": LinkFinder(URL, make_page(html)).get_links(),
+        "favicon_link": favicon,
+        "headings": text_extractor.extract_headings(),
+        "contents": text_extractor.extract_contents(),
+        "filters": sorted(text_extractor.extract_filters()),
+    }
+
+
+@pytest.mark.parametrize("parser", ["html.parser", "lxml"])
+@pytest.mark.parametrize("html", PAGES)
+def test_single_walk_matches_separate_extractors(html, parser):
+    with patch("src.Page.PARSER", parser):
+        expected = run_extractors(html)
+        extracted = PageExtractor(URL, make_page(html))
+
+    assert {
+        "title": extracted.title,
+        "links": extracted.links,
+        "favicon_link": extracted.favicon_link,
+        "headings": extracted.headings,
+        "contents": extracted.contents,
+        "filters": sorted(extracted.filters),
+    } == expected
+
+
+def test_unparsed_page_yields_defaults():
+    page = Page(URL, httpx.Response(200, headers={"Content-Type": "application/pdf"}, content=b"%PDF"))
+    extracted = PageExtractor(URL, page)
+
+    assert extracted.title == "Title Not Found"
+    assert (extracted.links, extracted.favicon_link, extracted.filters) == (set(), None, ["all"])
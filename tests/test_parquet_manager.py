@@ -0,0 +1,92 @@
+import sys
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.ParquetManager import ParquetManager, SCHEMA, as_list
+
+
+def make_row(url, title="Title"):
+    return pd.DataFrame([{
+        "url": url, "favicon": "", "title": title, "headings": ["Notice"], "content": ["Some text"],
+        "filters": ["all"], "duplicate_of": "", "timestamp": pd.Timestamp("2024-01-01 00:00:00"),
+    }])
+
+
+def make_legacy_row(url):
+    return pd.DataFrame([{
+        "url": url, "favicon": "", "title": "Old", "headings": '["H1", "H2"]',
+        "content": "[]", "filters": "['all', 'exam-head']", "timestamp": "2024-01-01 00:00:00",
+    }])
+
+
+@pytest.fixture
+def parquet_manager(tmp_path):
+    with patch("src.ParquetManager.DATA_DIR", str(tmp_path)):
+        yield ParquetManager(str(tmp_path / "data.parquet"))
+
+
+def test_write_data_appends_part_files(parquet_manager):
+    parquet_manager.write_data(make_row("https://a.com"))
+    parquet_manager.write_data(make_row("https://b.com"))
+    parquet_manager.write_data(make_row("https://a.com", title="Duplicate"))
+
+    assert len(parquet_manager._list_parts()) == 3
+    assert parquet_manager._read_data().empty  # Base file untouched
+
+    df = parquet_manager.read_data()
+    assert list(df["url"]) == ["https://b.com", "https://a.com"]  # Newest row per URL wins
+    assert list(df["title"]) == ["Title", "Duplicate"]
+
+
+def test_compact_folds_parts_into_base_file(parquet_manager):
+    parquet_manager.write_data(make_row("https://a.com"))
+    parquet_manager.write_data(make_row("https://a.com", title="Duplicate"))
+    assert parquet_manager.compact() == 2
+
+    parquet_manager.write_data(make_row("https://b.com"))
+    assert parquet_manager.compact() == 1
+    assert parquet_manager.compact() == 0
+
+    assert parquet_manager._list_parts() == []
+    df = parquet_manager._read_data()
+    assert list(df["url"]) == ["https://a.com", "https://b.com"]
+    assert list(df["title"]) == ["Duplicate", "Title"]
+
+
+def test_files_use_typed_schema(parquet_manager):
+    parquet_manager.write_data(make_row("https://a.com"))
+    parquet_manager.compact()
+
+    schema = pq.read_schema(parquet_manager.file_path)
+    assert schema.field("headings").type == pa.list_(pa.string())
+    assert schema.field("filters").type.value_type == pa.dictionary(pa.int32(), pa.string())
+    assert schema.field("timestamp").type == pa.timestamp("us")
+    assert pq.ParquetFile(parquet_manager.file_path).metadata.row_group(0).column(0).compression == "ZSTD"
+
+    table = pq.read_table(parquet_manager.file_path, columns=["url", "filters"], filters=[("url", "=", "https://a.com")])
+    assert table.to_pylist() == [{"url": "https://a.com", "filters": ["all"]}]
+
+
+def test_legacy_files_are_read_and_migrated(parquet_manager):
+    make_legacy_row("https://old.com").to_parquet(parquet_manager.file_path, index=False)
+    parquet_manager.write_data(make_row("https://new.com"))
+
+    df = parquet_manager.read_data()  # Legacy base file and typed part, combined
+    assert list(df["headings"].map(list)) == [["H1", "H2"], ["Notice"]]
+    assert list(df["filters"].map(list)) == [["all", "exam-head"], ["all"]]
+
+    assert parquet_manager.migrate() == 1
+    assert parquet_manager.migrate() == 0
+    assert pq.read_schema(parquet_manager.file_path).remove_metadata().equals(SCHEMA)
+
+
+def test_as_list_parses_every_legacy_form():
+    assert as_list('["a", "b"]') == ["a", "b"]
+    assert as_list("['a', 'b']") == ["a", "b"]
+    assert as_list("all") == ["all"]
+    assert as_list("") == [] and as_list(None) == []
+    assert as_list(("x", 1)) == ["x", "1"]
@@ -0,0 +1,39 @@
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.ParsePool import ParsePool, extract_html
+
+HTML = """<html><head><title>Notice</title><link rel="icon" href="/fav.ico"></head>
+<body><h1>Hall allotment</h1><p>Allotment for first year students.</p><a href="/next">Next</a></body></html>"""
+
+
+def test_extract_html_returns_fields():
+    fields = extract_html("https://example.com/", HTML)
+
+    assert fields["title"] == "Notice"
+    assert fields["links"] == {"https://example.com/next"}
+    assert fields["favicon_link"] == "https://example.com/fav.ico"
+    assert fields["headings"] == ["Hall allotment"]
+    assert fields["contents"] == ["Allotment for first year students."]
+    assert isinstance(fields["fingerprint"], int)
+
+
+def test_extract_html_skips_non_html():
+    assert extract_html("https://example.com/a.pdf", "%PDF", "application/pdf") is None
+
+
+def test_pool_stores_every_page_before_closing():
+    pool = ParsePool(processes=1, max_pending=2)
+    results, lock = [], threading.Lock()
+
+    def store(fields, error):
+        with lock:
+            results.append(error or fields["title"])
+
+    for _ in range(5):  # More pages than slots: submit blocks until some are stored
+        pool.submit("https://example.com/", HTML, "text/html", store)
+    pool.close()
+
+    assert results == ["Notice"] * 5
+    assert pool.pending == 0
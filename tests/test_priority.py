@@ -0,0 +1,27 @@
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.Priority import get_scorer
+
+NOW = 1_700_000_000.0
+
+
+def test_depth_orders_by_depth_then_discovery():
+    score = get_scorer("depth")
+    assert score("https://a.com/x", 1, NOW + 100) < score("https://a.com/y", 2, NOW)
+    assert score("https://a.com/x", 1, NOW) < score("https://a.com/y", 1, NOW + 1)
+
+
+def test_shallow_path_demotes_long_paths_and_queries():
+    score = get_scorer("shallow-path")
+    assert score("https://a.com/about", 1, NOW) < score("https://a.com/events/2024/01", 1, NOW)
+    assert score("https://a.com/news", 1, NOW) < score("https://a.com/news?page=7", 1, NOW)
+
+
+def test_custom_scorers_and_unknown_names():
+    custom = lambda url, depth, discovered_at: -discovered_at  # Newest first
+    assert get_scorer(custom) is custom
+    assert get_scorer("fifo")("https://a.com", 5, NOW) == NOW
+    with pytest.raises(ValueError):
+        get_scorer("random")
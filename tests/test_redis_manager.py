@@ -0,0 +1,277 @@
+import sys
+import os
+import time
+import pytest
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.RedisManager import RedisManager
+from src.BloomFilter import url_key
+from config.config import START_URL
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_manager():
+    server = fakeredis.FakeServer()
+    with patch("src.RedisManager.redis.Redis",
+               lambda **kwargs: fakeredis.FakeRedis(server=server, decode_responses=True)):
+        RedisManager._instance = None
+        manager = RedisManager(worker_id="test-worker")
+        manager.clear_data()
+        yield manager
+        RedisManager._instance = None
+
+
+def claim(manager, count, shards=None):
+    """Claim a batch through `claim_entries`, returning just the URLs."""
+    return [url for url, _, _ in manager.claim_entries(count, shards)]
+
+
+def test_claim_entries_moves_batch_to_processing(redis_manager):
+    for i in range(5):
+        redis_manager.add_queue_url(f"https://example.com/{i}")
+
+    claimed = claim(redis_manager, 3)
+
+    assert claimed == [f"https://example.com/{i}" for i in range(3)]
+    assert redis_manager.get_queue() == ["https://example.com/3", "https://example.com/4"]
+    assert redis_manager.r.lrange(redis_manager.processing_key, 0, -1) == claimed
+    assert claim(redis_manager, 10) == ["https://example.com/3", "https://example.com/4"]
+    assert claim(redis_manager, 10) == []
+
+
+def test_crawled_and_deleted_urls_leave_processing(redis_manager):
+    redis_manager.add_queue_url("https://example.com/a")
+    redis_manager.add_queue_url("https://example.com/b")
+    claim(redis_manager, 2)
+
+    redis_manager.add_crawled_url("https://example.com/a")
+    redis_manager.delete_queue_url("https://example.com/b")
+
+    assert redis_manager.r.llen(redis_manager.processing_key) == 0
+    assert redis_manager.get_crawled() == {"https://example.com/a"}
+    assert not redis_manager.add_queue_url("https://example.com/a")  # Already crawled
+    assert not redis_manager.add_queue_url("https://example.com/b")  # Skipped for good, not requeued
+
+
+def test_requeue_processing_restores_claimed_urls(redis_manager):
+    for i in range(3):
+        redis_manager.add_queue_url(f"https://example.com/{i}")
+    claim(redis_manager, 2)
+
+    assert redis_manager.requeue_processing() == 2
+    assert redis_manager.get_queue() == [f"https://example.com/{i}" for i in range(3)]
+
+
+def test_add_queue_urls_enqueues_only_new_urls(redis_manager):
+    redis_manager.add_queue_url("https://example.com/queued")
+    redis_manager.add_queue_url("https://example.com/crawled")
+    claim(redis_manager, 2)
+    redis_manager.add_crawled_url("https://example.com/crawled")
+
+    added = redis_manager.add_queue_urls([
+        "https://example.com/queued/",
+        "https://example.com/crawled",
+        "https://example.com/new",
+        "https://example.com/new/",
+        "https://example.com/other",
+    ])
+
+    assert added == ["https://example.com/new", "https://example.com/other"]
+    assert redis_manager.get_queue() == added
+    assert redis_manager.add_queue_urls([]) == []
+
+
+def test_hashed_url_keys_store_fixed_width_members(redis_manager):
+    redis_manager.hash_url_keys = True
+    url = "https://example.com" + "/long-path" * 20
+
+    assert redis_manager.add_queue_urls([url]) == [url]
+    assert redis_manager.add_queue_urls([url]) == []
+    assert redis_manager.get_queue() == [url]  # The queue still holds the full URL
+
+    claim(redis_manager, 1)
+    redis_manager.add_crawled_url(url)
+
+    assert redis_manager.is_crawled(url)
+    assert [len(member) for member in redis_manager.get_crawled()] == [16]
+    assert list(redis_manager.scan_crawled_digests()) == [int(url_key(url), 16)]
+
+
+def test_record_visit_adapts_revisit_interval(redis_manager):
+    url = "https://example.com/news"
+    validators = {"etag": '"v1"', "last_modified": None, "hash": "abc"}
+
+    with patch("src.RedisManager.RECRAWL_INTERVAL", 1000):
+        assert redis_manager.record_visit(url, True, validators, min_interval=100, max_interval=4000) == 1000
+        assert redis_manager.record_visit(url, False, {}, min_interval=100, max_interval=4000) == 2000
+        assert redis_manager.record_visit(url, False, {}, min_interval=100, max_interval=4000) == 4000
+        assert redis_manager.record_visit(url, False, {}, min_interval=100, max_interval=4000) == 4000
+        assert redis_manager.record_visit(url, True, {"hash": "def"}, min_interval=100, max_interval=4000) == 2000
+
+    stored = redis_manager.get_validators(url)
+    assert (stored["etag"], stored["hash"]) == ('"v1"', "def")  # Missing validators keep old values
+    assert "last_modified" not in stored
+
+
+def test_failed_revisits_back_off_then_stop(redis_manager):
+    url = "https://example.com/gone"
+    with patch("src.RedisManager.RECRAWL_INTERVAL", 1000):
+        redis_manager.record_visit(url, True, {"hash": "abc"})
+        assert redis_manager.fail_revisit(url, max_failures=2)
+        assert redis_manager.r.hget(redis_manager.validators_key(url), "interval") == "2000.0"
+        assert redis_manager.r.zscore("recrawl", url) > time.time() + 1900  # Not due again at the lease
+        assert redis_manager.fail_revisit(url, max_failures=2)
+        assert not redis_manager.fail_revisit(url, max_failures=2)
+
+    assert redis_manager.r.zscore("recrawl", url) is None
+    assert redis_manager.r.hget("failed", url) == "3"
+
+
+def test_successful_revisit_resets_failures(redis_manager):
+    url = "https://example.com/flaky"
+    redis_manager.fail_revisit(url, max_failures=1)
+    redis_manager.record_visit(url, True, {})
+    assert redis_manager.fail_revisit(url, max_failures=1)  # Counted afresh
+
+
+def test_claim_recrawls_leases_due_urls(redis_manager):
+    redis_manager.r.zadd("recrawl", {"https://example.com/due": 0, "https://example.com/later": 2e10})
+
+    assert redis_manager.claim_recrawls(10, lease=60) == ["https://example.com/due"]
+    assert redis_manager.claim_recrawls(10, lease=60) == []  # Leased to this claim
+
+    with patch("src.RedisManager.time.time", return_value=redis_manager.r.zscore("recrawl", "https://example.com/due")):
+        assert redis_manager.claim_recrawls(10) == ["https://example.com/due"]  # Lease expired
+
+
+def make_worker(redis_manager, worker_id, **kwargs):
+    """Another worker process sharing the same Redis."""
+    RedisManager._instance = None
+    with patch("src.RedisManager.redis.Redis", lambda **_: redis_manager.r):
+        return RedisManager(worker_id=worker_id, **kwargs)
+
+
+def test_dead_workers_urls_are_reclaimed(redis_manager):
+    redis_manager.add_queue_urls([f"https://example.com/{i}" for i in range(4)])
+    dead = make_worker(redis_manager, "dead-worker")
+    dead.heartbeat()
+    assert claim(dead, 3) == [f"https://example.com/{i}" for i in range(3)]
+
+    redis_manager.heartbeat()
+    assert redis_manager.reclaim_dead_workers(lease=60) == 0  # Still within its lease
+    assert redis_manager.busy_workers() == ["dead-worker"]
+
+    redis_manager.r.zadd("workers", {"dead-worker": 0})  # Heartbeat stopped long ago
+    assert redis_manager.reclaim_dead_workers(lease=60) == 3
+    assert redis_manager.get_queue() == [f"https://example.com/{i}" for i in range(4)]
+    assert redis_manager.busy_workers() == []
+    assert redis_manager.live_workers() == ["test-worker"]
+
+
+def test_host_shards_split_hosts_across_live_workers(redis_manager):
+    a = make_worker(redis_manager, "worker-a", host_shards=16)
+    b = make_worker(redis_manager, "worker-b", host_shards=16)
+    a.heartbeat()
+    b.heartbeat()
+    urls = [f"https://host{h}.example.com/page{p}" for h in range(20) for p in range(3)]
+    a.add_queue_urls(urls)
+
+    shards_a, shards_b = a.assigned_shards(), b.assigned_shards()
+    assert sorted(shards_a + shards_b) == list(range(16))
+
+    claimed_a, claimed_b = claim(a, 100, shards_a), claim(b, 100, shards_b)
+    assert sorted(claimed_a + claimed_b) == sorted(urls + [START_URL])
+    hosts_a = {url.split("/")[2] for url in claimed_a}
+    assert hosts_a.isdisjoint(url.split("/")[2] for url in claimed_b)  # Each host has one owner
+    assert a.requeue_processing() == len(claimed_a)  # Back onto each URL's own shard
+    assert sorted(claim(a, 100, shards_a)) == sorted(claimed_a)
+
+    b.leave()
+    assert a.assigned_shards() == list(range(16))
+
+
+def test_failed_urls_are_retried_then_given_up(redis_manager):
+    url = "https://example.com/flaky"
+    redis_manager.add_queue_urls([url])
+
+    for _ in range(2):
+        assert claim(redis_manager, 10) == [url]
+        assert redis_manager.retry_url(url, max_retries=2)
+        assert redis_manager.get_queue() == [url]
+
+    assert claim(redis_manager, 10) == [url]
+    assert not redis_manager.retry_url(url, max_retries=2)
+    assert redis_manager.get_queue() == []
+    assert redis_manager.r.llen(redis_manager.processing_key) == 0
+    assert redis_manager.r.hgetall("failed") == {url: "3"}
+    assert redis_manager.add_queue_urls([url]) == []  # Not rediscovered
+
+
+def test_retry_of_unclaimed_url_is_ignored(redis_manager):
+    assert not redis_manager.retry_url("https://example.com/elsewhere")
+    assert redis_manager.r.hlen("retries") == 0
+
+
+def test_add_crawled_urls_checkpoints_a_batch(redis_manager):
+    urls = [f"https://example.com/{i}" for i in range(3)]
+    redis_manager.add_queue_urls(urls)
+    claim(redis_manager, 10)
+
+    redis_manager.add_crawled_urls(urls[:2])
+
+    assert redis_manager.r.lrange(redis_manager.processing_key, 0, -1) == [urls[2]]
+    assert redis_manager.get_crawled() == set(urls[:2])
+    assert redis_manager.requeue_processing() == 1  # Only the unfinished URL comes back
+
+
+def test_shallow_urls_are_claimed_first(redis_manager):
+    redis_manager.add_queue_urls(["https://example.com/deep"], depth=3)
+    redis_manager.add_queue_urls(["https://example.com/top"], depth=1)
+
+    entries = redis_manager.claim_entries(10)
+
+    assert [(url, depth) for url, _, depth in entries] == [("https://example.com/top", 1), ("https://example.com/deep", 3)]
+    assert entries[0][1] < entries[1][1]
+
+
+def test_requeue_keeps_priority_order(redis_manager):
+    redis_manager.add_queue_urls(["https://example.com/deep"], depth=2)
+    redis_manager.add_queue_urls(["https://example.com/top"], depth=0)
+    claim(redis_manager, 1)  # Claims /top
+
+    redis_manager.requeue_processing()
+
+    assert redis_manager.get_queue() == ["https://example.com/top", "https://example.com/deep"]
+
+
+def test_max_depth_and_path_caps_limit_enqueued_urls(redis_manager):
+    worker = make_worker(redis_manager, "capped", max_depth=2, path_caps={r"/calendar/": 2})
+
+    assert worker.add_queue_urls(["https://example.com/too-deep"], depth=3) == []
+    calendar = [f"https://example.com/calendar/{day}" for day in range(5)]
+    assert len(worker.add_queue_urls(calendar, depth=1)) == 2
+    assert worker.add_queue_urls(["https://example.com/calendar/9", "https://example.com/about"], depth=2) == [
+        "https://example.com/about"
+    ]
+
+
+def test_claim_takes_best_scores_across_shards(redis_manager):
+    worker = make_worker(redis_manager, "sharded", host_shards=8)
+    worker.clear_data()  # Drop the auto-seeded START_URL
+    worker.add_queue_urls([f"https://deep{h}.example.com/" for h in range(8)], depth=2)
+    worker.add_queue_urls([f"https://top{h}.example.com/" for h in range(8)], depth=1)
+
+    claimed = worker.claim_entries(8)
+
+    assert all(url.startswith("https://top") for url, _, _ in claimed)
+
+
+def test_list_queues_are_migrated_to_sorted_sets(redis_manager):
+    redis_manager.r.rpush("queue", "https://example.com/b", "https://example.com/a")
+
+    redis_manager.migrate_list_queues()
+
+    assert redis_manager.r.type("queue") == "zset"
+    assert redis_manager.get_queue() == ["https://example.com/b", "https://example.com/a"]  # FIFO order kept
@@ -0,0 +1,72 @@
+import sys
+import os
+import time
+from unittest.mock import MagicMock
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.ResultSink import ResultSink
+
+
+def written_urls(parquet_manager):
+    return [list(call.args[0]["url"]) for call in parquet_manager.write_data.call_args_list]
+
+
+def test_flushes_when_row_limit_reached():
+    parquet_manager = MagicMock()
+    sink = ResultSink(parquet_manager, max_rows=2, max_bytes=10**9, max_seconds=60)
+
+    sink.add({"url": "a"})
+    parquet_manager.write_data.assert_not_called()
+    sink.add({"url": "b"})
+    sink.add({"url": "c"})
+    sink.close()
+
+    assert written_urls(parquet_manager) == [["a", "b"], ["c"]]
+
+
+def test_flushes_when_byte_limit_reached():
+    parquet_manager = MagicMock()
+    sink = ResultSink(parquet_manager, max_rows=100, max_bytes=10, max_seconds=60)
+
+    sink.add({"url": "x" * 20})
+
+    assert written_urls(parquet_manager) == [["x" * 20]]
+    sink.close()
+
+
+def test_flushes_after_time_limit():
+    parquet_manager = MagicMock()
+    sink = ResultSink(parquet_manager, max_rows=100, max_bytes=10**9, max_seconds=0.05)
+
+    sink.add({"url": "a"})
+    deadline = time.monotonic() + 2
+    while not parquet_manager.write_data.called and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert written_urls(parquet_manager) == [["a"]]
+    sink.close()
+
+
+def test_failed_write_keeps_records_buffered():
+    parquet_manager = MagicMock()
+    parquet_manager.write_data.side_effect = [OSError("disk full"), None]
+    sink = ResultSink(parquet_manager, max_rows=100, max_bytes=10**9, max_seconds=60)
+
+    sink.add({"url": "a"})
+    assert sink.flush() == 0
+    assert sink.flush() == 1
+    sink.close()
+
+
+def test_on_flush_receives_records_after_successful_write():
+    parquet_manager = MagicMock()
+    flushed = []
+    sink = ResultSink(parquet_manager, max_rows=100, max_bytes=10**9, max_seconds=60, on_flush=flushed.append)
+
+    parquet_manager.write_data.side_effect = OSError("disk full")
+    sink.add({"url": "a"})
+    sink.flush()
+    assert flushed == []  # Not on disk, so not checkpointed
+
+    parquet_manager.write_data.side_effect = None
+    sink.close()
+    assert flushed == [[{"url": "a"}]]
@@ -0,0 +1,91 @@
+import sys
+import os
+import httpx
+from unittest.mock import MagicMock, patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.RobotsManager import RobotsManager, ROBOTS_ERROR_TTL
+
+ROBOTS_TXT = """User-agent: *
+Disallow: /private
+Crawl-delay: 2
+"""
+
+
+def robots_response(status_code=200, text=ROBOTS_TXT):
+    return httpx.Response(status_code, text=text, request=httpx.Request("GET", "https://example.com/robots.txt"))
+
+
+@patch("src.RobotsManager.httpx.get")
+def test_filters_disallowed_urls_and_caches_rules_per_host(mock_get):
+    mock_get.return_value = robots_response()
+    robots = RobotsManager(user_agent="test-bot")
+
+    allowed = robots.filter_urls([
+        "https://example.com/public",
+        "https://example.com/private/page",
+        "https://example.com/",
+    ])
+
+    assert allowed == ["https://example.com/public", "https://example.com/"]
+    mock_get.assert_called_once()
+    assert mock_get.call_args.args[0] == "https://example.com/robots.txt"
+
+
+@patch("src.RobotsManager.httpx.get")
+def test_reports_crawl_delay(mock_get):
+    mock_get.return_value = robots_response()
+    delays = []
+    robots = RobotsManager(user_agent="test-bot", on_crawl_delay=lambda host, delay: delays.append((host, delay)))
+
+    assert robots.crawl_delay("https://example.com/a") == 2.0
+    assert delays == [("example.com", 2.0)]
+
+
+@patch("src.RobotsManager.httpx.get")
+def test_missing_robots_allows_and_server_errors_disallow(mock_get):
+    mock_get.side_effect = lambda url, **kwargs: robots_response(404 if "missing" in url else 503, "")
+    robots = RobotsManager(user_agent="test-bot")
+
+    assert robots.is_allowed("https://missing.com/anything")
+    assert not robots.is_allowed("https://down.com/anything")
+
+
+@patch("src.RobotsManager.httpx.get")
+def test_expired_rules_are_refetched(mock_get):
+    mock_get.return_value = robots_response()
+    robots = RobotsManager(user_agent="test-bot", ttl=0)
+
+    robots.is_allowed("https://example.com/a")
+    robots.is_allowed("https://example.com/b")
+
+    assert mock_get.call_count == 2
+
+
+@patch("src.RobotsManager.httpx.get")
+def test_unreachable_robots_keeps_links_and_is_refetched_once_per_error_ttl(mock_get):
+    mock_get.side_effect = httpx.ConnectTimeout("timed out")
+    robots = RobotsManager(user_agent="test-bot")
+
+    assert robots.filter_urls(["https://down.com/a", "https://down.com/b"]) == [
+        "https://down.com/a", "https://down.com/b"
+    ]  # Kept for a later check, not dropped
+    for i in range(50):
+        assert robots.check(f"https://down.com/{i}") is None  # Unknown until the error TTL passes
+    assert mock_get.call_count == 1
+    assert 0 < robots.retry_after("https://down.com/a") <= ROBOTS_ERROR_TTL
+
+    mock_get.side_effect = None
+    mock_get.return_value = robots_response()
+    robots.cache["https://down.com"] = (robots.cache["https://down.com"][0], 0)  # Error TTL expired
+    assert robots.check("https://down.com/private/x") is False
+    assert robots.check("https://down.com/a") is True
+    assert mock_get.call_count == 2
+
+
+def test_fetches_with_the_pooled_client():
+    client = MagicMock()
+    client.get.return_value = robots_response()
+    robots = RobotsManager(user_agent="test-bot", client=client)
+
+    assert not robots.is_allowed("https://example.com/private")
+    assert client.get.call_args.kwargs["headers"] == {"User-Agent": "test-bot"}
@@ -0,0 +1,108 @@
+import sys
+import os
+import pandas as pd
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.ParquetManager import ParquetManager
+from src.SearchIndex import Bitmap, SearchIndex, index_dir_for, tokenize
+
+
+def record(url, title, content, filters=("all",)):
+    return {"url": url, "title": title, "headings": [], "content": content, "filters": list(filters)}
+
+
+RECORDS = [
+    record("https://a.com/hall", "Hall Allotment", ["Hall allotment for first year students."], ["all", "halls"]),
+    record("https://a.com/exam", "Exam Schedule", ["Mid sem exam schedule for all departments."], ["all", "exams"]),
+    record("https://a.com/cse", "CSE Department", ["Department exam results and hall tickets."],
+           ["all", "departments", "exams"]),
+]
+
+
+def make_index(tmp_path, records=RECORDS):
+    SearchIndex.append(str(tmp_path), records)
+    index = SearchIndex(str(tmp_path))
+    index.refresh()
+    return index
+
+
+def test_tokenize_drops_stopwords_and_single_letters():
+    assert tokenize("The Hall-allotment of B.Tech 2024!") == ["hall", "allotment", "tech", "2024"]
+
+
+def test_bitmap_membership():
+    bitmap = Bitmap()
+    for doc_id in (0, 9, 100):
+        bitmap.add(doc_id)
+    bitmap.discard(9)
+    assert 0 in bitmap and 100 in bitmap and 9 not in bitmap and 5000 not in bitmap
+    assert bitmap.to_int().bit_count() == 2
+
+
+def test_search_ranks_by_bm25(tmp_path):
+    index = make_index(tmp_path)
+
+    results = index.search("hall allotment")
+    assert [result["url"] for result in results] == ["https://a.com/hall", "https://a.com/cse"]
+    assert results[0]["title"] == "Hall Allotment" and results[0]["score"] > results[1]["score"]
+    assert index.search("nonexistent") == [] and index.search("the") == []
+
+
+def test_filters_restrict_results_and_count_facets(tmp_path):
+    index = make_index(tmp_path)
+
+    assert [result["url"] for result in index.search("exam", filters=["departments"])] == ["https://a.com/cse"]
+    assert index.search("exam", filters=["unknown"]) == []
+    assert index.facet_counts() == {"all": 3, "departments": 1, "exams": 2, "halls": 1}
+    assert index.facet_counts(["exams"]) == {"all": 2, "departments": 1, "exams": 2}
+
+
+def test_category_facets_cover_heading_and_content_matches(tmp_path):
+    SearchIndex.append(str(tmp_path), [
+        record("https://a.com/hall", "Hall Allotment", ["Allotment list"], ["all", "halls-head"]),
+        record("https://a.com/mess", "Mess", ["Hall allotment menu"], ["all", "halls-cont", "dining-cont"]),
+        record("https://a.com/cse", "CSE", ["Allotment of labs"], ["all"]),
+    ])
+    index = SearchIndex(str(tmp_path))
+    index.refresh()
+
+    assert {result["url"] for result in index.search("allotment", filters=["halls"])} == {
+        "https://a.com/hall", "https://a.com/mess"
+    }
+    assert [result["url"] for result in index.search("allotment", filters=["halls-head"])] == ["https://a.com/hall"]
+    assert index.facet_counts()["halls"] == 2 and index.facet_counts()["halls-cont"] == 1
+
+
+def test_refresh_loads_new_segments_and_replaces_urls(tmp_path):
+    index = make_index(tmp_path)
+    SearchIndex.append(str(tmp_path), [record("https://a.com/hall", "Mess Menu", ["Mess menu for the week."])])
+
+    assert index.refresh() == 1  # Only the new segment is read
+    assert len(index) == 3
+    assert index.search("allotment") == []  # Replaced by the newer row
+    assert index.search("mess")[0]["url"] == "https://a.com/hall"
+    assert "halls" not in index.facet_counts()
+
+
+def test_compact_merges_segments(tmp_path):
+    index = make_index(tmp_path)
+    SearchIndex.append(str(tmp_path), [record("https://a.com/exam", "Exam Results", ["Results are out."])])
+    index.refresh()
+    before = index.search("results")
+
+    assert index.compact() == 2
+    assert len(index.segments()) == 1
+    reader = SearchIndex(str(tmp_path))
+    reader.refresh()
+    assert len(reader) == 3 and reader.search("results") == before
+
+
+def test_parquet_writes_update_the_index(tmp_path):
+    with patch("src.ParquetManager.DATA_DIR", str(tmp_path)):
+        data_file = str(tmp_path / "data.parquet")
+        parquet_manager = ParquetManager(data_file, search_index=True)
+        parquet_manager.write_data(pd.DataFrame([{**RECORDS[0], "timestamp": pd.Timestamp("2024-01-01")}]))
+
+    index = SearchIndex(index_dir_for(data_file))
+    index.refresh()
+    assert index.search("allotment", filters=["halls"])[0]["url"] == "https://a.com/hall"
@@ -0,0 +1,57 @@
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.SimHash import SimHashIndex, hamming, shingles, simhash
+
+BASE = (
+    "The Department of Computer Science and Engineering offers undergraduate and postgraduate "
+    "programmes with research in algorithms, systems, machine learning and networks. Students "
+    "take part in projects with industry partners and present their work at the annual symposium. "
+    "The department hosts visiting faculty every semester and runs workshops on emerging topics. "
+    "Admissions for the doctoral programme open twice a year, in spring and in autumn."
+)
+TEMPLATED = BASE.replace("Computer Science and Engineering", "Electrical Engineering")
+UNRELATED = (
+    "Hall allotment for first year students will be announced after the counselling rounds. "
+    "Mess fees are payable at the hall office and residents must register their bicycles."
+)
+
+
+def test_shingles_are_lowercased_word_trigrams():
+    assert shingles("The Mid-Sem exam, today") == ["the mid sem", "mid sem exam", "sem exam today"]
+    assert shingles("Two words") == ["two words"]
+    assert shingles("  ") == []
+
+
+def test_near_duplicates_have_close_fingerprints():
+    assert simhash(BASE) == simhash(BASE.upper())
+    assert hamming(simhash(BASE), simhash(TEMPLATED)) <= 8
+    assert hamming(simhash(BASE), simhash(UNRELATED)) > 16
+    assert simhash("") is None
+
+
+def make_redis():
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.mark.parametrize("redis_client", [None, "redis"])
+def test_index_finds_fingerprints_within_distance(redis_client):
+    index = SimHashIndex(max_distance=3, redis_client=make_redis() if redis_client else None)
+    fingerprint = simhash(BASE)
+    index.add(fingerprint, "https://example.com/cse")
+
+    assert index.find(fingerprint ^ 0b1011) == "https://example.com/cse"  # 3 bits off
+    assert index.find(fingerprint ^ (0b1111 << 30)) is None  # 4 bits off
+    assert index.find(fingerprint, exclude="https://example.com/cse") is None
+    assert index.find(simhash(UNRELATED)) is None
+
+
+def test_index_spreads_close_bits_across_bands():
+    index = SimHashIndex(max_distance=3)
+    fingerprint = 0x0123456789ABCDEF
+    index.add(fingerprint, "https://example.com/a")
+
+    # One flipped bit in each of three bands still leaves one band intact
+    assert index.find(fingerprint ^ (1 << 0) ^ (1 << 20) ^ (1 << 40)) == "https://example.com/a"
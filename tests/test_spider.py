@@ -1,14 +1,18 @@
 import sys
 import os
 import pytest
-from unittest.mock import patch
+from datetime import datetime
+from unittest.mock import MagicMock, patch
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.ParsePool import ParsePool
+from src.SimHash import SimHashIndex
 from src.Spider import Spider
 
 @pytest.fixture
 def spider():
     with patch("src.Spider.RedisManager") as MockRedisManager, \
-         patch("src.Spider.ParquetManager") as MockParquetManager:
+         patch("src.Spider.ParquetManager") as MockParquetManager, \
+         patch("src.Spider.RobotsManager") as MockRobotsManager:
 
         mock_redis = MockRedisManager.return_value
         mock_redis.get_crawled.return_value = []
@@ -17,39 +21,96 @@ def spider():
         mock_parquet = MockParquetManager.return_value
         mock_parquet.write_data.return_value = None
 
+        MockRobotsManager.return_value.filter_urls.side_effect = lambda urls: list(urls)
+
         spider = Spider()
         return spider
 
 
-@patch("src.Spider.TitleExtractor")
-@patch("src.Spider.TextExtractor")
 @patch("src.Spider.FavIconExtractor")
-@patch("src.Spider.LinkFinder")
+@patch("src.Spider.PageExtractor")
+@patch("src.Spider.Page")
 def test_crawl_page_basic(
-    mock_link_finder,
+    mock_page,
+    mock_page_extractor,
     mock_favicon_extractor,
-    mock_text_extractor,
-    mock_title_extractor,
     spider,
 ):
     url = "https://example.com"
 
+    mock_page.return_value.url = url
+    mock_page.return_value.unchanged = False
+
     # Mocks for extractors
-    mock_link_finder.return_value.get_links.return_value = ["https://example.com/page2"]
+    extracted = mock_page_extractor.return_value
+    extracted.links = ["https://example.com/page2"]
+    extracted.favicon_link = "https://example.com/favicon.ico"
+    extracted.title = "Example Title"
+    extracted.headings = ["Heading"]
+    extracted.contents = ["Some content"]
+    extracted.filters = "test"
     mock_favicon_extractor.return_value.get_favicon.return_value = "https://example.com/favicon.ico"
-    mock_title_extractor.return_value.get_title.return_value = "Example Title"
-    mock_text_extractor.return_value.extract_headings.return_value = ["Heading"]
-    mock_text_extractor.return_value.extract_contents.return_value = ["Some content"]
-    mock_text_extractor.return_value.extract_filters.return_value = "test"
 
     # Call method under test
+    spider.depths[url] = 2
     spider.crawl_page("Thread-1", url)
 
     # Assertions
     assert url in spider.crawled_urls
-    spider.redis_manager.add_crawled_url.assert_called_with(url)
+    spider.redis_manager.delete_queue_url.assert_not_called()  # Still claimed while in flight
+    spider.parquet_manager.write_data.assert_not_called()  # Buffered until flushed
+    spider.redis_manager.add_crawled_urls.assert_not_called()  # Checkpointed only once on disk
+    spider.close()
     spider.parquet_manager.write_data.assert_called_once()
-    spider.redis_manager.add_queue_url.assert_called_with("https://example.com/page2")
+    spider.redis_manager.add_crawled_urls.assert_called_once_with([url])
+    spider.redis_manager.add_queue_urls.assert_called_once_with(["https://example.com/page2"], 3)  # One deeper
+    assert spider.depths == {}
+
+    # The page is fetched once and walked once; the favicon lookup reuses the walk
+    mock_page.assert_called_once_with(url, validators=None, client=spider.client)
+    page = mock_page.return_value
+    mock_page_extractor.assert_called_once_with(url, page)
+    mock_favicon_extractor.assert_called_once_with(url, page, spider.favicon_cache, extracted.favicon_link)
+
+
+@patch("src.Spider.PageExtractor")
+@patch("src.Spider.Page")
+def test_crawl_page_retries_unfetchable_page(mock_page, mock_page_extractor, spider):
+    url = "https://example.com/down"
+    mock_page.return_value.url = url
+    mock_page.return_value.unchanged = False
+    mock_page.return_value.response = None
+    mock_page.return_value.soup = None
+
+    spider.crawl_page("Thread-1", url)
+
+    mock_page_extractor.assert_not_called()
+    spider.parquet_manager.write_data.assert_not_called()
+    spider.redis_manager.retry_url.assert_called_once_with(url)
+    assert url not in spider.crawled_urls
+
+
+@patch("src.Spider.PageExtractor")
+@patch("src.Spider.Page")
+def test_crawl_page_marks_non_html_page_crawled(mock_page, mock_page_extractor, spider):
+    url = "https://example.com/file.pdf"
+    mock_page.return_value.url = url
+    mock_page.return_value.unchanged = False
+    mock_page.return_value.soup = None
+
+    spider.crawl_page("Thread-1", url)
+
+    mock_page_extractor.assert_not_called()
+    spider.redis_manager.add_crawled_url.assert_called_once_with(url)
+    spider.redis_manager.retry_url.assert_not_called()
+
+
+@patch("src.Spider.Page", side_effect=RuntimeError("boom"))
+def test_crawl_page_error_releases_claim_for_retry(mock_page, spider):
+    spider.crawl_page("Thread-1", "https://example.com/a")
+
+    spider.redis_manager.retry_url.assert_called_once_with("https://example.com/a")
+    spider.redis_manager.add_crawled_url.assert_not_called()
 
 
 def test_make_json_structure(spider):
@@ -63,10 +124,10 @@ def test_make_json_structure(spider):
     )
     assert data["url"] == "https://test.com"
     assert data["title"] == "Test Title"
-    assert data["filters"] == "test"
-    assert isinstance(data["headings"], str)
-    assert isinstance(data["content"], str)
-    assert "timestamp" in data
+    assert data["filters"] == ["test"]
+    assert data["headings"] == ["H1", "H2"]
+    assert data["content"] == ["Some content"]
+    assert isinstance(data["timestamp"], datetime)
 
 
 def test_skip_duplicate_url(spider):
@@ -76,3 +137,118 @@ def test_skip_duplicate_url(spider):
     with patch("builtins.print") as mock_print:
         spider.crawl_page("Thread-1", url)
         mock_print.assert_any_call(f"🔁 {url} already crawled.")
+
+
+@patch("src.Spider.PageExtractor")
+@patch("src.Spider.Page")
+def test_recrawl_of_unchanged_page_skips_parsing_and_writes(mock_page, mock_page_extractor, spider):
+    url = "https://example.com/news"
+    spider.crawled_urls.add(url)
+    spider.recrawl_urls.add(url)
+    spider.redis_manager.get_validators.return_value = {"etag": '"v1"'}
+    mock_page.return_value.url = url
+    mock_page.return_value.unchanged = True
+
+    spider.crawl_page("Thread-1", url)
+    spider.close()
+
+    mock_page.assert_called_once_with(url, validators={"etag": '"v1"'}, client=spider.client)
+    mock_page_extractor.assert_not_called()
+    spider.parquet_manager.write_data.assert_not_called()
+    spider.redis_manager.record_visit.assert_called_once_with(url, False, mock_page.return_value.get_validators())
+    assert url not in spider.recrawl_urls
+
+
+@patch("src.Spider.NEAR_DUPLICATE_EXPAND_LINKS", False)
+@patch("src.Spider.NEAR_DUPLICATES", "skip")
+@patch("src.Spider.FavIconExtractor")
+@patch("src.Spider.PageExtractor")
+@patch("src.Spider.Page")
+def test_near_duplicate_is_skipped_without_expanding_links(mock_page, mock_page_extractor, mock_favicon, spider):
+    spider.simhash_index = SimHashIndex()
+    mock_page.return_value.unchanged = False
+    extracted = mock_page_extractor.return_value
+    extracted.links = {"https://example.com/more"}
+    extracted.title = "Notice"
+    extracted.headings = []
+    extracted.contents = ["Hall allotment for first year students will be announced after counselling."]
+
+    for url in ("https://example.com/a", "https://example.com/b"):
+        mock_page.return_value.url = url
+        spider.crawl_page("Thread-1", url)
+    spider.close()
+
+    spider.redis_manager.add_queue_urls.assert_called_once_with(["https://example.com/more"], 1)  # Only from /a
+    written = spider.parquet_manager.write_data.call_args.args[0]
+    assert list(written["url"]) == ["https://example.com/a"]
+    assert "https://example.com/b" in spider.crawled_urls
+
+
+@patch("src.Spider.FavIconExtractor")
+@patch("src.Spider.Page")
+def test_parse_pool_extracts_off_the_fetching_thread(mock_page, mock_favicon, spider):
+    url = "https://example.com/notice"
+    page = mock_page.return_value
+    page.url, page.unchanged, page.content_type = url, False, "text/html"
+    page.html = "<title>Notice</title><h1>Hall</h1><p>Allotment list</p><a href='/next'>Next</a>"
+    mock_favicon.return_value.get_favicon.return_value = None
+    spider.parse_pool = ParsePool(processes=1)
+
+    spider.depths[url] = 1
+    spider.crawl_page("Thread-1", url)
+    spider.close()  # Waits for the page to come back from the pool
+
+    spider.redis_manager.add_queue_urls.assert_called_once_with(["https://example.com/next"], 2)
+    written = spider.parquet_manager.write_data.call_args.args[0]
+    assert list(written["title"]) == ["Notice"] and list(written["content"]) == [["Allotment list"]]
+    spider.redis_manager.add_crawled_urls.assert_called_once_with([url])
+    assert spider.pending_pages == 0
+
+
+def test_uncrawled_checks_a_shared_filter_in_one_batch(spider):
+    spider.crawled_urls = MagicMock()
+    spider.crawled_urls.contains_many.return_value = [True, False]
+
+    assert spider.uncrawled(["https://example.com/a", "https://example.com/b"]) == ["https://example.com/b"]
+    spider.crawled_urls.contains_many.assert_called_once()
+    spider.crawled_urls.__contains__.assert_not_called()
+
+
+@patch("src.Spider.Page")
+def test_claimed_url_is_rechecked_against_robots(mock_page, spider):
+    spider.robots_manager.check.return_value = None  # robots.txt still unreachable
+    spider.robots_manager.retry_after.return_value = 30.0
+    spider.defer_url = MagicMock()
+    spider.crawl_page("Thread-1", "https://example.com/a")
+    spider.defer_url.assert_called_once_with("https://example.com/a", 30.0)
+    spider.redis_manager.retry_url.assert_not_called()  # Not a failed fetch
+
+    spider.defer_url = None
+    spider.crawl_page("Thread-1", "https://example.com/b")
+    spider.redis_manager.release_url.assert_called_once_with("https://example.com/b")
+    spider.redis_manager.retry_url.assert_not_called()
+
+    spider.robots_manager.check.return_value = False
+    spider.crawl_page("Thread-1", "https://example.com/private")
+    spider.redis_manager.delete_queue_url.assert_called_once_with("https://example.com/private")
+    mock_page.assert_not_called()
+
+
+@patch("src.Spider.Page")
+def test_failed_or_non_html_revisit_backs_off(mock_page, spider):
+    mock_page.side_effect = RuntimeError("410 Gone")
+    spider.recrawl_urls.add("https://example.com/gone")
+    spider.crawl_page("Thread-1", "https://example.com/gone")
+
+    mock_page.side_effect = None
+    mock_page.return_value.url = "https://example.com/file"
+    mock_page.return_value.unchanged = False
+    mock_page.return_value.soup = None
+    spider.recrawl_urls.add("https://example.com/file")
+    spider.crawl_page("Thread-1", "https://example.com/file")
+
+    spider.redis_manager.retry_url.assert_not_called()  # Revisits aren't in the processing list
+    assert [call.args[0] for call in spider.redis_manager.fail_revisit.call_args_list] == [
+        "https://example.com/gone", "https://example.com/file"
+    ]
+    assert spider.recrawl_urls == set()
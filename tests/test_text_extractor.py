@@ -0,0 +1,37 @@
+import sys
+import os
+import httpx
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.FilterMatcher import FilterMatcher
+from src.Page import Page
+from src.TextExtractor import TextExtractor
+
+
+def test_filter_matcher_is_case_insensitive_and_whole_word():
+    matcher = FilterMatcher({"halls": {"hall", "sam"}, "exams": {"mid-sem", "end sem"}, "faculties": {"ta"}})
+
+    assert matcher.match("Hall allotment after the MID-SEM") == {"halls", "exams"}
+    assert matcher.match("hallway data on sample sets") == set()
+    assert matcher.match("results of end  sem") == set()  # Phrases need their exact spacing
+    assert matcher.match("") == set()
+
+
+def test_filter_matcher_reports_categories_of_contained_keywords():
+    matcher = FilterMatcher({"halls": {"hall"}, "exams": {"exam hall"}})
+
+    assert matcher.match("the exam hall") == {"halls", "exams"}
+
+
+def test_extract_filters_reuses_headings_and_contents():
+    html = "<h1>Hostel news</h1><p>The mid-sem schedule for every department.</p>"
+    response = httpx.Response(200, headers={"Content-Type": "text/html"}, text=html)
+    extractor = TextExtractor("https://example.com", Page("https://example.com", response))
+
+    with patch.object(extractor.soup, "find_all", wraps=extractor.soup.find_all) as find_all:
+        extractor.extract_headings()
+        extractor.extract_contents()
+        filters = extractor.extract_filters()
+
+    assert find_all.call_count == 2  # One walk for headings, one for paragraphs
+    assert sorted(filters) == ["all", "departments-cont", "exams-cont", "halls-head"]
@@ -0,0 +1,49 @@
+import sys
+import os
+import httpx
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.LinkFinder import LinkFinder
+from src.Page import Page
+from src.UrlCanonicalizer import UrlCanonicalizer, canonicalize, dedupe_key
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("HTTPS://WWW.Example.COM/About/", "https://www.example.com/About"),
+    ("https://example.com:443/a", "https://example.com/a"),
+    ("http://example.com:80/a", "http://example.com/a"),
+    ("http://example.com:8080/a", "http://example.com:8080/a"),
+    ("https://example.com/a#section", "https://example.com/a"),
+    ("https://example.com/a?b=2&a=1", "https://example.com/a?a=1&b=2"),
+    ("https://example.com/a?utm_source=x&id=3&fbclid=y", "https://example.com/a?id=3"),
+    ("https://example.com/?", "https://example.com"),
+    ("http://[::1]:80/a", "http://[::1]/a"),
+])
+def test_canonicalize(url, expected):
+    assert canonicalize(url) == expected
+
+
+def test_dedupe_key_unifies_schemes():
+    assert dedupe_key("http://example.com/a/") == dedupe_key("https://example.com/a")
+    assert canonicalize("http://example.com/a/") == "http://example.com/a"  # Still fetched over http
+
+
+def test_rules_can_be_disabled():
+    canonicalizer = UrlCanonicalizer({"sort_query": False, "strip_fragment": False, "unify_scheme": False})
+    assert canonicalizer.canonicalize("https://example.com/a?b=2&a=1#x") == "https://example.com/a?b=2&a=1#x"
+    assert canonicalizer.dedupe_key("http://example.com") == "http://example.com"
+
+
+def test_link_finder_keeps_same_domain_links_only():
+    html = """<a href="/about/#team">About</a>
+              <a href="https://dept.example.com/cs?b=1&a=2">CS</a>
+              <a href="https://example.com.evil.org/">Lookalike</a>
+              <a href="https://other.org/?next=example.com">Other</a>
+              <a href="mailto:office@example.com">Mail</a>"""
+    response = httpx.Response(200, headers={"Content-Type": "text/html"}, text=html)
+    page = Page("https://www.example.com/", response)
+
+    assert LinkFinder(page.url, page).get_links() == {
+        "https://www.example.com/about",
+        "https://dept.example.com/cs?a=2&b=1",
+    }
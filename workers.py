@@ -0,0 +1,37 @@
+import multiprocessing
+import os
+import socket
+import sys
+
+# Run N crawler processes on this machine, all sharing the Redis frontier:
+#     python workers.py 4
+# Each process gets a stable WORKER_ID (<hostname>-<n>), so a restarted worker
+# resumes its own claimed URLs. Run it on several machines to crawl from all of them,
+# pointing each at the shared Redis: REDIS_HOST=10.0.0.5 REDIS_PASSWORD=... python workers.py 4
+
+
+def run_worker(worker_id):
+    """Crawl in a fresh process with its own WORKER_ID."""
+    os.environ["WORKER_ID"] = worker_id  # Read by config.config, imported below
+    from main import AsyncCrawler, Crawler
+    from config.config import ENGINE
+
+    crawler = AsyncCrawler() if ENGINE == "async" else Crawler()
+    crawler.crawl()
+
+
+if __name__ == "__main__":
+    number_of_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    context = multiprocessing.get_context("spawn")  # Fresh interpreter: no shared Redis connection or config
+    processes = [
+        context.Process(target=run_worker, args=(f"{socket.gethostname()}-{i}",), name=f"Worker-{i}")
+        for i in range(number_of_workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()